@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Local Savage Arena Server
+
+A stand-in for the Vercel deployment so SavageArenaClient can be driven
+through the real HTTP path at any pace. It serves:
+
+    GET  /api/match/current        arena_sim.generate_match (api/match/current.js)
+    GET  /api/match/{id}/result    arena_sim.match_result   (api/match/[id]/result.js)
+    POST /api/bet                  single bets or slips against an in-memory ledger
+    GET  /api/balance              per-agent balance (api/balance.js, 1000 to start)
+    POST /api/webhooks/register    push match.started / match.ended / bet.settled (API-SPEC.md)
+    GET  /api/_stats               request / fault / bet counters
+
+The arena clock runs `--speed` times faster than the wall clock, so with
+--speed 60 a five-minute match cycle takes five seconds. Timestamps in
+payloads (bettingEndsAt, startsAt, endsAt) are translated back to the
+wall-clock moment they occur, so a client comparing them with time.time()
+needs no changes. The polling loop works at any speed; --scheduled
+computes windows from the real clock and needs --speed 1.
+
+Bets go into the same Book paper trading uses (book.py) and settle when
+their match ends, paying stake plus profit less the 5% King's Tax.
+Besides winner bets it takes the two-team board markets board_pricer
+quotes (firstBlood, firstElim, kills/duration over-under), priced with
+the api/odds.js formulas and settled on the battle log.
+
+Faults can be injected: fixed plus random latency, and a share of 429
+(with Retry-After) and 5xx responses. Webhook deliveries go out as their
+moment passes on the arena clock, each after a random --webhook-jitter
+delay (so they can arrive out of order), and a --webhook-dupes share of
+them is delivered twice.
+
+Usage:
+    python arena_server.py --port 8787 --speed 60
+    python arena_server.py --speed 300 --latency 50 --jitter 200 --error-429 0.05 --error-5xx 0.02
+    python savage_trader.py --arena-url http://127.0.0.1:8787 --poll-interval 1
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import logging
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import arena_sim
+from book import DEFAULT_BALANCE, ArenaClock, Book
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_EVENTS = ("match.started", "match.ended", "bet.settled")
+RESULT_PATH = re.compile(r"^/api/match/([^/]+)/result$")
+
+
+# ============ STATE ============
+class ArenaState(Book):
+    """The book plus the webhook registry and the bets waiting to be pushed."""
+
+    def __init__(self, clock: ArenaClock, start_balance: float = DEFAULT_BALANCE):
+        super().__init__(clock, start_balance)
+        self.webhooks: Dict[str, Dict] = {}   # URL -> {"agentId", "events"}
+        self.unsent: List[Dict] = []          # Settled bets waiting for their bet.settled push
+
+    def on_settled(self, bet: Dict):
+        if self.webhooks:
+            self.unsent.append(bet)
+
+    def register_webhook(self, agent_id: str, body: Dict) -> Tuple[int, Dict]:
+        if not isinstance(body, dict):
+            return 400, {"error": "url required"}
+        url, kinds = body.get("url"), body.get("events") or list(WEBHOOK_EVENTS)
+        if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+            return 400, {"error": "url required"}
+        if not isinstance(kinds, list) or not all(isinstance(k, str) for k in kinds):
+            return 400, {"error": "events must be a list", "validEvents": list(WEBHOOK_EVENTS)}
+        unknown = sorted(set(kinds) - set(WEBHOOK_EVENTS))
+        if unknown:
+            return 400, {"error": f"Unknown events {unknown}", "validEvents": list(WEBHOOK_EVENTS)}
+        with self.lock:
+            self.webhooks[url] = {"agentId": agent_id, "events": set(kinds)}
+        return 200, {"success": True, "url": url, "events": sorted(kinds)}
+
+
+# ============ FAULTS ============
+class Faults:
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_429: float = 0,
+                 error_5xx: float = 0, retry_after: float = 1, seed: Optional[int] = None,
+                 webhook_jitter_ms: float = 0, webhook_dupes: float = 0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self.retry_after = retry_after
+        self.webhook_jitter = webhook_jitter_ms / 1000
+        self.webhook_dupes = webhook_dupes
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def draw(self) -> Tuple[float, Optional[int]]:
+        """(delay seconds, injected status or None) for one request."""
+        with self.lock:
+            delay = self.latency + self.rng.random() * self.jitter
+            roll = self.rng.random()
+            status = self.rng.choice((500, 502, 503)) if roll < self.error_5xx else None
+            if status is None and roll < self.error_5xx + self.error_429:
+                status = 429
+        return delay, status
+
+
+# ============ WEBHOOKS ============
+class EventPusher:
+    """Pushes match and bet events to registered webhooks as the arena clock passes them."""
+
+    def __init__(self, state: ArenaState, faults: Faults, interval: float = 0.05):
+        self.state = state
+        self.faults = faults
+        self.interval = interval
+        self.last = state.clock.now()
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Webhook push failed: {e}")
+
+    def tick(self):
+        state, clock = self.state, self.state.clock
+        now = clock.now()
+        if not state.webhooks:
+            self.last = now
+            return
+        events = []
+        first = arena_sim.current_match_id(self.last - arena_sim.MATCH_TIME) - 1
+        for mid in range(first, arena_sim.current_match_id(now) + 1):
+            times = arena_sim.match_times(mid)
+            if self.last < times["startsAt"] <= now:
+                events.append((None, {"event": "match.started", "matchId": f"SAVAGE-{mid}",
+                                      "timestamp": int(clock.to_real(times["startsAt"]))}))
+            if self.last < times["endsAt"] <= now:
+                events.append((None, {"event": "match.ended", "matchId": f"SAVAGE-{mid}",
+                                      "winner": arena_sim.match_winner(mid),
+                                      "timestamp": int(clock.to_real(times["endsAt"]))}))
+        self.last = now
+        with state.lock:
+            state.settle_ended()
+            settled, state.unsent = state.unsent, []
+            hooks = list(state.webhooks.items())
+        for bet in settled:
+            events.append((bet["agentId"], {"event": "bet.settled", "betId": bet["id"], "matchId": bet["matchId"],
+                                            "status": bet["status"], "payout": round(bet["payout"], 2)}))
+
+        for agent_id, event in events:
+            for url, hook in hooks:
+                if event["event"] in hook["events"] and agent_id in (None, hook["agentId"]):
+                    copies = 2 if self.faults.rng.random() < self.faults.webhook_dupes else 1
+                    for _ in range(copies):
+                        threading.Thread(target=self.deliver, args=(url, event), daemon=True).start()
+
+    def deliver(self, url: str, event: Dict):
+        time.sleep(self.faults.rng.random() * self.faults.webhook_jitter)
+        request = urllib.request.Request(url, data=json.dumps(event).encode(), method="POST",
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=5) as resp:
+                resp.read()
+            self.state.count("webhooks_sent")
+        except Exception as e:
+            self.state.count("webhooks_failed")
+            logger.debug(f"Webhook {event['event']} to {url} failed: {e}")
+
+
+# ============ HTTP ============
+def make_handler(state: ArenaState, faults: Faults):
+    clock = state.clock
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Access-Control-Allow-Origin", "*")
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def agent_id(self, body: Optional[Dict] = None) -> Optional[str]:
+            auth = self.headers.get("Authorization", "")
+            return (self.headers.get("X-Agent-Id") or (body.get("agentId") if isinstance(body, dict) else None)
+                    or (auth[7:] if auth.startswith("Bearer ") else None))
+
+        def inject(self) -> bool:
+            """Apply latency and maybe answer with an injected error. True if handled."""
+            state.count("requests")
+            delay, status = faults.draw()
+            if delay:
+                time.sleep(delay)
+            if status is None:
+                return False
+            state.count(f"injected_{status}")
+            if status == 429:
+                self.send_json(429, {"error": "Rate limited"}, {"Retry-After": f"{faults.retry_after:g}"})
+            else:
+                self.send_json(status, {"error": "Internal server error"})
+            return True
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == "/api/_stats":
+                self.send_json(200, {**state.snapshot_stats(), "arena_time": clock.now(), "speed": clock.speed,
+                                     "current_match": arena_sim.current_match_id(clock.now())})
+                return
+            if self.inject():
+                return
+
+            if path == "/api/match/current":
+                now = clock.now()
+                mid = arena_sim.current_match_id(now)
+                match = arena_sim.generate_match(mid, now_ms=now)
+                for key in ("bettingEndsAt", "startsAt", "endsAt"):
+                    match[key] = int(clock.to_real(match[key]))
+                self.send_json(200, match)
+            elif RESULT_PATH.match(path):
+                try:
+                    mid = arena_sim.parse_match_id(RESULT_PATH.match(path).group(1))
+                except ValueError:
+                    self.send_json(400, {"error": "Invalid match ID"})
+                    return
+                self.send_json(200, arena_sim.match_result(mid))
+            elif path == "/api/balance":
+                self.send_json(200, state.agent_balance(self.agent_id() or "anonymous"))
+            else:
+                self.send_json(404, {"error": "Not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            if self.inject():
+                return
+            path = urlparse(self.path).path
+            if path not in ("/api/bet", "/api/webhooks/register"):
+                self.send_json(404, {"error": "Not found"})
+                return
+            try:
+                body = json.loads(raw or b"{}")
+            except ValueError:
+                self.send_json(400, {"error": "Invalid JSON"})
+                return
+            if not isinstance(body, dict):
+                self.send_json(400, {"error": "Invalid bet format" if path == "/api/bet" else "url required"})
+                return
+            agent_id = self.agent_id(body)
+            if not agent_id:
+                self.send_json(400, {"error": "agentId required", "hint": "Pass in body or as X-Agent-Id header"})
+                return
+            if path == "/api/webhooks/register":
+                status, payload = state.register_webhook(agent_id, body)
+            else:
+                status, payload = state.place_bet(agent_id, body)
+            self.send_json(status, payload)
+
+        def log_message(self, fmt, *args):
+            logger.debug(fmt % args)
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8787, speed: float = 1.0, faults: Optional[Faults] = None,
+          start_balance: float = DEFAULT_BALANCE, background: bool = False) -> ThreadingHTTPServer:
+    """Start the server; with background=True it runs on a daemon thread and returns."""
+    state = ArenaState(ArenaClock(speed), start_balance)
+    faults = faults or Faults()
+    server = ThreadingHTTPServer((host, port), make_handler(state, faults))
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=EventPusher(state, faults).run, name="arena-webhooks", daemon=True).start()
+    if background:
+        threading.Thread(target=server.serve_forever, name="arena-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Savage Arena API with an accelerated clock")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--speed", type=float, default=1.0, help="Arena seconds per wall-clock second")
+    parser.add_argument("--balance", type=float, default=DEFAULT_BALANCE, help="Starting balance per agent")
+    parser.add_argument("--latency", type=float, default=0, help="Added latency per request (ms)")
+    parser.add_argument("--jitter", type=float, default=0, help="Extra random latency up to this (ms)")
+    parser.add_argument("--error-429", type=float, default=0, help="Share of requests answered 429")
+    parser.add_argument("--error-5xx", type=float, default=0, help="Share of requests answered 5xx")
+    parser.add_argument("--retry-after", type=float, default=1, help="Retry-After seconds on injected 429s")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for fault injection")
+    parser.add_argument("--webhook-jitter", type=float, default=0, help="Random delay per webhook delivery (ms)")
+    parser.add_argument("--webhook-dupes", type=float, default=0, help="Share of webhook events delivered twice")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    faults = Faults(args.latency, args.jitter, args.error_429, args.error_5xx, args.retry_after, args.seed,
+                    args.webhook_jitter, args.webhook_dupes)
+    server = serve(args.host, args.port, args.speed, faults, args.balance)
+    logger.info(f"🏟️ Local arena on http://{args.host}:{server.server_port} at {args.speed:g}x "
+                f"(match every {arena_sim.MATCH_INTERVAL / 1000 / args.speed:.1f}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stats = server.state.snapshot_stats()
+        print(json.dumps(stats, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Savage Arena Local Simulator
+
+Bit-exact Python port of the arena's deterministic match generator
+(api/match/current.js -> generateMatch) and battle engine
+(api/match/[id]/result.js -> simulateBattle). Everything is derived from
+the match ID, so the agent can know a match's teams, odds and winner
+without touching the network.
+
+Usage:
+    python arena_sim.py 1234            # print match + result summary
+    python arena_sim.py --verify        # check against JS golden vectors
+    python arena_sim.py --bench 2000    # simulated matches per second
+
+The golden vectors in golden/vectors.json are produced by running the
+real JS handlers (see golden/make_golden.mjs).
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+from typing import Dict, List, Optional, Union
+
+# ============ ARENA CONSTANTS ============
+TEAM_SIZE = 5
+BET_WINDOW = 60000        # ms
+MATCH_INTERVAL = 300000   # ms (5 minutes)
+MATCH_TIME = 240000       # ms (4 minute battle)
+TICK_MS = 100
+EPOCH_MS = 1767225600000  # 2026-01-01T00:00:00Z
+
+FIGHTERS = [
+    {"id": 1, "name": "Crocus III", "hp": 380, "atk": 22, "def": 14, "spd": 0.9, "role": "Tank"},
+    {"id": 2, "name": "Frostfang", "hp": 290, "atk": 28, "def": 8, "spd": 1.1, "role": "Berserker"},
+    {"id": 3, "name": "Flamekeeper", "hp": 250, "atk": 24, "def": 10, "spd": 0.85, "role": "Mage"},
+    {"id": 4, "name": "Destroyer", "hp": 340, "atk": 25, "def": 12, "spd": 1.0, "role": "Berserker"},
+    {"id": 5, "name": "Venomous", "hp": 320, "atk": 26, "def": 11, "spd": 1.25, "role": "Rogue"},
+    {"id": 6, "name": "Torch", "hp": 260, "atk": 30, "def": 6, "spd": 1.2, "role": "Mage"},
+    {"id": 7, "name": "Duelist", "hp": 350, "atk": 23, "def": 13, "spd": 0.9, "role": "Tank"},
+    {"id": 8, "name": "Grimclaw", "hp": 420, "atk": 24, "def": 14, "spd": 0.8, "role": "Tank"},
+    {"id": 9, "name": "Ashwalker", "hp": 280, "atk": 26, "def": 9, "spd": 1.2, "role": "Berserker"},
+    {"id": 10, "name": "Dreadfroth", "hp": 240, "atk": 32, "def": 5, "spd": 1.25, "role": "Rogue"},
+    {"id": 11, "name": "Shadowmere", "hp": 260, "atk": 28, "def": 7, "spd": 1.15, "role": "Rogue"},
+    {"id": 12, "name": "Ironscale", "hp": 300, "atk": 27, "def": 10, "spd": 1.1, "role": "Berserker"},
+    {"id": 13, "name": "Frostmage", "hp": 280, "atk": 22, "def": 12, "spd": 0.75, "role": "Mage"},
+    {"id": 14, "name": "Minotaur", "hp": 480, "atk": 28, "def": 10, "spd": 0.9, "role": "Tank"},
+    {"id": 15, "name": "Assassin", "hp": 240, "atk": 30, "def": 6, "spd": 1.3, "role": "Rogue"},
+    {"id": 16, "name": "Ursa", "hp": 450, "atk": 22, "def": 16, "spd": 0.75, "role": "Tank"},
+    {"id": 17, "name": "Flamebear", "hp": 400, "atk": 26, "def": 12, "spd": 0.8, "role": "Berserker"},
+    {"id": 18, "name": "Champion", "hp": 360, "atk": 24, "def": 13, "spd": 0.85, "role": "Tank"},
+    {"id": 19, "name": "Shadowrat", "hp": 220, "atk": 34, "def": 4, "spd": 1.3, "role": "Rogue"},
+    {"id": 20, "name": "Rotscale", "hp": 300, "atk": 27, "def": 9, "spd": 1.1, "role": "Berserker"},
+    {"id": 21, "name": "Voidcoon", "hp": 280, "atk": 24, "def": 10, "spd": 1.1, "role": "Mage"},
+    {"id": 22, "name": "Paladin", "hp": 380, "atk": 24, "def": 14, "spd": 1.0, "role": "Paladin"},
+    {"id": 23, "name": "Necro", "hp": 250, "atk": 26, "def": 8, "spd": 1.05, "role": "Necro"},
+    {"id": 24, "name": "Mindcroc", "hp": 300, "atk": 22, "def": 12, "spd": 0.8, "role": "Controller"},
+    {"id": 25, "name": "Priest", "hp": 290, "atk": 20, "def": 10, "spd": 1.1, "role": "Cleric"},
+    {"id": 26, "name": "Cosmic", "hp": 320, "atk": 26, "def": 12, "spd": 1.1, "role": "Mage"},
+    {"id": 27, "name": "Raging Bull", "hp": 500, "atk": 30, "def": 10, "spd": 0.85, "role": "Berserker"},
+    {"id": 28, "name": "Nightblade", "hp": 200, "atk": 38, "def": 3, "spd": 1.4, "role": "Rogue"},
+    {"id": 29, "name": "Serpent", "hp": 310, "atk": 26, "def": 10, "spd": 1.05, "role": "Berserker"},
+    {"id": 30, "name": "Bonelord", "hp": 270, "atk": 24, "def": 9, "spd": 1.0, "role": "Necro"},
+]
+
+TEAMS = [
+    {"name": "Crimson Horde", "color": "#DC143C"},
+    {"name": "Azure Arcanum", "color": "#4169E1"},
+    {"name": "Emerald Rangers", "color": "#228B22"},
+    {"name": "Shadow Guild", "color": "#8B008B"},
+    {"name": "Golden Order", "color": "#FF8C00"},
+]
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "vectors.json")
+
+
+# ============ SEEDED RNG ============
+def _int32(x: int) -> int:
+    """JS ToInt32 for an integer value."""
+    x &= 0xFFFFFFFF
+    return x - 0x100000000 if x & 0x80000000 else x
+
+
+class SeededRNG:
+    """
+    The arena's LCG. The JS multiply happens in float64, so the product
+    (up to ~2^61) is rounded before the 32-bit mask - we do the same.
+    """
+
+    def __init__(self, seed: str):
+        self.seed = self.hash(seed)
+
+    @staticmethod
+    def hash(s: str) -> int:
+        h = 0
+        for ch in s:
+            h = (_int32(h << 5) - h + ord(ch)) & 0x7FFFFFFF
+        return h or 1
+
+    def next(self) -> float:
+        self.seed = int(self.seed * 1103515245.0 + 12345.0) & 0x7FFFFFFF
+        return self.seed / 0x7FFFFFFF
+
+    def int(self, a: int, b: int) -> int:
+        return math.floor(self.next() * (b - a + 1)) + a
+
+    def shuffle(self, arr: List) -> List:
+        result = list(arr)
+        for i in range(len(result) - 1, 0, -1):
+            j = math.floor(self.next() * (i + 1))
+            result[i], result[j] = result[j], result[i]
+        return result
+
+
+# ============ MATCH GENERATION ============
+def parse_match_id(match_id: Union[int, str]) -> int:
+    """Accept 1234, "1234" or "SAVAGE-1234"."""
+    if isinstance(match_id, int):
+        return match_id
+    return int(str(match_id).replace("SAVAGE-", ""))
+
+
+def calc_power(fighters: List[Dict]) -> float:
+    total = 0
+    for f in fighters:
+        total = total + f["hp"] * 0.3 + f["atk"] * 2 + f["def"] * 1.5 + f["spd"] * 20
+    return total
+
+
+def _js_round(x: float) -> int:
+    """Math.round - halves go towards +infinity."""
+    r = math.floor(x)
+    return r + 1 if x - r >= 0.5 else r
+
+
+def calc_odds(a: List[Dict], b: List[Dict]) -> Dict[str, float]:
+    pa, pb = calc_power(a), calc_power(b)
+    t = pa + pb
+    return {
+        "A": max(1.1, _js_round((t / pa) * 0.95 * 100) / 100),
+        "B": max(1.1, _js_round((t / pb) * 0.95 * 100) / 100),
+    }
+
+
+def match_times(match_id: int) -> Dict[str, int]:
+    """Betting close / start / end timestamps (ms) for a match."""
+    starts_at = EPOCH_MS + match_id * MATCH_INTERVAL
+    return {
+        "bettingEndsAt": starts_at,
+        "startsAt": starts_at,
+        "endsAt": starts_at + MATCH_TIME,
+    }
+
+
+def current_match_id(now_ms: Optional[float] = None) -> int:
+    """Match ID served by /api/match/current at `now_ms`."""
+    if now_ms is None:
+        now_ms = time.time() * 1000
+    return math.floor((now_ms - EPOCH_MS) / MATCH_INTERVAL) + 1
+
+
+def match_status(match_id: int, now_ms: Optional[float] = None) -> str:
+    if now_ms is None:
+        now_ms = time.time() * 1000
+    t = match_times(match_id)
+    if now_ms < t["bettingEndsAt"]:
+        return "betting"
+    if now_ms < t["endsAt"]:
+        return "live"
+    return "ended"
+
+
+def draw_teams(match_id: Union[int, str]):
+    """Fighter and team-template draw shared by generateMatch and simulateBattle."""
+    rng = SeededRNG(f"SAVAGE-{parse_match_id(match_id)}")
+    shuffled = rng.shuffle(FIGHTERS)
+    templates = rng.shuffle(TEAMS)
+    return shuffled[:TEAM_SIZE], shuffled[TEAM_SIZE:TEAM_SIZE * 2], templates, rng
+
+
+def generate_match(match_id: Union[int, str], now_ms: Optional[float] = None) -> Dict:
+    """Python equivalent of generateMatch() - same payload as /api/match/current."""
+    mid = parse_match_id(match_id)
+    team_a, team_b, templates, _ = draw_teams(mid)
+    times = match_times(mid)
+
+    return {
+        "matchId": f"SAVAGE-{mid}",
+        "seed": f"SAVAGE-{mid}",
+        "status": match_status(mid, now_ms),
+        "bettingEndsAt": times["bettingEndsAt"],
+        "startsAt": times["startsAt"],
+        "endsAt": times["endsAt"],
+        "teamA": {
+            "name": templates[0]["name"],
+            "color": templates[0]["color"],
+            "fighters": team_a,
+            "totalPower": calc_power(team_a),
+        },
+        "teamB": {
+            "name": templates[1]["name"],
+            "color": templates[1]["color"],
+            "fighters": team_b,
+            "totalPower": calc_power(team_b),
+        },
+        "odds": calc_odds(team_a, team_b),
+    }
+
+
+# ============ BATTLE SIMULATION ============
+def simulate_battle(match_id: Union[int, str], with_log: bool = True) -> Dict:
+    """
+    Python equivalent of simulateBattle(). Pass with_log=False to skip
+    building the battle log when only the outcome is needed.
+    """
+    mid = parse_match_id(match_id)
+    seed = f"SAVAGE-{mid}"
+    fighters_a, fighters_b, templates, rng = draw_teams(mid)
+
+    team_a = [dict(f, maxHp=f["hp"], alive=True, team="A") for f in fighters_a]
+    team_b = [dict(f, maxHp=f["hp"], alive=True, team="B") for f in fighters_b]
+
+    battle_log = [] if with_log else None
+    t = 0
+    winner = None
+
+    while t < MATCH_TIME:
+        alive_a = [f for f in team_a if f["alive"]]
+        alive_b = [f for f in team_b if f["alive"]]
+
+        if not alive_a:
+            winner = "B"
+            break
+        if not alive_b:
+            winner = "A"
+            break
+
+        # Every fighter alive at the start of the tick swings, even if it
+        # dies mid-tick, and targets come from the start-of-tick lists.
+        for f in alive_a + alive_b:
+            enemies = alive_b if f["team"] == "A" else alive_a
+
+            target = enemies[rng.int(0, len(enemies) - 1)]
+            if rng.next() < 0.65 + f["spd"] * 0.1:
+                dmg = f["atk"] + rng.int(-3, 5)
+                crit = rng.next() < 0.1
+                if crit:
+                    dmg = math.floor(dmg * 1.8)
+                dmg = max(1, dmg - math.floor(target["def"] * 0.3))
+                target["hp"] -= dmg
+
+                if with_log:
+                    battle_log.append({"time": t, "type": "attack", "attacker": f["name"],
+                                       "target": target["name"], "damage": dmg, "crit": crit})
+
+                if target["hp"] <= 0:
+                    target["hp"] = 0
+                    target["alive"] = False
+                    if with_log:
+                        battle_log.append({"time": t, "type": "kill", "killer": f["name"],
+                                           "victim": target["name"]})
+
+        t += TICK_MS
+
+    # Time ran out
+    if not winner:
+        n_a = sum(1 for f in team_a if f["alive"])
+        n_b = sum(1 for f in team_b if f["alive"])
+        if n_a > n_b:
+            winner = "A"
+        elif n_b > n_a:
+            winner = "B"
+        else:
+            hp_a = sum(f["hp"] for f in team_a)
+            hp_b = sum(f["hp"] for f in team_b)
+            winner = "A" if hp_a >= hp_b else "B"
+
+    def summarize(team, template):
+        return {
+            "name": template["name"],
+            "fighters": [{"id": f["id"], "name": f["name"], "finalHp": f["hp"], "alive": f["alive"]}
+                         for f in team],
+            "alive": sum(1 for f in team if f["alive"]),
+            "totalHp": sum(f["hp"] for f in team),
+        }
+
+    result = {
+        "seed": seed,
+        "winner": winner,
+        "duration": t,
+        "teamA": summarize(team_a, templates[0]),
+        "teamB": summarize(team_b, templates[1]),
+    }
+    if with_log:
+        result["battleLog"] = battle_log
+    return result
+
+
+def match_result(match_id: Union[int, str]) -> Dict:
+    """Same payload as GET /api/match/{id}/result."""
+    mid = parse_match_id(match_id)
+    return {"matchId": f"SAVAGE-{mid}", "status": "ended", **simulate_battle(mid)}
+
+
+def match_winner(match_id: Union[int, str]) -> str:
+    """
+    'A' or 'B' - cheapest path to a settlement answer. Same RNG stream as
+    simulate_battle, with the LCG inlined and fighters kept in flat lists.
+    """
+    team_a, team_b, _, rng = draw_teams(match_id)
+    fighters = team_a + team_b
+    hp = [f["hp"] for f in fighters]
+    atk = [f["atk"] for f in fighters]
+    hit = [0.65 + f["spd"] * 0.1 for f in fighters]
+    mit = [math.floor(f["def"] * 0.3) for f in fighters]
+    side_a, side_b = range(TEAM_SIZE), range(TEAM_SIZE, 2 * TEAM_SIZE)
+    seed = rng.seed
+    floor = math.floor
+
+    t = 0
+    while t < MATCH_TIME:
+        alive_a = [i for i in side_a if hp[i] > 0]
+        alive_b = [i for i in side_b if hp[i] > 0]
+        if not alive_a:
+            return "B"
+        if not alive_b:
+            return "A"
+
+        for i in alive_a + alive_b:
+            enemies = alive_b if i < TEAM_SIZE else alive_a
+            seed = int(seed * 1103515245.0 + 12345.0) & 0x7FFFFFFF
+            target = enemies[floor(seed / 0x7FFFFFFF * len(enemies))]
+            seed = int(seed * 1103515245.0 + 12345.0) & 0x7FFFFFFF
+            if seed / 0x7FFFFFFF < hit[i]:
+                seed = int(seed * 1103515245.0 + 12345.0) & 0x7FFFFFFF
+                dmg = atk[i] + floor(seed / 0x7FFFFFFF * 9) - 3
+                seed = int(seed * 1103515245.0 + 12345.0) & 0x7FFFFFFF
+                if seed / 0x7FFFFFFF < 0.1:
+                    dmg = floor(dmg * 1.8)
+                hp[target] -= max(1, dmg - mit[target])
+                if hp[target] <= 0:
+                    hp[target] = 0
+        t += TICK_MS
+
+    n_a = sum(1 for i in side_a if hp[i] > 0)
+    n_b = sum(1 for i in side_b if hp[i] > 0)
+    if n_a != n_b:
+        return "A" if n_a > n_b else "B"
+    return "A" if sum(hp[:TEAM_SIZE]) >= sum(hp[TEAM_SIZE:]) else "B"
+
+
+# ============ GOLDEN VECTORS ============
+def _strip_status(match: Dict) -> Dict:
+    return {k: v for k, v in match.items() if k != "status"}
+
+
+def verify_golden(path: str = GOLDEN_PATH) -> List[str]:
+    """
+    Compare generate_match / simulate_battle against vectors recorded
+    from the JS handlers. Returns a list of mismatch descriptions.
+    """
+    with open(path) as fh:
+        golden = json.load(fh)
+
+    failures = []
+    for case in golden["hashes"]:
+        got = SeededRNG.hash(case["seed"])
+        if got != case["hash"]:
+            failures.append(f"hash({case['seed']!r}): {got} != {case['hash']}")
+
+    for case in golden["rng"]:
+        rng = SeededRNG(case["seed"])
+        got = [rng.next() for _ in range(len(case["values"]))]
+        if got != case["values"]:
+            failures.append(f"rng stream for {case['seed']!r} diverged")
+
+    for case in golden["matches"]:
+        mid = case["id"]
+        if _strip_status(generate_match(mid)) != case["match"]:
+            failures.append(f"generate_match({mid}) differs")
+        result = simulate_battle(mid, with_log="battleLog" in case["result"])
+        if result != case["result"]:
+            failures.append(f"simulate_battle({mid}) differs")
+        if match_winner(mid) != case["result"]["winner"]:
+            failures.append(f"match_winner({mid}) differs")
+
+    return failures
+
+
+# ============ CLI ============
+def main():
+    parser = argparse.ArgumentParser(description="Savage Arena local simulator")
+    parser.add_argument("match_id", nargs="?", help="Match ID to generate and simulate")
+    parser.add_argument("--verify", action="store_true", help="Check against JS golden vectors")
+    parser.add_argument("--bench", type=int, metavar="N", help="Simulate N matches and report throughput")
+    args = parser.parse_args()
+
+    if args.verify:
+        failures = verify_golden()
+        for f in failures:
+            print(f"FAIL {f}")
+        print("golden vectors: " + ("OK" if not failures else f"{len(failures)} failure(s)"))
+        sys.exit(1 if failures else 0)
+
+    if args.bench:
+        start = time.perf_counter()
+        for mid in range(1, args.bench + 1):
+            match_winner(mid)
+        elapsed = time.perf_counter() - start
+        print(f"{args.bench} matches in {elapsed:.2f}s ({args.bench / elapsed:.0f} matches/s)")
+        return
+
+    mid = parse_match_id(args.match_id) if args.match_id else current_match_id()
+    match = generate_match(mid)
+    result = simulate_battle(mid, with_log=False)
+    for side in ("teamA", "teamB"):
+        team = match[side]
+        names = ", ".join(f"{f['name']} ({f['role']})" for f in team["fighters"])
+        print(f"{side} {team['name']:<16} power {team['totalPower']:.1f} odds {match['odds'][side[-1]]:.2f}x: {names}")
+    print(f"{match['matchId']} [{match['status']}] winner: {result['winner']} "
+          f"after {result['duration'] / 1000:.1f}s ({result['teamA']['alive']}v{result['teamB']['alive']} alive)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Savage Arena Backtester
+
+Replays a range of match IDs through the same decision pipeline the live
+bot runs - score_teams -> select_bet -> calculate_wager -> settlement,
+with the stop-loss and consecutive-loss checks - without touching the
+network. Match payloads come from arena_sim.generate_match and outcomes
+from arena_sim's battle engine.
+
+Per-match analysis does not depend on the bankroll, so it is split into
+chunks across a process pool; the bankroll is then replayed sequentially
+in the parent, which is cheap.
+
+Usage:
+    python backtest.py                          # a year of matches from ID 1
+    python backtest.py --start 5000 --count 2000 --mc-replicates 2000
+    python backtest.py --workers 8 --equity-csv equity.csv
+    python backtest.py --compare savage_events.jsonl   # live decisions vs this pipeline
+"""
+
+import os
+import sys
+import csv
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import arena_sim
+import events
+from savage_trader import (
+    Config,
+    monte_carlo,
+    score_teams,
+    select_bet,
+    calculate_wager,
+    book_settlement,
+    new_session_stats,
+    stop_reason,
+    winner_index,
+    ANALYSIS_KEYS,
+    add_risk_args,
+    config_from_args,
+)
+
+MATCHES_PER_YEAR = 365 * 24 * 3600 * 1000 // arena_sim.MATCH_INTERVAL
+DEFAULT_BALANCE = 1000.0  # Arena demo starting balance
+
+
+# ============ ANALYSIS (PARALLEL) ============
+def analyze_chunk(task: Tuple[int, int, Config]) -> List[Dict]:
+    """Score and settle matches [start, stop). Runs in a worker process."""
+    start, stop, config = task
+    ids = range(start, stop)
+    matches = [arena_sim.generate_match(mid, now_ms=0) for mid in ids]
+
+    # One batched simulation for the whole chunk instead of one per match
+    win_probs = [None] * len(matches)
+    if monte_carlo is not None and config.mc_replicates > 0:
+        estimates = monte_carlo.estimate_win_probs(matches, n=config.mc_replicates, seed=start)
+        win_probs = [[e["p_a"], e["p_b"]] for e in estimates]
+
+    records = []
+    for mid, match, probs in zip(ids, matches, win_probs):
+        analyses = score_teams(match, config, probs)
+        records.append({
+            "match_id": mid,
+            "analyses": [{k: a[k] for k in ANALYSIS_KEYS} for a in analyses],
+            "winner": winner_index(arena_sim.match_winner(mid)),
+        })
+    return records
+
+
+def analyze_range(
+    start: int,
+    count: int,
+    config: Config,
+    workers: int = 1,
+    chunk_size: int = 2000
+) -> List[Dict]:
+    """Per-match analysis records for `count` matches from `start`, in ID order."""
+    tasks = [(lo, min(lo + chunk_size, start + count), config)
+             for lo in range(start, start + count, chunk_size)]
+    if workers <= 1:
+        chunks = map(analyze_chunk, tasks)
+        return [r for chunk in chunks for r in chunk]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [r for chunk in pool.map(analyze_chunk, tasks) for r in chunk]
+
+
+# ============ BANKROLL REPLAY ============
+def replay(records: List[Dict], config: Config, start_balance: float = DEFAULT_BALANCE) -> Dict:
+    """
+    Walk the bankroll through the records exactly as SavageTrader.run_once
+    would: check stop conditions, pick, size, place, settle.
+    """
+    stats = new_session_stats(start_balance)
+    balance = start_balance
+    equity = [balance]
+    stopped: Optional[Tuple[int, str]] = None
+
+    for rec in records:
+        reason = stop_reason(stats, balance, config)
+        if reason:
+            stopped = (rec["match_id"], reason)
+            break
+
+        pick = select_bet(rec["analyses"], config)
+        if pick and pick["confidence"] >= config.min_confidence:
+            wager = calculate_wager(balance, pick["confidence"], pick["odds"], config)
+            stats["bets_placed"] += 1
+            stats["total_wagered"] += wager
+            balance -= wager
+            balance += book_settlement(stats, wager, pick["odds"], pick["team_idx"] == rec["winner"])
+
+        equity.append(balance)
+
+    return summarize(stats, equity, len(records), stopped)
+
+
+def max_drawdown(equity: List[float]) -> float:
+    """Largest peak-to-trough drop as a fraction of the peak."""
+    peak, worst = equity[0], 0.0
+    for value in equity:
+        peak = max(peak, value)
+        if peak > 0:
+            worst = max(worst, 1 - value / peak)
+    return worst
+
+
+def summarize(stats: Dict, equity: List[float], matches: int, stopped: Optional[Tuple[int, str]]) -> Dict:
+    start, final = equity[0], equity[-1]
+    profit = final - start
+    return {
+        "matches": matches,
+        "matches_replayed": len(equity) - 1,
+        "bets": stats["bets_placed"],
+        "wins": stats["bets_won"],
+        "losses": stats["bets_lost"],
+        "win_rate": stats["bets_won"] / stats["bets_placed"] if stats["bets_placed"] else 0,
+        "total_wagered": stats["total_wagered"],
+        "start_balance": start,
+        "final_balance": final,
+        "profit": profit,
+        "roi": profit / stats["total_wagered"] if stats["total_wagered"] else 0,
+        "return_pct": profit / start if start else 0,
+        "max_drawdown": max_drawdown(equity),
+        "stopped": stopped,
+        "equity": equity,
+    }
+
+
+# ============ LIVE COMPARISON ============
+def compare_live(live: List[Dict], config: Config) -> Dict:
+    """
+    Re-run the pipeline on the matches a live bot decided on and count
+    where the simulated pick differs from what the bot chose.
+    """
+    report = {"matches": len(live), "same_pick": 0, "live_only": 0, "sim_only": 0, "different_team": 0,
+              "live_bets": 0, "live_wins": 0, "sim_wins_on_live_bets": 0, "diffs": []}
+    for rec in live:
+        mid = rec["match_id"]
+        analyses = score_teams(arena_sim.generate_match(mid, now_ms=0), config)
+        pick = select_bet(analyses, config)
+        sim_idx = pick["team_idx"] if pick and pick["confidence"] >= config.min_confidence else None
+        live_idx = rec["pick"]
+        winner = rec["winner"] if rec["winner"] is not None else winner_index(arena_sim.match_winner(mid))
+
+        if rec["placed"]:
+            report["live_bets"] += 1
+            report["live_wins"] += rec["won"] is True
+            report["sim_wins_on_live_bets"] += live_idx == winner
+        if sim_idx == live_idx:
+            report["same_pick"] += 1
+            continue
+        key = "live_only" if sim_idx is None else "sim_only" if live_idx is None else "different_team"
+        report[key] += 1
+        report["diffs"].append((mid, live_idx, sim_idx, winner))
+    return report
+
+
+def print_comparison(report: Dict, limit: int = 20):
+    print(f"""
+========== LIVE VS SIMULATED ==========
+Matches: {report['matches']}
+Same decision: {report['same_pick']}
+Live bet, sim skipped: {report['live_only']}
+Sim bet, live skipped: {report['sim_only']}
+Different team: {report['different_team']}
+Live bets settled as won: {report['live_wins']} / {report['live_bets']} (engine says {report['sim_wins_on_live_bets']})
+=======================================""")
+    for mid, live_idx, sim_idx, winner in report["diffs"][:limit]:
+        print(f"SAVAGE-{mid}: live {live_idx} / sim {sim_idx} / winner {winner}")
+
+
+# ============ CLI ============
+def print_report(report: Dict, currency: str = "SAVAGE"):
+    stopped = report["stopped"]
+    print(f"""
+========== BACKTEST ==========
+Matches: {report['matches_replayed']} / {report['matches']}
+Bets: {report['bets']} ({report['wins']}W / {report['losses']}L)
+Win Rate: {report['win_rate']:.1%}
+Total Wagered: {report['total_wagered']:.2f} {currency}
+Balance: {report['start_balance']:.2f} -> {report['final_balance']:.2f} {currency}
+Profit: {report['profit']:+.2f} {currency} ({report['roi']:+.1%} ROI, {report['return_pct']:+.1%} return)
+Max Drawdown: {report['max_drawdown']:.1%}
+Stopped: {f'match {stopped[0]} - {stopped[1]}' if stopped else 'no'}
+==============================""")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay arena matches through the SavageTrader pipeline")
+    parser.add_argument("--start", type=int, default=1, help="First match ID")
+    parser.add_argument("--count", type=int, default=MATCHES_PER_YEAR, help="Number of matches")
+    parser.add_argument("--balance", type=float, default=DEFAULT_BALANCE, help="Starting bankroll")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--equity-csv", help="Write the equity curve to this CSV file")
+    parser.add_argument("--compare", metavar="EVENTS", help="Compare a live JSONL event log against the pipeline")
+    parser.add_argument("--strategy", help="With --compare, the multi_runner strategy to compare")
+    add_risk_args(parser, mc_replicates=0)
+    args = parser.parse_args()
+
+    config = config_from_args(args)
+
+    if args.compare:
+        live = events.backtest_records(events.load(args.compare), args.strategy)
+        print_comparison(compare_live(live, config))
+        return
+
+    t0 = time.perf_counter()
+    records = analyze_range(args.start, args.count, config, args.workers, args.chunk_size)
+    t1 = time.perf_counter()
+    report = replay(records, config, args.balance)
+    t2 = time.perf_counter()
+
+    print_report(report, config.currency)
+    print(f"Analysis {t1 - t0:.2f}s ({args.workers} worker(s)), replay {t2 - t1:.2f}s", file=sys.stderr)
+
+    if args.equity_csv:
+        with open(args.equity_csv, "w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["step", "match_id", "balance"])
+            for i, value in enumerate(report["equity"]):
+                writer.writerow([i, args.start + i - 1 if i else "", f"{value:.2f}"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Async, pipelined Bankr Bot client.
+
+Many jobs can be in flight at once. Every client on an event loop shares
+that loop's pooled httpx.AsyncClient (HTTP/2 when the `h2` package is
+installed) - a pool is bound to the loop that opened it - and each
+job is polled with a backoff that starts fast and stretches out. The
+first poll is timed from recent completion latencies. Per-job timings
+are kept for latency stats.
+
+BackgroundLoop runs the client on its own event-loop thread so the
+synchronous trading loop can hand jobs off and collect concurrent
+futures instead of blocking for tens of seconds.
+"""
+
+import re
+import time
+import asyncio
+import logging
+import weakref
+import threading
+import statistics
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Coroutine, Deque, Dict, List, Optional
+
+import httpx
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+_shared_http: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+    weakref.WeakKeyDictionary()
+
+
+def shared_http_client() -> httpx.AsyncClient:
+    """One pooled connection set for every AsyncBankrClient on the running loop."""
+    loop = asyncio.get_running_loop()
+    client = _shared_http.get(loop)
+    if client is None or client.is_closed:
+        client = _shared_http[loop] = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return client
+
+
+async def close_shared_http():
+    """Close the running loop's pooled client, if it opened one."""
+    client = _shared_http.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def parse_amount(text: str) -> Optional[float]:
+    """First number in a Bankr free-text answer ("1,234.5 SAVAGE" -> 1234.5)."""
+    numbers = re.findall(r'[\d,]+\.?\d*', text)
+    for n in numbers:
+        try:
+            return float(n.replace(',', ''))
+        except ValueError:
+            continue
+    return None
+
+
+@dataclass
+class JobRecord:
+    prompt: str
+    job_id: Optional[str] = None
+    submitted_at: float = field(default_factory=time.monotonic)
+    submit_latency: float = 0.0
+    finished_at: Optional[float] = None
+    polls: int = 0
+    status: str = "pending"
+
+    @property
+    def latency(self) -> Optional[float]:
+        return self.finished_at - self.submitted_at if self.finished_at else None
+
+
+class AsyncBankrClient:
+    """Async client for Bankr Bot API jobs."""
+
+    def __init__(
+        self,
+        api_key: str,
+        api_url: str = "https://api.bankr.bot",
+        http: Optional[httpx.AsyncClient] = None,
+        min_poll: float = 0.25,
+        max_poll: float = 4.0,
+        backoff: float = 1.5,
+        history: int = 500,
+    ):
+        self.api_key = api_key
+        self.api_url = api_url
+        self._http = http
+        self.min_poll = min_poll
+        self.max_poll = max_poll
+        self.backoff = backoff
+        self.jobs: Deque[JobRecord] = deque(maxlen=history)
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        return self._http or shared_http_client()
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    # ---- Jobs ----
+
+    async def submit_job(self, prompt: str, record: Optional[JobRecord] = None) -> Optional[str]:
+        """Submit a job to Bankr and return job ID."""
+        start = time.monotonic()
+        try:
+            resp = await self.http.post(f"{self.api_url}/agent/submit", json={"prompt": prompt},
+                                        headers=self.headers)
+            elapsed = time.monotonic() - start
+            metrics.observe("bankr_submit", elapsed)
+            if record:
+                record.submit_latency = elapsed
+            if resp.status_code == 200:
+                return resp.json().get("jobId")
+            metrics.count("api_errors", endpoint="bankr_submit", status=resp.status_code)
+            logger.error(f"Bankr submit failed: {resp.status_code}")
+            return None
+        except Exception as e:
+            metrics.count("api_errors", endpoint="bankr_submit", status=type(e).__name__)
+            logger.error(f"Bankr error: {e}")
+            return None
+
+    def first_poll_delay(self) -> float:
+        """Start polling a little before recent jobs have tended to finish."""
+        done = [j.latency for j in self.jobs if j.status == "completed" and j.latency]
+        if len(done) < 5:
+            return self.min_poll
+        early = statistics.quantiles(done, n=4)[0] * 0.8
+        return min(self.max_poll, max(self.min_poll, early))
+
+    async def poll_job(self, job_id: str, max_wait: float = 120,
+                       record: Optional[JobRecord] = None) -> Optional[Dict]:
+        """Poll job until complete, backing off between polls."""
+        deadline = time.monotonic() + max_wait
+        delay = self.first_poll_delay()
+        while True:
+            await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            if record:
+                record.polls += 1
+            try:
+                resp = await self.http.get(f"{self.api_url}/agent/job/{job_id}", headers=self.headers)
+                if resp.status_code == 200:
+                    data = resp.json()
+                    status = data.get("status")
+                    if status == "completed":
+                        return data
+                    elif status in ["failed", "cancelled"]:
+                        logger.error(f"Job {status}: {data.get('error')}")
+                        if record:
+                            record.status = status
+                        return None
+            except Exception as e:
+                metrics.count("api_errors", endpoint="bankr_poll", status=type(e).__name__)
+                logger.error(f"Poll error: {e}")
+            if time.monotonic() >= deadline:
+                break
+            delay = min(self.max_poll, delay * self.backoff)
+        logger.error("Job timed out")
+        if record:
+            record.status = "timeout"
+        return None
+
+    async def execute(self, prompt: str, max_wait: float = 120) -> Optional[Dict]:
+        """Submit and wait for completion."""
+        record = JobRecord(prompt=prompt)
+        self.jobs.append(record)
+        record.job_id = await self.submit_job(prompt, record)
+        if not record.job_id:
+            record.status = "submit_failed"
+            record.finished_at = time.monotonic()
+            return None
+        poll_start = time.monotonic()
+        result = await self.poll_job(record.job_id, max_wait, record)
+        record.finished_at = time.monotonic()
+        metrics.observe("bankr_poll", record.finished_at - poll_start)
+        if result is not None:
+            record.status = "completed"
+        return result
+
+    async def execute_many(self, prompts: List[str], max_wait: float = 120) -> List[Optional[Dict]]:
+        """Run several jobs concurrently."""
+        return await asyncio.gather(*(self.execute(p, max_wait) for p in prompts))
+
+    # ---- Convenience ----
+
+    async def get_balance(self, token: str = "SAVAGE", chain: str = "Base") -> Optional[float]:
+        """Get token balance via Bankr. None if it couldn't be read."""
+        result = await self.execute(f"What is my {token} balance on {chain}?")
+        if result and result.get("result"):
+            return parse_amount(str(result["result"]))
+        return None
+
+    async def transfer(self, to_address: str, amount: float, token: str = "SAVAGE") -> bool:
+        """Transfer tokens via Bankr."""
+        result = await self.execute(f"Send {amount} {token} to {to_address} on Base")
+        return result is not None and result.get("status") == "completed"
+
+    def latency_stats(self) -> Dict:
+        """Per-job latency summary over the recent history."""
+        done = [j for j in self.jobs if j.latency is not None]
+        latencies = sorted(j.latency for j in done)
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        by_status: Dict[str, int] = {}
+        for j in self.jobs:
+            by_status[j.status] = by_status.get(j.status, 0) + 1
+        return {
+            "jobs": len(self.jobs),
+            "in_flight": sum(1 for j in self.jobs if j.finished_at is None),
+            "by_status": by_status,
+            "p50": pct(0.50),
+            "p90": pct(0.90),
+            "p99": pct(0.99),
+            "mean": statistics.fmean(latencies) if latencies else 0.0,
+            "avg_polls": statistics.fmean(j.polls for j in done) if done else 0.0,
+            "avg_submit": statistics.fmean(j.submit_latency for j in done) if done else 0.0,
+        }
+
+
+class BackgroundLoop:
+    """An event loop on a daemon thread that synchronous code can submit coroutines to."""
+
+    def __init__(self, name: str = "bankr-loop"):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, coro: Coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self):
+        """Close the loop's pooled HTTP client, then stop the loop and its thread."""
+        if self.loop.is_running():
+            try:
+                self.submit(close_shared_http()).result(timeout=5)
+            except Exception as e:
+                logger.debug(f"Closing the HTTP pool failed: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
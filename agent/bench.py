@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Savage Arena Benchmarks
+
+Times the agent's analysis and simulation hot paths on fixed fixtures -
+match IDs drawn from a seeded RNG and generated with arena_sim, so every
+run measures the same inputs. Each stage runs in batches; the report has
+ops/sec plus p50/p99 per-op latency over the batches, and an end-to-end
+decisions/sec figure (payload -> score -> pick -> wager).
+
+Timings are min-of-N: every stage runs in several rounds, interleaved
+with a fixed pure-Python reference loop, and a stage's cost is its
+fastest batch (noise only ever adds time). --check compares each
+stage's cost relative to the reference measured in the same run against
+the same ratio in a stored baseline, so a slower machine, CPU frequency
+scaling or a busy neighbour moves both sides of the ratio together. The
+whole measurement repeats in --processes fresh interpreters and the
+median ratio is kept, since memory layout alone can shift a tight
+Python loop by a third from one process to the next. --check exits
+non-zero when a stage is more than --tolerance slower than the
+baseline; re-save it after an intended change with --save-baseline.
+
+Usage:
+    python bench.py                          # report
+    python bench.py --check                  # fail on regression vs bench_baseline.json
+    python bench.py --save-baseline          # record the current numbers
+    python bench.py --stages analyze_team,pick_best_team --seconds 2 --rounds 10
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import multiprocessing
+from typing import Callable, Dict, List, Optional
+
+import arena_sim
+import savage_trader as st
+from roster import RosterIndex
+
+try:
+    import monte_carlo
+    import board_pricer
+    import portfolio
+except ImportError:
+    monte_carlo = None
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+FIXTURE_SEED = 20260101
+FIXTURE_MATCHES = 500
+ROUNDS = 5     # Interleaved passes over the stages
+PROCESSES = 3  # Fresh interpreters the whole run repeats in
+BATCHES = 50   # Timed batches per stage, across all rounds
+
+
+# ============ FIXTURES ============
+def fixtures(seed: int = FIXTURE_SEED, count: int = FIXTURE_MATCHES) -> Dict:
+    rng = random.Random(seed)
+    ids = rng.sample(range(1, 1_000_000), count)
+    matches = [arena_sim.generate_match(mid, now_ms=0) for mid in ids]
+    teams = [team for m in matches for team in st.match_teams(m)]
+    return {
+        "ids": ids,
+        "matches": matches,
+        "teams": teams,
+        "plain_teams": [{"name": t["name"], "fighters": t["fighters"], "odds": t["odds"]} for t in teams],
+        "fighters": [f for t in teams for f in t["fighters"]],
+        "wagers": [(rng.uniform(50, 5000), rng.uniform(0.55, 0.95), rng.uniform(1.1, 3.0))
+                   for _ in range(count)],
+        "config": st.Config(mc_replicates=0),
+    }
+
+
+# ============ STAGES ============
+def _cycle(items: List) -> Callable:
+    """Next item on each call, wrapping around."""
+    state = {"i": 0}
+    n = len(items)
+
+    def nxt():
+        i = state["i"]
+        state["i"] = i + 1 if i + 1 < n else 0
+        return items[i]
+    return nxt
+
+
+def stage_table(fx: Dict) -> Dict[str, Callable[[], object]]:
+    """name -> zero-argument callable doing one op."""
+    config = fx["config"]
+    fighter, team, plain, match = (_cycle(fx["fighters"]), _cycle(fx["teams"]),
+                                   _cycle(fx["plain_teams"]), _cycle(fx["matches"]))
+    match_id, wager_args = _cycle(fx["ids"]), _cycle(fx["wagers"])
+
+    def decision():
+        m = match()
+        pick = st.select_bet(st.score_teams(m, config), config)
+        if pick and pick["confidence"] >= config.min_confidence:
+            st.calculate_wager(1000.0, pick["confidence"], pick["odds"], config)
+
+    # The same roster under the hand-tuned synergy table, to price the loaded table against it
+    _, _, synergy, diversity, _, aliases = st._HEURISTIC
+    handtuned = RosterIndex(st.ROSTER.fighters, st.calculate_fighter_power, synergy,
+                            role_aliases=aliases, diversity_bonus=diversity)
+
+    def wager():
+        balance, confidence, odds = wager_args()
+        return st.calculate_wager(balance, confidence, odds, config)
+
+    stages = {
+        "calculate_fighter_power": lambda: st.calculate_fighter_power(fighter()),
+        "calculate_team_synergy": lambda: st.calculate_team_synergy(plain()["fighters"]),
+        "team_synergy": lambda: st.ROSTER.team_synergy(team()["rows"]),
+        "team_synergy_handtuned": lambda: handtuned.team_synergy(team()["rows"]),
+        "analyze_team": lambda: st.analyze_team(team()),
+        "analyze_team_unindexed": lambda: st.analyze_team(plain()),
+        "pick_best_team": lambda: st.pick_best_team(match(), config),
+        "calculate_wager": wager,
+        "generate_match": lambda: arena_sim.generate_match(match_id(), now_ms=0),
+        "match_winner": lambda: arena_sim.match_winner(match_id()),
+        "simulate_battle": lambda: arena_sim.simulate_battle(match_id(), with_log=False),
+        "decision_e2e": decision,
+    }
+    if monte_carlo is not None:
+        stages["monte_carlo_1k"] = lambda: monte_carlo.estimate_win_probs([match_id()], n=1000, seed=1)
+        board = board_pricer.price_board(fx["matches"][0], n=4000, seed=1, keep_samples=True)
+        markets = [m for m in board["markets"] if m["type"] in board_pricer.BET_TYPES]
+        returns = portfolio.market_returns(markets, board["samples"])
+        stages["size_portfolio"] = lambda: portfolio.size_portfolio(1000.0, returns, config)
+    return stages
+
+
+def reference_work() -> int:
+    """Fixed pure-Python loop every stage is timed against."""
+    total = 0
+    for i in range(1000):
+        total += i * i % 7
+    return total
+
+
+def batch_size(fn: Callable, seconds: float) -> int:
+    """Ops per batch so one batch takes about `seconds`."""
+    n = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds / 2 or n >= 1 << 20:
+            return max(1, int(n * seconds / max(elapsed, 1e-9)))
+        n *= 2
+
+
+def time_batches(fn: Callable, per_batch: int, seconds: float, batches: int) -> List[float]:
+    """Per-op seconds of up to `batches` batches (at least 3) within about `seconds`."""
+    samples = []
+    deadline = time.perf_counter() + seconds
+    while len(samples) < 3 or (time.perf_counter() < deadline and len(samples) < batches):
+        start = time.perf_counter()
+        for _ in range(per_batch):
+            fn()
+        samples.append((time.perf_counter() - start) / per_batch)
+    return samples
+
+
+def summarize(samples: List[float], per_batch: int) -> Dict:
+    samples = sorted(samples)
+    return {
+        "ops_per_sec": 1 / samples[0],
+        "min_us": samples[0] * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[min(len(samples) - 1, int(0.99 * len(samples)))] * 1e6,
+        "ops": per_batch * len(samples),
+    }
+
+
+def run_process(stage_names: Optional[List[str]], seconds: float, rounds: int) -> Dict:
+    """
+    Time each stage for about `seconds` in total, split over `rounds`
+    passes that interleave every stage with reference_work. GC is off
+    while timing.
+    """
+    fx = fixtures()
+    stages = stage_table(fx)
+    names = stage_names or list(stages)
+    unknown = [n for n in names if n not in stages]
+    if unknown:
+        raise ValueError(f"Unknown stage(s) {unknown} (choose from {', '.join(stages)})")
+    timed = {"reference": reference_work, **{name: stages[name] for name in names}}
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        per_round = seconds / rounds
+        sizes = {name: batch_size(fn, seconds / BATCHES) for name, fn in timed.items()}
+        samples: Dict[str, List[float]] = {name: [] for name in timed}
+        for _ in range(rounds):
+            for name, fn in timed.items():
+                samples[name] += time_batches(fn, sizes[name], per_round, max(1, BATCHES // rounds))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    results = {name: summarize(samples[name], sizes[name]) for name in timed}
+    reference = results.pop("reference")
+    for r in results.values():
+        r["relative"] = r["min_us"] / reference["min_us"]
+    return {"reference_us": reference["min_us"], "stages": results}
+
+
+def run(stage_names: Optional[List[str]] = None, seconds: float = 1.0, rounds: int = ROUNDS,
+        processes: int = PROCESSES) -> Dict:
+    """run_process in `processes` fresh interpreters, one after another; per-stage medians."""
+    if processes <= 1:
+        runs = [run_process(stage_names, seconds, rounds)]
+    else:
+        with multiprocessing.get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+            runs = pool.starmap(run_process, [(stage_names, seconds, rounds)] * processes)
+
+    stages = {}
+    for name in runs[0]["stages"]:
+        per_run = [r["stages"][name] for r in runs]
+        stages[name] = {
+            "ops_per_sec": max(r["ops_per_sec"] for r in per_run),
+            "min_us": min(r["min_us"] for r in per_run),
+            "p50_us": statistics.median(r["p50_us"] for r in per_run),
+            "p99_us": statistics.median(r["p99_us"] for r in per_run),
+            "ops": sum(r["ops"] for r in per_run),
+            "relative": statistics.median(r["relative"] for r in per_run),
+        }
+    return {
+        "reference_us": statistics.median(r["reference_us"] for r in runs),
+        "rounds": rounds,
+        "processes": len(runs),
+        "python": platform.python_version(),
+        "stages": stages,
+    }
+
+
+# ============ BASELINE ============
+def slowdown(result: Dict, base: Dict) -> Optional[float]:
+    """How much slower a stage is than its baseline, relative to the reference (0.1 = 10% slower)."""
+    if "relative" not in base:
+        return None   # Baseline predates reference timing - re-save it
+    return result["relative"] / base["relative"] - 1
+
+
+def check(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Stages more than `tolerance` slower than the baseline, both measured against the reference loop."""
+    failures = []
+    for name, res in results["stages"].items():
+        base = baseline["stages"].get(name)
+        change = slowdown(res, base) if base else None
+        if change is not None and change > tolerance:
+            failures.append(f"{name}: {res['relative']:.3f} x reference vs {base['relative']:.3f} "
+                            f"({change:+.0%})")
+    return failures
+
+
+def print_report(results: Dict, baseline: Optional[Dict] = None):
+    print(f"{'stage':<26} {'ops/sec':>12} {'min us':>10} {'p50 us':>10} {'p99 us':>10} {'x ref':>8} {'vs base':>8}")
+    for name, r in results["stages"].items():
+        base = baseline["stages"].get(name) if baseline else None
+        change = slowdown(r, base) if base else None
+        delta = f"{change:+.0%}" if change is not None else ""
+        print(f"{name:<26} {r['ops_per_sec']:>12,.0f} {r['min_us']:>10.2f} {r['p50_us']:>10.1f} "
+              f"{r['p99_us']:>10.1f} {r['relative']:>8.3f} {delta:>8}")
+    e2e = results["stages"].get("decision_e2e")
+    if e2e:
+        print(f"End-to-end: {e2e['ops_per_sec']:,.0f} decisions/sec")
+    print(f"Reference loop {results['reference_us']:.1f} us; min of {results['rounds']} interleaved rounds, "
+          f"median of {results['processes']} processes", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agent's analysis and simulation hot paths")
+    parser.add_argument("--stages", help="Comma-separated stages (default: all)")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time budget per stage")
+    parser.add_argument("--rounds", type=int, default=ROUNDS, help="Interleaved passes over the stages")
+    parser.add_argument("--processes", type=int, default=PROCESSES, help="Fresh interpreters to repeat the run in")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a stage regresses past the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown for --check")
+    parser.add_argument("--json", help="Also write raw results to this file")
+    args = parser.parse_args()
+
+    results = run(args.stages.split(",") if args.stages else None, args.seconds, args.rounds, args.processes)
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+    print_report(results, baseline)
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+    if args.check:
+        if baseline is None:
+            parser.error(f"no baseline at {args.baseline} (run with --save-baseline first)")
+        failures = check(results, baseline, args.tolerance)
+        for f in failures:
+            print(f"REGRESSION {f}", file=sys.stderr)
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
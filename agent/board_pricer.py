@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Savage Arena Whole-Board Pricer
+
+api/odds.js quotes far more than the winner price: first blood, first
+eliminated, over/under props on total kills, match duration and crit
+count, plus place and exotic markets, each with its own house edge. This
+module prices all of them from one tracked Monte Carlo pass per matchup
+(monte_carlo.simulate with track=True), so every market comes from the
+same simulated battles and costs a single simulation.
+
+Outcomes are defined the way a /api/match/{id}/result battle log shows
+them:
+
+    winner        result["winner"]
+    first blood   side whose fighter is the victim of the first kill event
+    first elim    side wiped out (none when time runs out)
+    kills         number of "kill" events - swings that land on a target
+                  already dropped in the same tick log another kill
+    duration      result["duration"] (ms)
+    crits         attack events with crit set
+    MVP           damage dealt + 50 per kill, as the arena UI scores it
+
+battle_outcome() reads the same fields from a real result, which is
+what board bets settle against. Place and exotic markets (top2, top3,
+exacta, quinella) are void in a two-team match - every team places - so
+they are not priced. critCount is quoted but api/bet.js has no bet type
+for it; it is priced for reference and never picked.
+
+Usage:
+    python board_pricer.py 1234 -n 10000        # full board for one match
+    python board_pricer.py --day 1234 -n 2000   # best market for 288 matches
+"""
+
+import sys
+import time
+import argparse
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import arena_sim
+import monte_carlo
+from payouts import KINGS_TAX
+
+MVP_KILL_POINTS = 50
+TRACK_ROWS = 200_000  # Tracked replicates per chunk (tracking holds 10x10 per row)
+
+# api/odds.js house multipliers and prop lines
+HOUSE_EDGE = {
+    "winner": 0.92,
+    "top2": 0.95,
+    "top3": 0.95,
+    "firstBlood": 0.90,
+    "props": 0.90,
+    "exotic": 0.88,
+}
+PROPS = {
+    # stat: (bet type prefix, line, over odds, under odds)
+    "kills": ("kills", 12, 1.90, 1.90),
+    "duration": ("duration", 120_000, 1.85, 1.95),
+    "crits": ("crits", 8, 1.95, 1.85),
+}
+
+# Bet types api/bet.js accepts
+BET_TYPES = ("winner", "top2", "top3", "firstBlood", "firstElim",
+             "killsOver", "killsUnder", "durationOver", "durationUnder", "exacta", "quinella")
+
+# Team markets and the outcome field they settle on
+TEAM_MARKETS = {"winner": "winner", "firstBlood": "first_blood", "firstElim": "first_elim"}
+
+
+# ============ HOUSE ODDS ============
+def _quote(value: float, floor: float) -> float:
+    """Math.max(floor, parseFloat(value.toFixed(2)))."""
+    return max(floor, round(value, 2))
+
+
+def team_powers(match: Dict) -> List[float]:
+    teams = [match.get("teamA", {}), match.get("teamB", {})]
+    return [t.get("totalPower") or arena_sim.calc_power(t.get("fighters", [])) for t in teams]
+
+
+def house_board(match: Dict) -> List[Dict]:
+    """
+    Every market api/odds.js would quote for this match, as
+    {"type", "team", "line", "odds"} dicts. The winner price is the
+    match payload's own odds (what /api/bet pays), the rest follow the
+    odds.js formulas with the two teams' total power.
+    """
+    powers = team_powers(match)
+    total = sum(powers)
+    payload_odds = match.get("odds", {})
+    markets = []
+    for i, power in enumerate(powers):
+        winner = payload_odds.get("AB"[i]) or _quote(total / power * HOUSE_EDGE["winner"], 1.05)
+        markets.append({"type": "winner", "team": i, "line": None, "odds": winner})
+    for i, power in enumerate(powers):
+        prob = (total - power) / (total * 4)
+        markets.append({"type": "firstBlood", "team": i, "line": None,
+                        "odds": _quote(1 / prob * HOUSE_EDGE["firstBlood"], 1.5)})
+        markets.append({"type": "firstElim", "team": i, "line": None,
+                        "odds": _quote(1 / prob * HOUSE_EDGE["firstBlood"], 2.0)})
+    for prefix, line, over, under in PROPS.values():
+        markets.append({"type": f"{prefix}Over", "team": None, "line": line, "odds": over})
+        markets.append({"type": f"{prefix}Under", "team": None, "line": line, "odds": under})
+    return markets
+
+
+# ============ SETTLEMENT ============
+def settle(market: Dict, outcome: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (won, push) for a market against an outcome. Works on a single
+    outcome or on per-replicate arrays. Over/under is strict, landing on
+    the line is a push; so is a first-blood/first-elim bet when nobody
+    died or was wiped out.
+    """
+    kind = market["type"]
+    if kind in TEAM_MARKETS:
+        side = np.asarray(outcome[TEAM_MARKETS[kind]])
+        return side == market["team"], side < 0
+    for stat, (prefix, _, _, _) in PROPS.items():
+        if kind.startswith(prefix):
+            value = np.asarray(outcome[stat])
+            line = market["line"]
+            won = value > line if kind.endswith("Over") else value < line
+            return won, value == line
+    raise ValueError(f"Unknown market {kind}")
+
+
+def battle_outcome(result: Dict) -> Dict:
+    """Outcome fields of a /result payload (needs its battleLog)."""
+    names_a = {f["name"] for f in result["teamA"]["fighters"]}
+    order = [f["name"] for f in result["teamA"]["fighters"] + result["teamB"]["fighters"]]
+    score = dict.fromkeys(order, 0)
+    first_blood, kills, crits = -1, 0, 0
+    for entry in result.get("battleLog") or []:
+        if entry["type"] == "attack":
+            score[entry["attacker"]] += entry["damage"]
+            crits += bool(entry.get("crit"))
+        elif entry["type"] == "kill":
+            if first_blood < 0:
+                first_blood = 0 if entry["victim"] in names_a else 1
+            score[entry["killer"]] += MVP_KILL_POINTS
+            kills += 1
+
+    wiped = [i for i, side in enumerate(("teamA", "teamB")) if result[side]["alive"] == 0]
+    return {
+        "winner": "AB".index(result["winner"]),
+        "first_blood": first_blood,
+        "first_elim": wiped[0] if wiped else -1,
+        "kills": kills,
+        "duration": result["duration"],
+        "crits": crits,
+        "mvp": max(order, key=lambda name: score[name]),  # First listed wins ties
+    }
+
+
+def expected_value(p_win: float, p_push: float, odds: float, tax: float = KINGS_TAX) -> float:
+    """Expected return per unit staked after the King's Tax, stake back on a push."""
+    return p_win * (1 + (odds - 1) * (1 - tax)) + p_push - 1
+
+
+# ============ PRICING ============
+def _distributions(sims: Dict[str, np.ndarray], i: int, fighters: List[Dict]) -> Tuple[Dict, Dict]:
+    """Per-replicate outcome arrays for matchup i, and summary distributions."""
+    n = sims["winner"].shape[1]
+    score = sims["damage"][i] + MVP_KILL_POINTS * sims["kill_credit"][i]
+    first_blood = sims["first_blood"][i]
+    winner = sims["winner"][i]
+    duration = sims["duration"][i]
+    # Ending before the timeout means the loser was wiped out
+    first_elim = np.where(duration < arena_sim.MATCH_TIME, 1 - winner, -1)
+    outcome = {
+        "winner": winner,
+        "first_blood": first_blood,
+        "first_elim": first_elim,
+        "kills": sims["kills"][i],
+        "duration": duration,
+        "crits": sims["crits"][i],
+    }
+
+    def shares(values, size):
+        return (np.bincount(values, minlength=size) / n).tolist()
+
+    def sided(values):
+        s = shares(values + 1, 3)  # -1 (none), A, B
+        return s[1:] + s[:1]
+
+    mvp = np.bincount(score.argmax(axis=1), minlength=len(fighters)) / n
+    dists = {
+        "winner": shares(winner, 2),
+        "first_blood": sided(first_blood),
+        "first_elim": sided(first_elim),
+        "kills": shares(sims["kills"][i], 1),
+        "duration_s": {q: float(np.percentile(duration, q)) / 1000 for q in (10, 50, 90)},
+        "crits": {"mean": float(outcome["crits"].mean()),
+                  "p10": float(np.percentile(outcome["crits"], 10)),
+                  "p90": float(np.percentile(outcome["crits"], 90))},
+        "mvp": {fighters[s]["name"]: float(mvp[s]) for s in np.argsort(-mvp) if mvp[s] > 0},
+    }
+    return outcome, dists
+
+
+def price_boards(matches: Sequence, n: int = 4000, seed: Optional[int] = None,
+                 keep_samples: bool = False) -> List[Dict]:
+    """
+    Price every market for each match (a match payload or ID) from one
+    tracked simulation pass. Each board has the outcome distributions
+    ("winner" and "first_blood"/"first_elim" are [A, B, none] shares,
+    "kills" is a histogram by count) and "markets": the house_board
+    entries with fair "p", "push" and after-tax "ev" added.
+    keep_samples adds the per-replicate outcome arrays as "samples", the
+    joint distribution portfolio.py sizes correlated bets from.
+    """
+    if n <= 0:
+        raise ValueError("n must be positive")
+    payloads = [m if isinstance(m, dict) else arena_sim.generate_match(m) for m in matches]
+    stats = monte_carlo.stat_arrays(payloads)
+    rng = np.random.default_rng(seed)
+
+    boards = []
+    per_chunk = max(1, TRACK_ROWS // n)
+    for lo in range(0, len(payloads), per_chunk):
+        chunk = {k: v[lo:lo + per_chunk] for k, v in stats.items()}
+        sims = monte_carlo.simulate(chunk, n, rng, track=True)
+        for i, match in enumerate(payloads[lo:lo + per_chunk]):
+            fighters = list(match["teamA"]["fighters"]) + list(match["teamB"]["fighters"])
+            outcome, dists = _distributions(sims, i, fighters)
+            markets = []
+            for market in house_board(match):
+                won, push = settle(market, outcome)
+                p, p_push = float(won.mean()), float(push.mean())
+                markets.append({**market, "p": p, "push": p_push,
+                                "ev": expected_value(p, p_push, market["odds"])})
+            board = {"match_id": arena_sim.parse_match_id(match["matchId"]), "n": n, **dists, "markets": markets}
+            if keep_samples:
+                board["samples"] = outcome
+            boards.append(board)
+    return boards
+
+
+def price_board(match, n: int = 4000, seed: Optional[int] = None, keep_samples: bool = False) -> Dict:
+    return price_boards([match], n=n, seed=seed, keep_samples=keep_samples)[0]
+
+
+def best_market(board: Dict, min_prob: float = 0.0, bet_types: Sequence[str] = BET_TYPES) -> Optional[Dict]:
+    """Highest-EV market that can be bet, or None if nothing clears zero."""
+    best = None
+    for market in board["markets"]:
+        if market["type"] not in bet_types or market["p"] < min_prob or market["ev"] <= 0:
+            continue
+        if best is None or market["ev"] > best["ev"]:
+            best = market
+    return best
+
+
+def market_label(market: Dict, team_names: Sequence[str] = ("A", "B")) -> str:
+    """Human-readable market name, e.g. "firstBlood Crimson Horde" or "killsUnder 12"."""
+    if market["team"] is not None:
+        return f"{market['type']} {team_names[market['team']]}"
+    line = market["line"]
+    if market["type"].startswith("duration"):
+        line = f"{line / 1000:g}s"
+    return f"{market['type']} {line}"
+
+
+# ============ CLI ============
+def print_board(board: Dict, names: Sequence[str]):
+    print(f"SAVAGE-{board['match_id']} ({board['n']} replicates)")
+    print(f"  winner A/B {board['winner'][0]:.3f}/{board['winner'][1]:.3f}  "
+          f"first blood A/B/none {'/'.join(f'{p:.3f}' for p in board['first_blood'])}  "
+          f"duration p10/50/90 {'/'.join(f'{v:.1f}' for v in board['duration_s'].values())}s")
+    kills = board["kills"]
+    print(f"  kills mean {sum(k * p for k, p in enumerate(kills)):.2f} (max {len(kills) - 1})  "
+          f"crits mean {board['crits']['mean']:.1f}  "
+          f"MVP {', '.join(f'{name} {p:.2f}' for name, p in list(board['mvp'].items())[:3])}")
+    for m in sorted(board["markets"], key=lambda m: -m["ev"]):
+        flag = "" if m["type"] in BET_TYPES else "  (not bettable)"
+        print(f"  {market_label(m, names):<32} {m['odds']:>6.2f}x  p={m['p']:.3f}  EV {m['ev']:+.3f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Price every api/odds.js market for arena matchups")
+    parser.add_argument("match_id", nargs="?", type=int, help="Match ID (default: current)")
+    parser.add_argument("-n", "--replicates", type=int, default=4000)
+    parser.add_argument("--day", action="store_true", help="Best market for the next 288 matches")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    first = args.match_id or arena_sim.current_match_id()
+    count = 24 * 3600 * 1000 // arena_sim.MATCH_INTERVAL if args.day else 1
+    matches = [arena_sim.generate_match(mid) for mid in range(first, first + count)]
+
+    start = time.perf_counter()
+    boards = price_boards(matches, n=args.replicates, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    for match, board in zip(matches, boards):
+        names = (match["teamA"]["name"], match["teamB"]["name"])
+        if not args.day:
+            print_board(board, names)
+            continue
+        best = best_market(board)
+        pick = f"{market_label(best, names)} @ {best['odds']:.2f}x EV {best['ev']:+.3f}" if best else "no edge"
+        print(f"SAVAGE-{board['match_id']}: {pick}")
+    print(f"{count} board(s) x {args.replicates} replicates in {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
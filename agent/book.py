@@ -0,0 +1,185 @@
+"""
+Savage Arena Betting Book
+
+The ledger behind every bet that doesn't go to the real /api/bet: the
+local arena (arena_server.py) and paper trading (paper.py) both build on
+Book. It validates bets the way api/bet.js does (betting window, minimum
+stake, balance, market list), quotes them from the match payload and
+board_pricer's house board, and settles them once their match has ended
+- winner bets on arena_sim's replayed winner, board markets on the
+battle log - paying stake plus profit less the King's Tax (payouts.py).
+
+A Book runs on an ArenaClock: the local arena's is sped up, the paper
+book's runs at wall-clock speed. match() and times() are the hooks a
+subclass overrides to quote and close bets on a different feed, and
+on_settled() sees each bet as it settles.
+
+Usage:
+    book = Book(ArenaClock(1.0))
+    status, receipt = book.place_bet("agent", {"matchId": "SAVAGE-42", "team": 0, "amount": 10})
+    book.agent_balance("agent")   # settles anything that has ended first
+"""
+
+import time
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import arena_sim
+from payouts import net_payout
+
+try:
+    import board_pricer
+except ImportError:
+    board_pricer = None  # numpy missing - winner bets only
+
+DEFAULT_BALANCE = 1000.0  # api/balance.js
+
+
+# ============ CLOCK ============
+class ArenaClock:
+    """Arena time running `speed` times faster than the wall clock."""
+
+    def __init__(self, speed: float = 1.0, start_ms: Optional[float] = None):
+        self.speed = speed
+        self.real_start = time.time() * 1000
+        self.arena_start = start_ms if start_ms is not None else self.real_start
+
+    def now(self) -> float:
+        """Current arena time (ms)."""
+        return self.arena_start + (time.time() * 1000 - self.real_start) * self.speed
+
+    def to_real(self, arena_ms: float) -> float:
+        """Wall-clock ms at which an arena timestamp occurs."""
+        return self.real_start + (arena_ms - self.arena_start) / self.speed
+
+
+# ============ BOOK ============
+class Book:
+    """Bankrolls, open bets and their settlement, all under one lock."""
+
+    def __init__(self, clock: ArenaClock, start_balance: float = DEFAULT_BALANCE):
+        self.clock = clock
+        self.start_balance = start_balance
+        self.lock = threading.Lock()
+        self.balances: Dict[str, float] = {}
+        self.pending: Dict[int, List[Dict]] = defaultdict(list)   # match ID -> open bets
+        self.stats = defaultdict(int)
+
+    def balance(self, agent_id: str) -> float:
+        return self.balances.setdefault(agent_id, self.start_balance)
+
+    def count(self, key: str):
+        """Bump a stats counter from a handler or delivery thread."""
+        with self.lock:
+            self.stats[key] += 1
+
+    def snapshot_stats(self) -> Dict[str, float]:
+        with self.lock:
+            return dict(self.stats)
+
+    def match(self, mid: int) -> Dict:
+        """The match bets on `mid` are quoted against."""
+        return arena_sim.generate_match(mid)
+
+    def times(self, mid: int) -> Dict:
+        """bettingEndsAt / endsAt of `mid`, on the state's clock."""
+        return arena_sim.match_times(mid)
+
+    def settle_ended(self):
+        """Pay out every open bet whose match has ended on the arena clock."""
+        now = self.clock.now()
+        for mid in [m for m in self.pending if self.times(m)["endsAt"] <= now]:
+            winner = arena_sim.match_winner(mid)
+            outcome = None
+            for bet in self.pending.pop(mid):
+                push = False
+                if bet["type"] == "winner":
+                    won = "AB"[bet["team"]] == winner
+                else:
+                    outcome = outcome or board_pricer.battle_outcome(arena_sim.match_result(mid))
+                    won, push = (bool(flag) for flag in board_pricer.settle(bet, outcome))
+                if push:
+                    self.balances[bet["agentId"]] += bet["amount"]
+                elif won:
+                    self.balances[bet["agentId"]] += net_payout(bet["amount"], bet["odds"])
+                bet["status"] = "push" if push else "won" if won else "lost"
+                bet["payout"] = bet["amount"] if push else net_payout(bet["amount"], bet["odds"]) if won else 0.0
+                self.stats["bets_push" if push else "bets_won" if won else "bets_lost"] += 1
+                self.on_settled(bet)
+
+    def on_settled(self, bet: Dict):
+        """Called under the lock for every bet settle_ended pays out."""
+
+    def place_bet(self, agent_id: str, body: Dict) -> Tuple[int, Dict]:
+        """A single bet or a multi-bet slip ("bets"), accepted or rejected as a whole."""
+        if not isinstance(body, dict):
+            return 400, {"error": "Invalid bet format"}
+        match_id = body.get("matchId")
+        if match_id is None:
+            return 400, {"error": "matchId required"}
+        try:
+            mid = arena_sim.parse_match_id(match_id)
+        except ValueError:
+            return 400, {"error": "Invalid match ID"}
+        match = self.match(mid)
+        if board_pricer:
+            board = [m for m in board_pricer.house_board(match) if m["type"] in board_pricer.BET_TYPES]
+        else:
+            board = [{"type": "winner", "team": t, "line": None, "odds": match["odds"]["AB"[t]]} for t in (0, 1)]
+        kinds = sorted({m["type"] for m in board})
+
+        slip = body["bets"] if isinstance(body.get("bets"), list) else [body]
+        if not slip:
+            return 400, {"error": "Invalid bet format"}
+        legs = []
+        for leg in slip:
+            if not isinstance(leg, dict):
+                return 400, {"error": "Invalid bet format"}
+            kind, team, amount = leg.get("type", "winner"), leg.get("team"), leg.get("amount")
+            if kind not in kinds:
+                return 400, {"error": f"Bet type {kind} not supported by the local arena", "validTypes": kinds}
+            quote = next((m for m in board if m["type"] == kind and m["team"] in (None, team)), None)
+            if quote is None:
+                return 400, {"error": "Invalid team selection (0-1)"}
+            if isinstance(amount, bool) or not isinstance(amount, (int, float)) or amount < 1:
+                return 400, {"error": "Minimum bet is 1 token"}
+            legs.append((quote, amount))
+        total = sum(amount for _, amount in legs)
+
+        with self.lock:
+            self.settle_ended()
+            if self.clock.now() >= self.times(mid)["bettingEndsAt"]:
+                self.stats["bets_closed"] += 1
+                return 409, {"error": "Betting closed", "matchId": f"SAVAGE-{mid}"}
+            if self.balance(agent_id) < total:
+                self.stats["bets_insufficient"] += 1
+                return 402, {"error": "Insufficient balance", "balance": self.balances[agent_id]}
+
+            bets = []
+            for quote, amount in legs:
+                bets.append({
+                    "id": f"bet_{int(time.time() * 1000)}_{self.stats['bets']:06d}",
+                    "agentId": agent_id, "matchId": f"SAVAGE-{mid}", "type": quote["type"], "team": quote["team"],
+                    "line": quote["line"], "amount": amount, "odds": quote["odds"], "status": "pending",
+                    "placedAt": int(time.time() * 1000),
+                })
+                self.stats["bets"] += 1
+            self.balances[agent_id] -= total
+            self.pending[mid].extend(bets)
+            self.stats["wagered"] += total
+            balance = self.balances[agent_id]
+
+        return 200, {
+            "success": True, "agentId": agent_id, "matchId": f"SAVAGE-{mid}", "bets": bets,
+            "totalWager": total, "balance": balance,
+            "checkResult": f"/api/match/SAVAGE-{mid}/result",
+        }
+
+    def agent_balance(self, agent_id: str) -> Dict:
+        with self.lock:
+            self.settle_ended()
+            balance = self.balance(agent_id)
+            pending = sum(1 for bets in self.pending.values() for b in bets if b["agentId"] == agent_id)
+        return {"agentId": agent_id, "balance": balance, "currency": "SAVAGE",
+                "pendingBets": pending, "availableBalance": balance}
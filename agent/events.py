@@ -0,0 +1,162 @@
+"""
+Structured event log and logging setup for the Savage Arena agent.
+
+Decisions, bets, settlements and balance reconciliations are emitted as
+one JSON object per line. Records go onto an in-memory queue and a
+listener thread writes them to a size-rotated JSONL file, so the
+trading thread never touches the disk. Human-readable logging goes
+through the same queue, with the console and text file both optional.
+
+Every record has "ts" (epoch seconds) and "event"; match IDs are ints.
+load() reads a log back including its rotated files, and
+backtest_records() turns the decisions and settlements into the same
+records backtest.analyze_range produces, so live and simulated
+behaviour can be compared match by match.
+
+Usage:
+    events.setup_logging(events_path="savage_events.jsonl", console=False)
+    events.emit("bet", match_id=1234, team_idx=0, wager=12.5, odds=1.9, ok=True)
+    records = events.backtest_records(events.load("savage_events.jsonl"))
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import logging.handlers
+from typing import Dict, Iterator, List, Optional
+
+EVENT_LOGGER = "savage.events"
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+_events = logging.getLogger(EVENT_LOGGER)
+_events.propagate = False  # Events never show up in the text log
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _EventQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record  # Keep the dict; the writer thread serializes it
+
+
+class _JsonLineFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.msg, separators=(",", ":"), default=str)
+
+
+def emit(event: str, **fields):
+    """Queue one event record. Cheap no-op until setup_logging enables events."""
+    if _events.handlers:
+        _events.info({"ts": round(time.time(), 3), "event": event, **fields})
+
+
+def setup_logging(
+    events_path: Optional[str] = "savage_events.jsonl",
+    console: bool = True,
+    log_file: Optional[str] = None,
+    level: int = logging.INFO,
+    max_bytes: int = 20 * 1024 * 1024,
+    backups: int = 5,
+):
+    """
+    Route text logs (console and/or log_file) and JSONL events through one
+    queue drained by a background thread. Safe to call once per process.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    text_handlers: List[logging.Handler] = []
+    if console:
+        text_handlers.append(logging.StreamHandler(sys.stdout))
+    if log_file:
+        text_handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"))
+    for handler in text_handlers:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    handlers = list(text_handlers)
+    if events_path:
+        event_handler = logging.handlers.RotatingFileHandler(
+            events_path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        event_handler.setFormatter(_JsonLineFormatter())
+        event_handler.addFilter(lambda r: r.name == EVENT_LOGGER)
+        handlers.append(event_handler)
+        _events.addHandler(_EventQueueHandler(log_queue))
+        _events.setLevel(logging.INFO)
+    for handler in text_handlers:
+        handler.addFilter(lambda r: r.name != EVENT_LOGGER)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown)
+
+
+def shutdown():
+    """Flush the queue and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# ============ READING ============
+def log_files(path: str) -> List[str]:
+    """A log and its rotated backups, oldest first."""
+    rotated = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        rotated.append(f"{path}.{i}")
+        i += 1
+    return list(reversed(rotated)) + ([path] if os.path.exists(path) else [])
+
+
+def load(path: str, event: Optional[str] = None) -> Iterator[Dict]:
+    """Records from a log and its backups in write order, optionally one event type."""
+    for name in log_files(path):
+        with open(name, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Torn line from a crash
+                if event is None or record.get("event") == event:
+                    yield record
+
+
+def backtest_records(records, strategy: Optional[str] = None) -> List[Dict]:
+    """
+    backtest-style {match_id, analyses, winner} records for every decision,
+    with the winner filled in from settlements (None when we didn't bet).
+    Also carries what the live bot did: pick, wager, placed and won. Pass
+    `strategy` to pick one trader out of a multi_runner log.
+    """
+    decisions: Dict[int, Dict] = {}
+    for r in records:
+        if strategy is not None and r.get("strategy") != strategy:
+            continue
+        kind = r.get("event")
+        if kind == "decision":
+            decisions[r["match_id"]] = {
+                "match_id": r["match_id"],
+                "analyses": r["analyses"],
+                "winner": None,
+                "pick": r.get("pick"),
+                "wager": r.get("wager"),
+                "placed": False,
+                "won": None,
+            }
+        elif kind == "bet" and r["match_id"] in decisions:
+            decisions[r["match_id"]]["placed"] = bool(r.get("ok"))
+        elif kind == "settlement" and r["match_id"] in decisions:
+            decisions[r["match_id"]]["winner"] = r.get("winner")
+            decisions[r["match_id"]]["won"] = r.get("won")
+    return sorted(decisions.values(), key=lambda d: d["match_id"])
@@ -0,0 +1,44 @@
+// Regenerate golden/vectors.json from the real API handlers.
+//
+//   node agent/golden/make_golden.mjs > agent/golden/vectors.json
+//
+// The handlers are loaded as source (they are not importable modules
+// under the repo's package.json), with Date.now pinned so `status` is
+// stable. arena_sim.py --verify compares its output against this file.
+
+import { readFileSync } from 'fs';
+import { fileURLToPath } from 'url';
+import { dirname, join } from 'path';
+
+const root = join(dirname(fileURLToPath(import.meta.url)), '..', '..');
+
+async function load(relPath, names) {
+    const src = readFileSync(join(root, relPath), 'utf8')
+        .replace('export default function handler', 'function handler');
+    const mod = `${src}\nexport { ${names.join(', ')} };`;
+    return import('data:text/javascript,' + encodeURIComponent(mod));
+}
+
+const { generateMatch, SeededRNG } = await load('api/match/current.js', ['generateMatch', 'SeededRNG']);
+const { simulateBattle } = await load('api/match/[id]/result.js', ['simulateBattle']);
+
+const SEEDS = ['SAVAGE-1', 'SAVAGE-42', 'SAVAGE-12345', 'SAVAGE-999999', 'a', '', 'The Savage Lands'];
+// A spread of IDs plus a few with full battle logs for byte-level checks.
+const IDS = [0, 1, 2, 3, 7, 42, 100, 1234, 4096, 9999, 12345, 31337, 65536, 99999, 105120, 123456, 999999];
+const FULL_LOG_IDS = new Set([1, 42, 12345]);
+
+const out = {
+    hashes: SEEDS.map(seed => ({ seed, hash: new SeededRNG(seed).seed })),
+    rng: SEEDS.slice(0, 4).map(seed => {
+        const rng = new SeededRNG(seed);
+        return { seed, values: Array.from({ length: 64 }, () => rng.next()) };
+    }),
+    matches: IDS.map(id => {
+        const { status, ...match } = generateMatch(id);
+        const result = simulateBattle(String(id));
+        if (!FULL_LOG_IDS.has(id)) delete result.battleLog;
+        return { id, match, result };
+    })
+};
+
+process.stdout.write(JSON.stringify(out) + '\n');
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Savage Arena In-Play Tracker
+
+Follows a live battle from its battle log (the attack / kill events
+simulateBattle writes, ten swings per 100ms tick) and keeps a win
+probability for team A current as each tick closes.
+
+LiveBattle rebuilds per-fighter HP and alive state from events as they
+arrive. InPlayEstimator turns that state into P(A wins) with conditional
+Monte Carlo: it simulates a pool of continuations from the current state
+once (monte_carlo.simulate with hp0 / start_tick) and records each
+replicate's HP path for the next few ticks. On later ticks the same pool
+is reused - replicates whose HP at that tick resembles the observed HP
+(same fighters alive, HP within a kernel bandwidth) are weighted up -
+and a fresh pool is drawn only when the effective sample size runs low
+or the recorded horizon runs out. Quiet ticks (a few hits, no kills)
+cost one kernel evaluation over the pool; a tick that changes the state
+a lot - a kill, a big crit - redraws. A redraw of 2000 replicates takes
+~20-30ms, so either way an update fits well inside the 100ms tick.
+
+The kernel is kept tight on purpose: battles swing hard within a tick
+or two, and a wider kernel reuses more but drifts away from a fresh
+conditional simulation (bandwidth 0.08 stays within the pool's own
+sampling noise).
+
+The arena has no event stream, but /api/match/{id}/result serves the
+whole log at any time and the battle is a pure function of the match ID,
+so track() can release each tick's events at startsAt + battle time -
+the pace a spectator sees them. watch() does that on a daemon thread.
+
+Usage:
+    python inplay.py 1234                 # replay match 1234 tick by tick
+    python inplay.py 1234 --check         # compare against a fresh simulation every tick
+"""
+
+import sys
+import time
+import logging
+import argparse
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+import arena_sim
+import monte_carlo
+
+logger = logging.getLogger(__name__)
+
+TICK_MS = arena_sim.TICK_MS
+
+
+# ============ LIVE STATE ============
+class LiveBattle:
+    """Per-fighter HP and alive state rebuilt from battle-log events."""
+
+    def __init__(self, match: Dict):
+        self.match_id = arena_sim.parse_match_id(match["matchId"])
+        self.fighters = list(match["teamA"]["fighters"]) + list(match["teamB"]["fighters"])
+        self.slot = {f["name"]: i for i, f in enumerate(self.fighters)}
+        self.max_hp = np.array([f["hp"] for f in self.fighters], dtype=np.int32)
+        self.hp = self.max_hp.copy()
+        self.tick = 0       # Tick being applied; after close_tick, hp is its start state
+        self.events = 0
+        self.kills = 0
+
+    @property
+    def alive(self) -> np.ndarray:
+        return self.hp > 0
+
+    @property
+    def ended(self) -> bool:
+        size = arena_sim.TEAM_SIZE
+        return not self.alive[:size].any() or not self.alive[size:].any()
+
+    def ingest(self, event: Dict):
+        """Apply one attack or kill event."""
+        self.tick = max(self.tick, event["time"] // TICK_MS)
+        if event["type"] == "attack":
+            slot = self.slot[event["target"]]
+            self.hp[slot] = max(0, self.hp[slot] - event["damage"])
+        elif event["type"] == "kill":
+            self.hp[self.slot[event["victim"]]] = 0
+            self.kills += 1
+        self.events += 1
+
+    def close_tick(self):
+        """Mark the current tick complete (its last event has arrived)."""
+        self.tick += 1
+
+    def winner(self) -> Optional[int]:
+        """0 / 1 once a side is wiped out, else None."""
+        if not self.ended:
+            return None
+        return 0 if self.alive[:arena_sim.TEAM_SIZE].any() else 1
+
+
+# ============ ESTIMATOR ============
+class InPlayEstimator:
+    def __init__(self, match: Dict, n: int = 2000, horizon: int = 10, bandwidth: float = 0.08,
+                 min_ess: float = 0.2, seed: Optional[int] = None):
+        """
+        n replicates per pool, each recorded `horizon` ticks ahead. The
+        kernel width is `bandwidth` x max HP per fighter; the pool is
+        redrawn once its effective sample size falls below min_ess * n.
+        """
+        self.stats = monte_carlo.stat_arrays([match])
+        self.n = n
+        self.horizon = horizon
+        self.scale = bandwidth * self.stats["hp"][0].astype(np.float64)
+        self.min_ess = min_ess * n
+        self.rng = np.random.default_rng(seed)
+        self.base_tick = -1
+        self.paths: Optional[np.ndarray] = None   # (n, horizon, 10)
+        self.a_wins: Optional[np.ndarray] = None  # (n,)
+        self.rebases = 0
+        self.updates = 0
+
+    def _rebase(self, hp: np.ndarray, tick: int):
+        sims = monte_carlo.simulate(self.stats, self.n, self.rng, hp0=hp[None, :],
+                                    start_tick=tick, record_ticks=self.horizon)
+        self.paths = sims["hp_path"][0]
+        self.a_wins = sims["winner"][0] == 0
+        self.base_tick = tick
+        self.rebases += 1
+
+    def update(self, hp: np.ndarray, tick: int) -> Dict:
+        """P(A wins) given the HP at the start of `tick`."""
+        self.updates += 1
+        size = arena_sim.TEAM_SIZE
+        alive = hp > 0
+        if not alive[:size].any() or not alive[size:].any():
+            return {"tick": tick, "p_a": float(alive[:size].any()), "ess": 0.0, "rebased": False}
+
+        step = tick - self.base_tick
+        if self.paths is not None and 0 <= step < self.horizon:
+            weights = self._weights(hp, alive, step)
+            ess = weights.sum() ** 2 / max((weights ** 2).sum(), 1e-300)
+            if ess >= self.min_ess:
+                p_a = float(weights @ self.a_wins / weights.sum())
+                return {"tick": tick, "p_a": p_a, "ess": float(ess), "rebased": False}
+
+        self._rebase(hp, tick)
+        return {"tick": tick, "p_a": float(self.a_wins.mean()), "ess": float(self.n), "rebased": True}
+
+    def _weights(self, hp: np.ndarray, alive: np.ndarray, step: int) -> np.ndarray:
+        states = self.paths[:, step]
+        same_alive = ((states > 0) == alive).all(axis=1)
+        dist = (((states - hp) / self.scale) ** 2).sum(axis=1)
+        return np.exp(-0.5 * dist) * same_alive
+
+
+# ============ FEEDS ============
+def battle_log(match_id: int, fetch_result: Optional[Callable[[str], Optional[Dict]]] = None) -> Iterable[Dict]:
+    """
+    The match's battle log - from /result via fetch_result (a list, or a
+    generator streaming it), else replayed locally.
+    """
+    if fetch_result is not None:
+        result = fetch_result(f"SAVAGE-{match_id}")
+        if result and result.get("battleLog") is not None:
+            return result["battleLog"]
+    return arena_sim.simulate_battle(match_id)["battleLog"]
+
+
+def ticks(log: Iterable[Dict]) -> Iterator[List[Dict]]:
+    """Battle-log events grouped by tick, in order."""
+    group: List[Dict] = []
+    for event in log:
+        if group and event["time"] != group[0]["time"]:
+            yield group
+            group = []
+        group.append(event)
+    if group:
+        yield group
+
+
+def track(match: Dict, log: Iterable[Dict], estimator: Optional[InPlayEstimator] = None,
+          starts_at: Optional[float] = None) -> Iterator[Dict]:
+    """
+    Feed a battle log through LiveBattle and the estimator, yielding an
+    update after every tick with events. With starts_at (epoch seconds)
+    each tick is released at starts_at + its battle time, as it would
+    be watched live; otherwise as fast as possible.
+    """
+    battle = LiveBattle(match)
+    estimator = estimator or InPlayEstimator(match)
+    yield {**estimator.update(battle.hp, 0), "hp": battle.hp.copy(), "latency": 0.0}
+    for group in ticks(log):
+        if starts_at is not None:
+            delay = starts_at + (group[0]["time"] + TICK_MS) / 1000 - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        start = time.perf_counter()
+        for event in group:
+            battle.ingest(event)
+        battle.close_tick()
+        update = estimator.update(battle.hp, battle.tick)
+        yield {**update, "hp": battle.hp.copy(), "latency": time.perf_counter() - start}
+
+
+def watch(match: Dict, on_update: Callable[[Dict], None], n: int = 2000,
+          fetch_result: Optional[Callable[[str], Optional[Dict]]] = None) -> threading.Thread:
+    """Track a match on a daemon thread at live pace, calling on_update each tick."""
+    mid = arena_sim.parse_match_id(match["matchId"])
+    starts_at = (match.get("startsAt") or arena_sim.match_times(mid)["startsAt"]) / 1000
+
+    def run():
+        try:
+            log = battle_log(mid, fetch_result)
+            for update in track(match, log, InPlayEstimator(match, n=n), starts_at=starts_at):
+                on_update({"match_id": mid, **update})
+        except Exception as e:
+            logger.error(f"In-play tracking of SAVAGE-{mid} failed: {e}")
+
+    thread = threading.Thread(target=run, name=f"inplay-{mid}", daemon=True)
+    thread.start()
+    return thread
+
+
+# ============ CLI ============
+def main():
+    parser = argparse.ArgumentParser(description="Replay a battle log with in-play win probabilities")
+    parser.add_argument("match_id", nargs="?", type=int, help="Match ID (default: current)")
+    parser.add_argument("-n", "--replicates", type=int, default=2000)
+    parser.add_argument("--horizon", type=int, default=10, help="Ticks each pool is reused for")
+    parser.add_argument("--check", action="store_true", help="Also run a fresh simulation every tick")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    mid = args.match_id or arena_sim.current_match_id()
+    match = arena_sim.generate_match(mid)
+    result = arena_sim.match_result(mid)
+    estimator = InPlayEstimator(match, n=args.replicates, horizon=args.horizon, seed=args.seed)
+    fresh = InPlayEstimator(match, n=args.replicates, horizon=1, seed=args.seed)
+    size = arena_sim.TEAM_SIZE
+
+    latencies, errors = [], []
+    for update in track(match, result["battleLog"], estimator):
+        latencies.append(update["latency"])
+        alive = update["hp"] > 0
+        line = (f"t={update['tick'] * TICK_MS / 1000:4.1f}s {alive[:size].sum()}v{alive[size:].sum()}  "
+                f"P(A)={update['p_a']:.3f}  ess={update['ess']:6.0f}")
+        if args.check:
+            fresh.paths = None  # Force a new pool from this exact state
+            p_fresh = fresh.update(update["hp"], update["tick"])["p_a"]
+            errors.append(abs(p_fresh - update["p_a"]))
+            line += f"  fresh={p_fresh:.3f}"
+        print(line + ("  rebased" if update["rebased"] else ""))
+    if errors:
+        print(f"mean |reused - fresh| {np.mean(errors):.4f}, max {max(errors):.4f}", file=sys.stderr)
+    print(f"winner {result['winner']}; {estimator.updates} updates, {estimator.rebases} pools, "
+          f"max update {max(latencies) * 1000:.1f}ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Crash-safe trade journal for the Savage Arena agent.
+
+An append-only JSONL file. Every record carries the trader's full state
+after the event (session_stats, open bet, last match, ledger balance),
+so resuming only needs the last intact line - the tail of the file is
+read, not the whole history. Bet intents, placements and settlements
+are fsynced before the trader moves on; bookkeeping such as skipped
+matches is only flushed. Every `snapshot_every` records the file is
+compacted to a single snapshot line (written to a temp file, fsynced and
+renamed over the journal).
+
+A bet whose intent was journaled but whose placement never was (crash
+during the POST) comes back as `pending_bet`; the trader treats it as
+placed and reconciles the balance, since the arena may have taken it.
+"""
+
+import os
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TAIL_BYTES = 64 * 1024
+DURABLE_EVENTS = ("submit", "placed", "rejected", "settled", "snapshot")
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Cannot journal {type(value).__name__}")
+
+
+def _decode(obj: Dict):
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+class TradeJournal:
+    def __init__(self, path: str, snapshot_every: int = 200):
+        self.path = path
+        self.snapshot_every = max(1, snapshot_every)
+        self.seq = 0
+        self._since_snapshot = 0
+        self._fh = None
+
+    # ---- Resume ----
+
+    def replay(self) -> Optional[Dict]:
+        """State from the last intact record, or None for a new journal."""
+        if not os.path.exists(self.path):
+            return None
+        start = time.perf_counter()
+        with open(self.path, "rb") as fh:
+            fh.seek(0, os.SEEK_END)
+            size = fh.tell()
+            fh.seek(max(0, size - TAIL_BYTES))
+            lines = fh.read().splitlines()
+
+        # A crash can leave a torn last line; walk back to the newest good one
+        record = None
+        for line in reversed(lines):
+            try:
+                record = json.loads(line, object_hook=_decode)
+                break
+            except ValueError:
+                continue
+        if record is None:
+            logger.warning(f"Journal {self.path} has no readable records, starting fresh")
+            return None
+
+        self.seq = record.get("seq", 0)
+        self._since_snapshot = len(lines)
+        logger.info(f"📒 Journal replayed to #{self.seq} ({record['event']}) "
+                    f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return record["state"]
+
+    # ---- Writing ----
+
+    def _open(self):
+        if self._fh is None:
+            self._fh = open(self.path, "a", encoding="utf-8")
+        return self._fh
+
+    def record(self, event: str, state: Dict, **extra):
+        """Append a state record; durable events are fsynced before returning."""
+        self.seq += 1
+        line = json.dumps({"seq": self.seq, "t": time.time(), "event": event, **extra, "state": state},
+                          default=_encode, separators=(",", ":"))
+        fh = self._open()
+        fh.write(line + "\n")
+        fh.flush()
+        if event in DURABLE_EVENTS:
+            os.fsync(fh.fileno())
+
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every and not state.get("pending_bet"):
+            self.snapshot(state)
+
+    def snapshot(self, state: Dict):
+        """Compact the journal to a single snapshot record."""
+        self.close()
+        self.seq += 1
+        line = json.dumps({"seq": self.seq, "t": time.time(), "event": "snapshot", "state": state},
+                          default=_encode, separators=(",", ":"))
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+        self._fsync_dir()
+        self._since_snapshot = 1
+
+    def _fsync_dir(self):
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
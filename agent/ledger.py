@@ -0,0 +1,139 @@
+"""
+Local balance ledger for the Savage Arena agent.
+
+Tracks the bankroll from known stakes and payouts (payouts already net of
+the King's Tax) so the betting path never waits on a balance lookup. The
+remote source - a Bankr job or /api/balance - is only consulted in a
+background thread every `reconcile_every` settlements, or sooner once
+drift has been seen.
+"""
+
+import time
+import logging
+import threading
+from typing import Callable, Optional
+
+import events
+
+logger = logging.getLogger(__name__)
+
+
+class BalanceLedger:
+    def __init__(
+        self,
+        fetch_balance: Callable[[], Optional[float]],
+        reconcile_every: int = 12,
+        drift_tolerance: float = 0.01,
+    ):
+        self.fetch_balance = fetch_balance
+        self.reconcile_every = max(1, reconcile_every)
+        self.drift_tolerance = drift_tolerance
+
+        self.balance: Optional[float] = None
+        self.last_reconciled: Optional[float] = None
+        self.last_drift = 0.0
+        self.reconciliations = 0
+
+        self._lock = threading.Lock()
+        self._applied = 0.0            # Sum of local deltas since start
+        self._since_sync = 0
+        self._suspect = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- Local bookkeeping ----
+
+    def get(self) -> float:
+        """Current balance. Only the very first call goes to the network."""
+        if self.balance is None:
+            self.reconcile()
+        return self.balance or 0.0
+
+    def seed(self, balance: float):
+        """Start from a known balance without a remote lookup."""
+        with self._lock:
+            self.balance = balance
+            self._since_sync = 0
+
+    def _apply(self, delta: float):
+        with self._lock:
+            if self.balance is not None:
+                self.balance += delta
+            self._applied += delta
+
+    def debit(self, amount: float):
+        """Stake leaves the wallet when a bet is placed."""
+        self._apply(-amount)
+
+    def credit(self, amount: float):
+        """Payout (stake + taxed profit) arrives on a win."""
+        self._apply(amount)
+
+    def settled(self):
+        """Count a settlement and reconcile in the background when due."""
+        with self._lock:
+            self._since_sync += 1
+            due = self._suspect or self._since_sync >= self.reconcile_every
+        if due:
+            self.reconcile_async()
+
+    def mark_suspect(self, reason: str = ""):
+        """Force a reconcile at the next settlement (e.g. after a rejected bet)."""
+        if reason:
+            logger.warning(f"Ledger marked for reconcile: {reason}")
+        with self._lock:
+            self._suspect = True
+
+    # ---- Reconciliation ----
+
+    def reconcile(self) -> Optional[float]:
+        """Fetch the remote balance and adopt it. Returns the drift seen."""
+        with self._lock:
+            applied_before = self._applied
+        start = time.monotonic()
+        remote = self.fetch_balance()
+        elapsed = time.monotonic() - start
+        if remote is None:
+            logger.warning("Ledger reconcile skipped: remote balance unavailable")
+            return None
+
+        with self._lock:
+            # Keep any stakes/payouts booked while the lookup was in flight
+            in_flight = self._applied - applied_before
+            expected = self.balance
+            self.balance = remote + in_flight
+            self._since_sync = 0
+            self.last_reconciled = time.time()
+            self.reconciliations += 1
+
+            if expected is None:
+                logger.info(f"Ledger seeded at {remote:.2f} ({elapsed:.1f}s)")
+                self._suspect = False
+                return None
+
+            drift = remote + in_flight - expected
+            self.last_drift = drift
+            tolerance = self.drift_tolerance * max(abs(expected), 1.0)
+            self._suspect = abs(drift) > tolerance
+
+        events.emit("reconcile", remote=remote, local=expected, in_flight=in_flight, drift=drift,
+                    seconds=round(elapsed, 3))
+
+        if abs(drift) > tolerance:
+            logger.warning(f"Ledger drift {drift:+.2f} (local {expected:.2f}, remote {remote:.2f}) "
+                           f"- reconciling every settlement until it settles")
+        else:
+            logger.debug(f"Ledger reconciled, drift {drift:+.2f} ({elapsed:.1f}s)")
+        return drift
+
+    def reconcile_async(self):
+        """Reconcile on a background thread unless one is already running."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._reconcile_safely, name="ledger-reconcile", daemon=True)
+        self._thread.start()
+
+    def _reconcile_safely(self):
+        try:
+            self.reconcile()
+        except Exception as e:
+            logger.error(f"Ledger reconcile failed: {e}")
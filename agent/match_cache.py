@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Persistent SQLite cache of ended Savage Arena matches.
+
+Once a match has ended, its details and result never change, so each one
+is fetched at most once and kept here keyed by match ID. Alongside the
+compressed payloads, every match is indexed one row per side (team
+name, role combo, odds, won) and one row per fighter appearance, so
+empirical win rates by team, fighter or role combo over tens of
+thousands of matches are a single indexed aggregate - milliseconds, no
+network.
+
+The API has no /match/:id endpoint in this tree and match details are a
+pure function of the ID, so payloads come from arena_sim.generate_match.
+Results come from /api/match/{id}/result in "api" mode, or from the
+bit-exact local replay in "local" mode (no network at all). API backfill
+walks the missing IDs in batches, paced by a token bucket at the public
+rate limit (100 req/min) and honouring Retry-After on 429s. It also
+draws on the process-wide ratelimit limiter at background priority, so
+a backfill sharing a process with a trader never delays its bets.
+Each batch is committed as one transaction, so an interrupted backfill
+resumes where it stopped.
+
+Usage:
+    python match_cache.py backfill --start 1 --count 50000          # local replay
+    python match_cache.py backfill --start 1 --count 500 --api https://savage-arena.vercel.app
+    python match_cache.py team "Azure Arcanum"
+    python match_cache.py fighter Minotaur
+    python match_cache.py combo Tank,Cleric,Mage,Rogue,Berserker
+    python match_cache.py top --by combo --min-matches 50
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import argparse
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import httpx
+
+import arena_sim
+import ratelimit
+from ratelimit import RateLimiter, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "savage_matches.db"
+PUBLIC_PER_MINUTE = ratelimit.LIMITS["public"]
+BATCH_SIZE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_id INTEGER PRIMARY KEY,
+    ends_at INTEGER NOT NULL,
+    winner INTEGER NOT NULL,          -- 0 = A, 1 = B
+    duration INTEGER NOT NULL,
+    source TEXT NOT NULL,             -- "api" or "local"
+    has_log INTEGER NOT NULL,
+    payload BLOB NOT NULL,            -- zlib JSON, as /match/current served it
+    result BLOB NOT NULL              -- zlib JSON, as /result served it
+);
+CREATE TABLE IF NOT EXISTS sides (
+    match_id INTEGER NOT NULL,
+    side INTEGER NOT NULL,
+    team TEXT NOT NULL,
+    combo TEXT NOT NULL,              -- sorted roles joined with "+"
+    odds REAL,
+    won INTEGER NOT NULL,
+    PRIMARY KEY (match_id, side)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sides_team ON sides (team, won, odds);
+CREATE INDEX IF NOT EXISTS sides_combo ON sides (combo, won, odds);
+CREATE TABLE IF NOT EXISTS appearances (
+    match_id INTEGER NOT NULL,
+    slot INTEGER NOT NULL,            -- 0-4 team A, 5-9 team B
+    fighter_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    role TEXT NOT NULL,
+    won INTEGER NOT NULL,
+    survived INTEGER NOT NULL,
+    PRIMARY KEY (match_id, slot)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS appearances_fighter ON appearances (fighter_id, won, survived);
+CREATE INDEX IF NOT EXISTS appearances_name ON appearances (name, won, survived);
+CREATE INDEX IF NOT EXISTS appearances_role ON appearances (role, won, survived);
+"""
+
+GROUPS = {
+    "team": ("sides", "team"),
+    "combo": ("sides", "combo"),
+    "fighter": ("appearances", "name"),
+    "role": ("appearances", "role"),
+}
+
+
+def _pack(obj: Dict) -> bytes:
+    return zlib.compress(json.dumps(obj, separators=(",", ":")).encode(), 6)
+
+
+def _unpack(blob: bytes) -> Dict:
+    return json.loads(zlib.decompress(blob))
+
+
+def role_combo(fighters: Iterable[Dict]) -> str:
+    """Order-independent key for a team's roles, e.g. 'Cleric+Mage+Rogue+Tank+Tank'."""
+    return "+".join(sorted(f["role"] for f in fighters))
+
+
+def _rates(matches: int, wins: int, odds_sum: Optional[float] = None) -> Dict:
+    out = {"matches": matches, "wins": wins, "losses": matches - wins,
+           "win_rate": wins / matches if matches else None}
+    if odds_sum is not None:
+        out["avg_odds"] = odds_sum / matches if matches else None
+    return out
+
+
+# ============ CACHE ============
+class MatchCache:
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        # The trader settles from worker threads, one call at a time
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+
+    def close(self):
+        self.db.close()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+    def __contains__(self, match_id) -> bool:
+        mid = arena_sim.parse_match_id(match_id)
+        return self.db.execute("SELECT 1 FROM matches WHERE match_id = ?", (mid,)).fetchone() is not None
+
+    # ---- Reads ----
+
+    def get_match(self, match_id) -> Optional[Dict]:
+        """The cached match payload, or None."""
+        row = self.db.execute("SELECT payload FROM matches WHERE match_id = ?",
+                              (arena_sim.parse_match_id(match_id),)).fetchone()
+        return _unpack(row[0]) if row else None
+
+    def get_result(self, match_id) -> Optional[Dict]:
+        """The cached /result payload (battleLog only if it was stored), or None."""
+        row = self.db.execute("SELECT result FROM matches WHERE match_id = ?",
+                              (arena_sim.parse_match_id(match_id),)).fetchone()
+        return _unpack(row[0]) if row else None
+
+    def get_winner(self, match_id) -> Optional[str]:
+        """'A' / 'B' for a cached match, without decompressing anything."""
+        row = self.db.execute("SELECT winner FROM matches WHERE match_id = ?",
+                              (arena_sim.parse_match_id(match_id),)).fetchone()
+        return "AB"[row[0]] if row else None
+
+    def missing(self, start: int, count: int) -> List[int]:
+        """IDs in [start, start + count) that are not cached yet."""
+        have = {r[0] for r in self.db.execute(
+            "SELECT match_id FROM matches WHERE match_id >= ? AND match_id < ?", (start, start + count))}
+        return [mid for mid in range(start, start + count) if mid not in have]
+
+    # ---- Writes ----
+
+    def put_many(self, entries: Iterable[tuple], source: str):
+        """Store (match, result) pairs in one transaction. Matches still in play are refused."""
+        now_ms = time.time() * 1000
+        match_rows, side_rows, fighter_rows = [], [], []
+        for match, result in entries:
+            mid = arena_sim.parse_match_id(match["matchId"])
+            ends_at = match.get("endsAt") or arena_sim.match_times(mid)["endsAt"]
+            if ends_at > now_ms or result.get("winner") not in ("A", "B"):
+                raise ValueError(f"SAVAGE-{mid} has not ended - only final results are cached")
+            winner = "AB".index(result["winner"])
+            match_rows.append((mid, ends_at, winner, result["duration"], source,
+                               "battleLog" in result, _pack(match), _pack(result)))
+            odds = match.get("odds") or {}
+            for side, key in enumerate(("teamA", "teamB")):
+                fighters = match[key]["fighters"]
+                won = int(side == winner)
+                side_rows.append((mid, side, match[key]["name"], role_combo(fighters),
+                                  odds.get("AB"[side]), won))
+                final = {f["id"]: f for f in result[key]["fighters"]}
+                for i, f in enumerate(fighters):
+                    alive = final[f["id"]]["alive"] if f["id"] in final else False
+                    fighter_rows.append((mid, side * arena_sim.TEAM_SIZE + i, f["id"], f["name"],
+                                         f["role"], won, int(alive)))
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?, ?)", match_rows)
+            self.db.executemany("INSERT OR REPLACE INTO sides VALUES (?, ?, ?, ?, ?, ?)", side_rows)
+            self.db.executemany("INSERT OR REPLACE INTO appearances VALUES (?, ?, ?, ?, ?, ?, ?)", fighter_rows)
+
+    def put(self, match: Dict, result: Dict, source: str = "api"):
+        self.put_many([(match, result)], source)
+
+    # ---- Queries ----
+
+    def team_stats(self, team: str) -> Dict:
+        """Record of a team template (cf. GET /stats/team/:teamName)."""
+        matches, wins, odds = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(won), 0), SUM(odds) FROM sides WHERE team = ?", (team,)).fetchone()
+        return {"team": team, **_rates(matches, wins, odds or 0.0)}
+
+    def combo_stats(self, roles: Union[str, Sequence[str]]) -> Dict:
+        """Record of every team fielding exactly these roles, in any order."""
+        combo = "+".join(sorted(roles.split(",") if isinstance(roles, str) else roles))
+        matches, wins, odds = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(won), 0), SUM(odds) FROM sides WHERE combo = ?", (combo,)).fetchone()
+        return {"combo": combo, **_rates(matches, wins, odds or 0.0)}
+
+    def fighter_stats(self, fighter: Union[int, str]) -> Dict:
+        """Record of a fighter by ID or name (cf. GET /stats/fighter/:fighterId)."""
+        column = "fighter_id" if isinstance(fighter, int) or str(fighter).isdigit() else "name"
+        key = int(fighter) if column == "fighter_id" else fighter
+        matches, wins, survived = self.db.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(won), 0), COALESCE(SUM(survived), 0) "
+            f"FROM appearances WHERE {column} = ?", (key,)).fetchone()
+        return {"fighter": fighter, **_rates(matches, wins),
+                "survival_rate": survived / matches if matches else None}
+
+    def win_rates(self, by: str = "team", min_matches: int = 1) -> List[Dict]:
+        """Every team / combo / fighter / role with its record, best win rate first."""
+        table, column = GROUPS[by]
+        rows = self.db.execute(
+            f"SELECT {column}, COUNT(*) AS n, SUM(won) FROM {table} GROUP BY {column} "
+            f"HAVING n >= ? ORDER BY 1.0 * SUM(won) / COUNT(*) DESC", (min_matches,)).fetchall()
+        return [{by: key, **_rates(n, wins)} for key, n, wins in rows]
+
+
+# ============ BACKFILL ============
+def _fetch_result(client: httpx.Client, base_url: str, mid: int, bucket: TokenBucket, limiter: RateLimiter,
+                  max_tries: int = 5) -> Optional[Dict]:
+    """GET one result within the rate limits; None if it keeps failing."""
+    url = f"{base_url}/api/match/SAVAGE-{mid}/result"
+    for attempt in range(max_tries):
+        time.sleep(bucket.wait_time())
+        bucket.take()
+        # Background priority: live trading in this process always goes first
+        limiter.acquire(ratelimit.PUBLIC_LANES, ratelimit.PRIORITY_BACKGROUND)
+        try:
+            resp = client.get(url)
+        except httpx.HTTPError as e:
+            logger.warning(f"SAVAGE-{mid}: {e}")
+            time.sleep(2 ** attempt)
+            continue
+        if resp.status_code == 200:
+            return resp.json()
+        if resp.status_code == 429:
+            delay = ratelimit.retry_after(resp.headers, 2 ** attempt)
+            logger.info(f"⏳ Rate limited, backing off {delay:.1f}s")
+            limiter.penalize(ratelimit.PUBLIC_LANES, delay)
+        elif resp.status_code >= 500:
+            time.sleep(2 ** attempt)
+        else:
+            logger.warning(f"SAVAGE-{mid}: HTTP {resp.status_code}")
+            return None
+    return None
+
+
+def backfill(cache: MatchCache, start: int, count: int, api_url: Optional[str] = None,
+             batch_size: int = BATCH_SIZE, per_minute: float = PUBLIC_PER_MINUTE,
+             keep_log: bool = True, limiter: Optional[RateLimiter] = None) -> Dict:
+    """
+    Cache every ended match in [start, start + count) that isn't cached
+    yet. Results come from the API when api_url is given (paced at
+    per_minute, and at background priority on the shared limiter), else
+    from the local replay. Returns counts.
+    """
+    limiter = limiter or ratelimit.shared()
+    now_ms = time.time() * 1000
+    missing = cache.missing(start, count)
+    todo = [mid for mid in missing if arena_sim.match_times(mid)["endsAt"] <= now_ms]
+    stats = {"requested": count, "cached": count - len(missing), "stored": 0, "failed": 0,
+             "not_ended": len(missing) - len(todo)}
+    client = httpx.Client(timeout=30.0) if api_url else None
+    bucket = TokenBucket(per_minute, capacity=min(per_minute, batch_size)) if api_url else None
+    try:
+        for i in range(0, len(todo), batch_size):
+            entries = []
+            for mid in todo[i:i + batch_size]:
+                if client is not None:
+                    result = _fetch_result(client, api_url.rstrip("/"), mid, bucket, limiter)
+                else:
+                    result = arena_sim.match_result(mid)
+                if result is None:
+                    stats["failed"] += 1
+                    continue
+                if not keep_log:
+                    result.pop("battleLog", None)
+                entries.append((arena_sim.generate_match(mid), result))
+            cache.put_many(entries, "api" if client is not None else "local")
+            stats["stored"] += len(entries)
+            logger.info(f"📦 Cached {stats['stored']}/{len(todo)} matches")
+    finally:
+        if client is not None:
+            client.close()
+    return stats
+
+
+# ============ CLI ============
+def main():
+    parser = argparse.ArgumentParser(description="Local cache of ended Savage Arena matches")
+    parser.add_argument("--db", default=DEFAULT_PATH, help="SQLite file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fill = sub.add_parser("backfill", help="Cache a range of ended matches")
+    fill.add_argument("--start", type=int, default=1)
+    fill.add_argument("--count", type=int, default=1000)
+    fill.add_argument("--api", default="", help="Fetch results from this arena URL (default: local replay)")
+    fill.add_argument("--batch", type=int, default=BATCH_SIZE)
+    fill.add_argument("--per-minute", type=float, default=PUBLIC_PER_MINUTE)
+    fill.add_argument("--no-log", action="store_true", help="Don't keep battle logs")
+
+    for name in ("team", "fighter", "combo"):
+        sub.add_parser(name).add_argument("key")
+    top = sub.add_parser("top", help="Win rates grouped by team, combo, fighter or role")
+    top.add_argument("--by", choices=sorted(GROUPS), default="team")
+    top.add_argument("--min-matches", type=int, default=1)
+    top.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    cache = MatchCache(args.db)
+    start = time.perf_counter()
+    if args.command == "backfill":
+        out = backfill(cache, args.start, args.count, args.api or None, args.batch,
+                       args.per_minute, keep_log=not args.no_log)
+    elif args.command == "team":
+        out = cache.team_stats(args.key)
+    elif args.command == "fighter":
+        out = cache.fighter_stats(args.key)
+    elif args.command == "combo":
+        out = cache.combo_stats(args.key)
+    else:
+        out = cache.win_rates(args.by, args.min_matches)[:args.limit]
+    elapsed = time.perf_counter() - start
+    print(json.dumps(out, indent=2))
+    print(f"{len(cache)} matches cached in {args.db} "
+          f"({os.path.getsize(args.db) / 1e6:.1f} MB); {elapsed * 1000:.1f}ms", file=sys.stderr)
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Hot-path latency metrics for the Savage Arena agent.
+
+Per-stage timing histograms (match fetch, analysis, wager sizing, bet
+POST, Bankr submit/poll, result fetch, ...) and labelled counters
+(skipped matches, missed windows, API errors by status). The registry
+renders the Prometheus text exposition format, which serve() exposes
+on a local port, and summary() condenses it into a few log lines with
+recent p50/p99 per stage.
+
+Usage:
+    with metrics.timer("fetch"):
+        match = client.get_current_match()
+    metrics.count("api_errors", endpoint="bet", status=429)
+    metrics.serve(9108)   # curl localhost:9108/metrics
+"""
+
+import time
+import logging
+import threading
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "savage"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RECENT = 1000  # Samples kept per stage for the log summary
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent: Deque[float] = deque(maxlen=RECENT)
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def quantile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, float] = {}
+        self.started = time.time()
+
+    # ---- Recording ----
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            hist = self.histograms.get(stage)
+            if hist is None:
+                hist = self.histograms[stage] = Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def count(self, name: str, amount: float = 1, **labels):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def gauge(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+
+    # ---- Output ----
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            if self.histograms:
+                name = f"{PREFIX}_stage_seconds"
+                lines += [f"# HELP {name} Time spent per trading stage", f"# TYPE {name} histogram"]
+                for stage, hist in sorted(self.histograms.items()):
+                    cumulative = 0
+                    for bound, n in zip(hist.buckets, hist.counts):
+                        cumulative += n
+                        lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {hist.count}')
+                    lines.append(f'{name}_sum{{stage="{stage}"}} {hist.sum:.6f}')
+                    lines.append(f'{name}_count{{stage="{stage}"}} {hist.count}')
+            for counter, series in sorted(self.counters.items()):
+                name = f"{PREFIX}_{counter}_total"
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                    lines.append(f"{name}{{{label_text}}} {value:g}" if label_text else f"{name} {value:g}")
+            for gauge, value in sorted(self.gauges.items()):
+                name = f"{PREFIX}_{gauge}"
+                lines += [f"# TYPE {name} gauge", f"{name} {value:g}"]
+            lines += [f"# TYPE {PREFIX}_uptime_seconds gauge",
+                      f"{PREFIX}_uptime_seconds {time.time() - self.started:.0f}"]
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Stage latencies (recent p50/p99) and counter totals for the log."""
+        with self._lock:
+            stages = [f"{stage} {h.quantile(0.5) * 1000:.1f}/{h.quantile(0.99) * 1000:.1f}ms (n={h.count})"
+                      for stage, h in sorted(self.histograms.items())]
+            counters = []
+            for counter, series in sorted(self.counters.items()):
+                detail = " ".join(f"{'/'.join(v for _, v in labels)}={value:g}"
+                                  for labels, value in sorted(series.items()) if labels)
+                counters.append(f"{counter} {sum(series.values()):g}" + (f" ({detail})" if detail else ""))
+        return (f"Stages p50/p99: {'; '.join(stages) or 'none yet'}\n"
+                f"Counters: {'; '.join(counters) or 'none yet'}")
+
+    # ---- Endpoint ----
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve /metrics on a daemon thread."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        logger.info(f"📈 Metrics on http://{host}:{server.server_port}/metrics")
+        return server
+
+
+# Process-wide registry
+METRICS = Registry()
+observe = METRICS.observe
+timer = METRICS.timer
+count = METRICS.count
+gauge = METRICS.gauge
+render = METRICS.render
+summary = METRICS.summary
+serve = METRICS.serve
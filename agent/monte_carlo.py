@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Savage Arena Monte Carlo Win-Probability Estimator
+
+Runs N independent battles per matchup as one NumPy computation, using
+the arena's real combat rules (api/match/[id]/result.js):
+
+    hit chance   0.65 + spd * 0.1
+    damage       atk + U{-3..5}, 10% crits at 1.8x (floored)
+    mitigation   - floor(def * 0.3), minimum 1
+    targeting    uniform over enemies alive at the start of the tick
+
+Every fighter in every replicate is advanced per 100ms tick. Several
+matchups can be stacked into one call so a whole day's schedule is priced
+in a single pass.
+
+Usage:
+    python monte_carlo.py 1234 -n 10000          # one match
+    python monte_carlo.py --day 1234 -n 10000    # 288 matches from 1234
+"""
+
+import sys
+import time
+import argparse
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import arena_sim
+
+Matchup = Union[int, str, Dict, Tuple[List[Dict], List[Dict]]]
+
+MAX_TICKS = arena_sim.MATCH_TIME // arena_sim.TICK_MS
+MAX_ROWS = 1_000_000  # replicates simulated per chunk, bounds memory
+
+# Alive sets are 5-bit masks; these tables turn "pick the k-th living
+# enemy" into a single gather.
+_BITS = 1 << np.arange(arena_sim.TEAM_SIZE)
+_POPCOUNT = np.array([bin(m).count("1") for m in range(1 << arena_sim.TEAM_SIZE)], dtype=np.int8)
+_SLOTS = np.arange(2 * arena_sim.TEAM_SIZE, dtype=np.int16)
+_NTH_ALIVE = np.zeros((1 << arena_sim.TEAM_SIZE, arena_sim.TEAM_SIZE), dtype=np.int16)
+for _m in range(1 << arena_sim.TEAM_SIZE):
+    for _k, _slot in enumerate(i for i in range(arena_sim.TEAM_SIZE) if _m >> i & 1):
+        _NTH_ALIVE[_m, _k] = _slot
+
+
+# ============ INPUT HANDLING ============
+def matchup_fighters(matchup: Matchup) -> Tuple[List[Dict], List[Dict]]:
+    """Accept a match ID, a match payload or an (A fighters, B fighters) pair."""
+    if isinstance(matchup, (int, str)):
+        team_a, team_b, _, _ = arena_sim.draw_teams(matchup)
+        return team_a, team_b
+    if isinstance(matchup, dict):
+        if "teams" in matchup:
+            return matchup["teams"][0]["fighters"], matchup["teams"][1]["fighters"]
+        return matchup["teamA"]["fighters"], matchup["teamB"]["fighters"]
+    return matchup[0], matchup[1]
+
+
+def stat_arrays(matchups: Sequence[Matchup]) -> Dict[str, np.ndarray]:
+    """(M, 10) stat tables - slots 0-4 are team A, 5-9 team B."""
+    rows = [list(a) + list(b) for a, b in map(matchup_fighters, matchups)]
+    for r in rows:
+        if len(r) != 2 * arena_sim.TEAM_SIZE:
+            raise ValueError(f"Expected {arena_sim.TEAM_SIZE}v{arena_sim.TEAM_SIZE}, got {len(r)} fighters")
+
+    def col(key, default, dtype):
+        return np.array([[f.get(key, default) for f in r] for r in rows], dtype=dtype)
+
+    spd = np.array([[f.get("spd", f.get("speed", 1.0)) for f in r] for r in rows], dtype=np.float64)
+    defense = col("def", 5, np.float64)
+    return {
+        "hp": col("hp", 100, np.int32),
+        "atk": col("atk", 10, np.int32),
+        "hit": 0.65 + spd * 0.1,
+        "mit": np.floor(defense * 0.3).astype(np.int32),
+    }
+
+
+# ============ SIMULATION ============
+def simulate(stats: Dict[str, np.ndarray], n: int, rng: np.random.Generator,
+             hp0: Optional[np.ndarray] = None, track: bool = False,
+             start_tick: int = 0, record_ticks: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Simulate n replicates of every matchup in `stats`.
+
+    hp0 optionally overrides starting HP (shape (M, 10)), which is how
+    in-progress battles are continued; start_tick is how many ticks have
+    already been fought, so the timeout still falls at MATCH_TIME.
+    Returns per-replicate arrays of shape (M, n): winner (0 = A, 1 = B)
+    and duration in ms.
+
+    record_ticks=K adds "hp_path" (M, n, K, 10): each replicate's HP at
+    the start of its next K ticks, held at the final HP once it ends.
+
+    track=True also returns what a battle log would show: "kills" and
+    "crits" (event counts), "first_blood" (side that lost the first
+    fighter, -1 if nobody died), and per-slot "damage" and "kill_credit"
+    of shape (M, n, 10). It costs roughly 2x, so keep chunks smaller.
+    """
+    m = stats["hp"].shape[0]
+    total = m * n
+    start_hp = stats["hp"] if hp0 is None else hp0
+
+    # Live rows only - finished replicates are dropped as they end
+    row = np.arange(total)
+    hp = np.repeat(start_hp, n, axis=0).astype(np.int32)
+    atk = np.repeat(stats["atk"], n, axis=0).astype(np.float32)
+    hit = np.repeat(stats["hit"], n, axis=0).astype(np.float32)
+    mit = np.repeat(stats["mit"], n, axis=0).astype(np.float32)
+
+    winner = np.zeros(total, dtype=np.int8)
+    duration = np.zeros(total, dtype=np.int32)
+    if track:
+        kills = np.zeros(total, dtype=np.int16)
+        crits = np.zeros(total, dtype=np.int32)
+        first_blood = np.full(total, -1, dtype=np.int8)
+        damage = np.zeros((total, 2 * arena_sim.TEAM_SIZE), dtype=np.float32)
+        kill_credit = np.zeros((total, 2 * arena_sim.TEAM_SIZE), dtype=np.int16)
+    if record_ticks:
+        hp_path = np.zeros((total, record_ticks, 2 * arena_sim.TEAM_SIZE), dtype=np.int16)
+
+    size = arena_sim.TEAM_SIZE
+    slot_is_a = np.arange(2 * size) < size
+    enemy_offset = np.where(slot_is_a, size, 0).astype(np.int16)
+
+    for tick in range(start_tick, MAX_TICKS + 1):
+        step = tick - start_tick
+        if step < record_ticks:
+            hp_path[row, step] = hp
+        alive = hp > 0
+        mask_a = alive[:, :size] @ _BITS
+        mask_b = alive[:, size:] @ _BITS
+
+        if tick == MAX_TICKS:
+            # Time ran out - more fighters alive wins, then total HP (ties to A)
+            n_a, n_b = _POPCOUNT[mask_a], _POPCOUNT[mask_b]
+            hp_a = hp[:, :size].sum(axis=1)
+            hp_b = hp[:, size:].sum(axis=1)
+            b_wins = (n_b > n_a) | ((n_b == n_a) & (hp_b > hp_a))
+            winner[row] = b_wins
+            duration[row] = tick * arena_sim.TICK_MS
+            if step + 1 < record_ticks:
+                hp_path[row, step + 1:] = hp[:, None, :]
+            break
+
+        ended = (mask_a == 0) | (mask_b == 0)
+        if ended.any():
+            winner[row[ended]] = mask_a[ended] == 0
+            duration[row[ended]] = tick * arena_sim.TICK_MS
+            if step + 1 < record_ticks:
+                hp_path[row[ended], step + 1:] = hp[ended][:, None, :]
+            keep = ~ended
+            row, hp, alive = row[keep], hp[keep], alive[keep]
+            atk, hit, mit = atk[keep], hit[keep], mit[keep]
+            mask_a, mask_b = mask_a[keep], mask_b[keep]
+            if row.size == 0:
+                break
+
+        live = row.size
+        u = rng.random((3, live, 2 * size), dtype=np.float32)
+
+        # Targets come from the start-of-tick alive lists and damage never
+        # depends on the target's current HP, so all ten swings of a tick
+        # are independent and can be resolved at once.
+        enemy_mask = np.where(slot_is_a, mask_b[:, None], mask_a[:, None])
+        n_enemies = _POPCOUNT[enemy_mask]
+        k = np.minimum((u[0] * n_enemies).astype(np.int8), n_enemies - 1)
+        target = _NTH_ALIVE[enemy_mask, k] + enemy_offset
+        flat_target = target + (np.arange(live, dtype=np.int32) * (2 * size))[:, None]
+
+        # u[1] < hit decides the swing; given a hit it is uniform on
+        # [0, hit), so u[1] < 0.1 * hit is an independent 10% crit roll.
+        swings = alive & (u[1] < hit)
+        crit = u[1] < hit * 0.1
+        dmg = atk + np.floor(u[2] * 9) - 3
+        dmg = np.where(crit, np.floor(dmg * 1.8), dmg)
+        dmg = np.maximum(1, dmg - mit.ravel()[flat_target])
+        dmg *= swings
+
+        # Overkill within a tick just clamps at zero, so summing is exact
+        taken = np.bincount(flat_target.ravel(), weights=dmg.ravel(), minlength=live * 2 * size)
+        taken_hp = taken.astype(np.int32).reshape(live, 2 * size)
+        if track:
+            crits[row] += (crit & swings).sum(axis=1)
+            damage[row] += dmg
+            # Swings resolve in slot order, so a target dies on the swing
+            # where its running damage reaches its HP; the log records a
+            # kill for that swing and every later one on the same target.
+            # Only rows where someone died this tick need the breakdown.
+            dying = ((taken_hp >= hp) & alive).any(axis=1)
+            if dying.any():
+                on = (target[dying][:, :, None] == _SLOTS) & swings[dying][:, :, None]
+                running = np.cumsum(on * dmg[dying][:, :, None], axis=1)
+                by_attacker = (on & (running >= hp[dying][:, None, :])).sum(axis=2, dtype=np.int16)
+                dead_rows = row[dying]
+                kills[dead_rows] += by_attacker.sum(axis=1, dtype=np.int16)
+                kill_credit[dead_rows] += by_attacker
+                # Side A swings first, so the earliest killer decides
+                # which side lost a fighter first
+                new_blood = first_blood[dead_rows] < 0
+                if new_blood.any():
+                    first_killer = (by_attacker[new_blood] > 0).argmax(axis=1)
+                    first_blood[dead_rows[new_blood]] = first_killer < size
+
+        hp -= taken_hp
+        np.maximum(hp, 0, out=hp)
+
+    out = {"winner": winner.reshape(m, n), "duration": duration.reshape(m, n)}
+    if track:
+        out.update(kills=kills.reshape(m, n), crits=crits.reshape(m, n),
+                   first_blood=first_blood.reshape(m, n),
+                   damage=damage.reshape(m, n, 2 * size), kill_credit=kill_credit.reshape(m, n, 2 * size))
+    if record_ticks:
+        out["hp_path"] = hp_path.reshape(m, n, record_ticks, 2 * size)
+    return out
+
+
+def wilson_interval(wins: np.ndarray, n: int, z: float = 1.96) -> Tuple[np.ndarray, np.ndarray]:
+    """Wilson score interval for a binomial proportion."""
+    p = wins / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return centre - half, centre + half
+
+
+def estimate_win_probs(
+    matchups: Sequence[Matchup],
+    n: int = 10000,
+    seed: Optional[int] = None,
+    z: float = 1.96,
+) -> List[Dict]:
+    """
+    Estimate P(team A wins) for each matchup from n simulated battles.
+    Returns one dict per matchup with p_a, p_b, a (ci_low, ci_high)
+    interval on p_a and the mean simulated duration.
+    """
+    if n <= 0:
+        raise ValueError("n must be positive")
+    stats = stat_arrays(matchups)
+    rng = np.random.default_rng(seed)
+
+    per_chunk = max(1, MAX_ROWS // n)
+    results = []
+    for lo in range(0, stats["hp"].shape[0], per_chunk):
+        chunk = {k: v[lo:lo + per_chunk] for k, v in stats.items()}
+        sims = simulate(chunk, n, rng)
+        wins_a = (sims["winner"] == 0).sum(axis=1)
+        ci_low, ci_high = wilson_interval(wins_a, n, z)
+        for i in range(wins_a.size):
+            p_a = float(wins_a[i] / n)
+            results.append({
+                "p_a": p_a,
+                "p_b": 1 - p_a,
+                "ci_low": float(ci_low[i]),
+                "ci_high": float(ci_high[i]),
+                "n": n,
+                "mean_duration": float(sims["duration"][i].mean()),
+            })
+    return results
+
+
+def price_schedule(first_match_id: int, count: int, n: int = 10000,
+                   seed: Optional[int] = None) -> Dict[int, Dict]:
+    """Win probabilities for `count` consecutive match IDs, keyed by ID."""
+    ids = list(range(first_match_id, first_match_id + count))
+    return dict(zip(ids, estimate_win_probs(ids, n=n, seed=seed)))
+
+
+# ============ CLI ============
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo win probabilities for arena matchups")
+    parser.add_argument("match_id", nargs="?", type=int, help="Match ID (default: current)")
+    parser.add_argument("-n", "--replicates", type=int, default=10000)
+    parser.add_argument("--day", action="store_true", help="Price the next 288 matches from match_id")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    first = args.match_id or arena_sim.current_match_id()
+    count = 24 * 3600 * 1000 // arena_sim.MATCH_INTERVAL if args.day else 1
+
+    start = time.perf_counter()
+    priced = price_schedule(first, count, n=args.replicates, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    for mid, est in priced.items():
+        match = arena_sim.generate_match(mid)
+        odds = match["odds"]
+        print(f"SAVAGE-{mid}: P(A)={est['p_a']:.3f} [{est['ci_low']:.3f}, {est['ci_high']:.3f}] "
+              f"odds A {odds['A']:.2f}x / B {odds['B']:.2f}x  "
+              f"EV A {est['p_a'] * odds['A'] - 1:+.3f} / B {est['p_b'] * odds['B'] - 1:+.3f}")
+    print(f"{count} matchup(s) x {args.replicates} replicates in {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
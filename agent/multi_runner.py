@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Savage Arena Multi-Strategy Runner
+
+Hosts many SavageTrader strategies in one process. Each poll fetches
+/api/match/current once and broadcasts the payload to every strategy;
+Monte Carlo win probabilities are computed once per match and shared.
+Outcomes are resolved once per match and booked into each strategy's
+own session_stats. Bets from all strategies go through one rate-limited
+submission queue, and plans whose betting window has closed are dropped
+rather than sent late.
+
+All strategies share one pooled HTTP client and one RateLimiter (the
+bet lane set to --bets-per-minute); each keeps its own arena session
+(Bearer) and balance ledger.
+
+With --dry-run (or "dry_run": true on individual strategies) bets go
+into one shared in-process PaperBook instead of /api/bet: every paper
+strategy gets its own virtual bankroll, settled with the King's Tax,
+and paper bets skip the submission rate limit since nothing is sent.
+
+Usage:
+    python multi_runner.py --grid min_confidence=0.5,0.55,0.6 kelly_fraction=0.1,0.25
+    python multi_runner.py --strategies strategies.json --bets-per-minute 10
+    python multi_runner.py --random 200 --seed 7 --start-balance 1000
+    python multi_runner.py --dry-run --random 50 --seed 7
+
+strategies.json is a list of objects with an optional "name" and any
+Config fields, e.g. [{"name": "cautious", "min_confidence": 0.6}].
+"""
+
+import os
+import json
+import time
+import argparse
+import logging
+from collections import deque
+from dataclasses import fields, replace
+from typing import Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+import arena_sim
+import metrics
+import events
+import ratelimit
+import result_stream
+from paper import PaperArenaClient, PaperBook
+from savage_trader import (
+    Config,
+    SavageArenaClient,
+    SavageTrader,
+    BackgroundLoop,
+    match_teams,
+    needs_battle_log,
+    simulated_win_probs,
+    add_risk_args,
+    config_from_args,
+)
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FIELDS = {f.name for f in fields(Config)}
+
+
+# ============ RUNNER ============
+class Strategy:
+    def __init__(self, name: str, trader: SavageTrader):
+        self.name = name
+        self.trader = trader
+        self.stopped = False
+
+
+class MultiRunner:
+    def __init__(
+        self,
+        configs: List[Tuple[str, Config]],
+        arena_url: str,
+        bets_per_minute: float = 10,
+        poll_interval: float = 5,
+        start_balance: Optional[float] = None
+    ):
+        self.arena_url = arena_url
+        self.poll_interval = poll_interval
+        self.http = httpx.Client(timeout=30.0, limits=httpx.Limits(max_connections=10))
+        self.limiter = ratelimit.RateLimiter({"bet": bets_per_minute})
+        self.feed = SavageArenaClient(Config(arena_url=arena_url), http=self.http, limiter=self.limiter)
+        self.bankr_loop: Optional[BackgroundLoop] = None
+        self.book = PaperBook() if any(config.dry_run for _, config in configs) else None
+
+        self.strategies: List[Strategy] = []
+        for name, config in configs:
+            if config.dry_run:
+                if start_balance is not None:
+                    config = replace(config, paper_balance=start_balance)
+                arena = PaperArenaClient(config, self.book, http=self.http, limiter=self.limiter)
+            else:
+                if config.bankr_api_key and self.bankr_loop is None:
+                    self.bankr_loop = BackgroundLoop()
+                arena = SavageArenaClient(config, http=self.http, limiter=self.limiter)
+            trader = SavageTrader(config, arena=arena, bankr_loop=self.bankr_loop)
+            if start_balance is not None:
+                trader.ledger.seed(start_balance)
+            trader.name = name
+            self.strategies.append(Strategy(name, trader))
+
+        self.queue: Deque[Tuple[Strategy, Dict, float]] = deque()
+        self.counters = {"fetches": 0, "plans": 0, "submitted": 0, "rejected": 0, "expired": 0}
+        self.last_match_id: Optional[str] = None
+        self.settled_matches = 0
+
+    @property
+    def active(self) -> List[Strategy]:
+        return [s for s in self.strategies if not s.stopped]
+
+    # ---- Settlement ----
+
+    def settle(self):
+        """Resolve each ended match once and settle every strategy's bet on it."""
+        now_ms = time.time() * 1000
+        # Keyed by (match, local_settlement): a replayed winner must not settle a strategy that asked for /result
+        winners: Dict[Tuple[str, bool], Optional[str]] = {}
+        results: Dict[str, Optional[Dict]] = {}
+        for s in self.strategies:
+            bet = s.trader.current_bet
+            if not bet or now_ms < bet["ends_at"]:
+                continue
+            match_id, local = bet["match_id"], s.trader.config.local_settlement
+            key = (match_id, local)
+            if key not in winners:
+                if local:
+                    winners[key] = arena_sim.match_winner(match_id)
+                else:
+                    results[match_id] = self._fetch_result(match_id)
+                    winners[key] = results[match_id].get("winner") if results[match_id] else None
+            if winners[key] is not None:
+                s.trader.settle_bet(winners[key], results.get(match_id))
+        # Unresolved matches (failed fetch) are retried next poll and counted once they settle
+        self.settled_matches += len({match_id for (match_id, _), winner in winners.items() if winner is not None})
+
+    def _fetch_result(self, match_id: str) -> Optional[Dict]:
+        """
+        The match's result, read only up to the winner unless some
+        strategy holds a board bet on it. The streamed log can only be
+        read once, so it is collected for sharing between strategies.
+        """
+        board = any(s.trader.current_bet and s.trader.current_bet["match_id"] == match_id
+                    and needs_battle_log(s.trader.current_bet) for s in self.strategies)
+        result = self.feed.get_match_result(match_id, result_stream.SETTLEMENT_FIELDS, with_log=board)
+        if result and board:
+            try:
+                result["battleLog"] = list(result["battleLog"])
+            except Exception as e:
+                logger.warning(f"Battle log of {match_id} cut off ({e}), board bets will replay it locally")
+                del result["battleLog"]
+        return result
+
+    # ---- Broadcast ----
+
+    def shared_win_probs(self, match: Dict) -> Dict[int, Optional[List[float]]]:
+        """One Monte Carlo estimate per distinct mc_replicates setting."""
+        teams = match_teams(match)
+        probs = {}
+        for s in self.active:
+            n = s.trader.config.mc_replicates
+            if n not in probs:
+                probs[n] = simulated_win_probs(teams, s.trader.config) if n > 0 else None
+        return probs
+
+    def broadcast(self, match: Dict):
+        """Offer a betting match to every strategy and queue their bets."""
+        match_id = match.get("matchId") or match.get("id")
+        if match.get("status") != "betting" or match_id == self.last_match_id:
+            return
+        self.last_match_id = match_id
+        closes_at = match.get("bettingEndsAt") or arena_sim.match_times(
+            arena_sim.parse_match_id(match_id))["bettingEndsAt"]
+
+        probs = self.shared_win_probs(match)
+        for s in self.active:
+            trader = s.trader
+            if trader.current_bet:
+                logger.debug(f"[{s.name}] open bet on {trader.current_bet['match_id']}, skipping {match_id}")
+                continue
+            balance = trader.get_balance()
+            trader.begin_session(balance)
+            if trader.should_stop(balance):
+                logger.info(f"[{s.name}] stopped")
+                s.stopped = True
+                continue
+            plan = trader.plan_bet(match, balance, probs.get(trader.config.mc_replicates))
+            trader.mark_seen(match_id)
+            if plan:
+                self.counters["plans"] += 1
+                self.queue.append((s, plan, closes_at / 1000))
+
+    def drain(self, until: float):
+        """Submit queued bets as the rate limit allows, until `until` (epoch seconds)."""
+        while self.queue:
+            s, plan, closes_at = self.queue[0]
+            now = time.time()
+            if now >= closes_at - s.trader.config.bet_buffer_seconds / 2:
+                self.queue.popleft()
+                self.counters["expired"] += 1
+                metrics.count("missed_windows")
+                logger.warning(f"[{s.name}] ⏰ bet on {plan['match_id']} dropped - window closed")
+                continue
+            if not s.trader.config.dry_run:  # Paper bets send nothing
+                # The client takes the tokens; waiting here keeps the poll cadence
+                wait = self.limiter.wait_time(ratelimit.BET_LANES, ratelimit.PRIORITY_BET)
+                if wait > 0:
+                    if now + wait >= until:
+                        break
+                    time.sleep(wait)
+                    continue
+            self.queue.popleft()
+            ok = s.trader.submit_bet(plan)
+            self.counters["submitted" if ok else "rejected"] += 1
+        remaining = until - time.time()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def run_once(self) -> bool:
+        """Fetch, settle, broadcast and submit for one poll interval."""
+        deadline = time.time() + self.poll_interval
+        match = self.feed.get_current_match()
+        self.counters["fetches"] += 1
+        if match and self.book is not None:
+            self.book.observe(match)
+        self.settle()
+        if match:
+            self.broadcast(match)
+        self.drain(deadline)
+        return bool(self.active) or any(s.trader.current_bet for s in self.strategies)
+
+    # ---- Reporting ----
+
+    def log_summary(self, top: int = 20):
+        rows = []
+        for s in self.strategies:
+            st = s.trader.session_stats
+            profit = st["total_won"] - st["total_wagered"]
+            rows.append((profit, s.name, st, s.stopped))
+        rows.sort(key=lambda r: r[0], reverse=True)
+        lines = [f"{'strategy':<28} {'bets':>5} {'W/L':>9} {'wagered':>10} {'profit':>10}"]
+        for profit, name, st, stopped in rows[:top]:
+            lines.append(f"{name[:28]:<28} {st['bets_placed']:>5} {st['bets_won']:>4}/{st['bets_lost']:<4} "
+                         f"{st['total_wagered']:>10.2f} {profit:>+10.2f}{' (stopped)' if stopped else ''}")
+        c = self.counters
+        logger.info(f"""
+========== STRATEGIES ({len(self.active)}/{len(self.strategies)} active) ==========
+{chr(10).join(lines)}
+Fetches: {c['fetches']}  Plans: {c['plans']}  Submitted: {c['submitted']}  Rejected: {c['rejected']}  Expired: {c['expired']}
+{self._book_summary()}{metrics.summary()}
+""")
+
+    def _book_summary(self) -> str:
+        if self.book is None:
+            return ""
+        b = self.book.stats
+        return (f"Paper book: {b['bets']} bets, {b['wagered']:.2f} wagered, "
+                f"{b['bets_won']}W / {b['bets_lost']}L / {b['bets_push']}P, "
+                f"{b['bets_closed']} late, {b['bets_insufficient']} over balance\n")
+
+    def run(self, summary_every: int = 12):
+        logger.info(f"Running {len(self.strategies)} strategies against {self.arena_url}")
+        reported = 0
+        try:
+            while self.run_once():
+                if self.settled_matches - reported >= summary_every:
+                    reported = self.settled_matches
+                    self.log_summary()
+            logger.info("All strategies stopped.")
+        except KeyboardInterrupt:
+            logger.info("\nShutdown requested...")
+        finally:
+            self.log_summary(top=len(self.strategies))
+            self.http.close()
+            if self.bankr_loop:
+                self.bankr_loop.stop()
+
+
+# ============ CLI ============
+def load_strategies(path: str, base: Config) -> List[Tuple[str, Config]]:
+    with open(path) as fh:
+        entries = json.load(fh)
+    configs = []
+    for i, entry in enumerate(entries):
+        unknown = set(entry) - CONFIG_FIELDS - {"name"}
+        if unknown:
+            raise ValueError(f"{path}[{i}]: unknown Config fields {sorted(unknown)}")
+        params = {k: v for k, v in entry.items() if k != "name"}
+        configs.append((entry.get("name", f"s{i}"), replace(base, **params)))
+    return configs
+
+
+def describe(config: Config, base: Config) -> str:
+    changed = [f"{f}={getattr(config, f):g}" for f in ("min_confidence", "max_wager_pct", "kelly_fraction",
+                                                        "min_wager", "stop_loss_pct", "max_consecutive_losses")
+               if getattr(config, f) != getattr(base, f)]
+    return ",".join(changed) or "base"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many SavageTrader strategies off one match feed")
+    parser.add_argument("--arena-url", default=os.getenv("SAVAGE_ARENA_URL", "https://savage-arena.vercel.app"))
+    parser.add_argument("--strategies", help="JSON list of Config overrides")
+    parser.add_argument("--grid", nargs="*", metavar="NAME=V1,V2", help="Grid of strategies (see sweep.py)")
+    parser.add_argument("--random", type=int, metavar="N", help="N random strategies (see sweep.py)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--bets-per-minute", type=float, default=10, help="Shared bet submission rate")
+    parser.add_argument("--poll", type=float, default=5, help="Seconds between match fetches")
+    parser.add_argument("--start-balance", type=float, help="Seed every ledger instead of querying balances")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Paper-trade every strategy against one in-process book; no bets are sent")
+    parser.add_argument("--server-settlement", action="store_true",
+                        help="Settle from the arena's /result instead of the local arena_sim replay")
+    parser.add_argument("--summary-every", type=int, default=12, help="Log the leaderboard every N matches")
+    parser.add_argument("--metrics-port", type=int, default=0, help="Serve Prometheus metrics on this port")
+    add_risk_args(parser)
+    parser.add_argument("--events", default="savage_events.jsonl", help="JSONL event log ('' to disable)")
+    parser.add_argument("--log-file", default="", help="Text log file")
+    parser.add_argument("--quiet", action="store_true", help="No console output")
+    args = parser.parse_args()
+    events.setup_logging(args.events or None, console=not args.quiet, log_file=args.log_file or None)
+
+    base = config_from_args(args, arena_url=args.arena_url, dry_run=args.dry_run,
+                           local_settlement=not args.server_settlement)
+    configs: List[Tuple[str, Config]] = []
+    if args.strategies:
+        configs += load_strategies(args.strategies, base)
+    if args.grid or args.random:
+        import sweep
+        generated = (sweep.grid_configs(base, args.grid) if args.grid else []) + \
+                    (sweep.random_configs(base, args.random, args.seed) if args.random else [])
+        configs += [(describe(c, base), c) for c in generated]
+    if not configs:
+        configs = [("base", base)]
+
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    runner = MultiRunner(configs, args.arena_url, args.bets_per_minute, args.poll, args.start_balance)
+    runner.run(args.summary_every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Savage Arena Paper Trading
+
+Runs traders against the live match feed with bets routed into an
+in-process book instead of POST /api/bet. Matches, results and betting
+windows come from the real API exactly as in live trading; only the
+money is virtual, so a paper run adds no write load and risks nothing.
+
+PaperBook is the Book the local arena also runs on (book.py) - the
+same validation (betting window, minimum stake, balance, market list),
+the same quotes and the same settlement paying stake plus profit less
+the 5% King's Tax - keyed to the wall clock and to the windows the feed
+announces rather than a local arena clock. Bets settle once the feed's endsAt has passed, from
+arena_sim's bit-exact replay of the battle, so settlement costs no API
+reads either. One book holds any number of accounts, so dozens of
+strategies with different Configs can trade side by side off one feed
+(multi_runner.py --dry-run).
+
+PaperArenaClient is a SavageArenaClient whose place_bet / place_bets /
+get_balance go to the book (answering with the receipt /api/bet would
+return) while every read still goes over HTTP.
+
+Usage:
+    python savage_trader.py --dry-run
+    python multi_runner.py --dry-run --grid kelly_fraction=0.1,0.25,0.5 min_confidence=0.5,0.55,0.6
+"""
+
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+import arena_sim
+import metrics
+import ratelimit
+from book import DEFAULT_BALANCE, ArenaClock, Book
+from savage_trader import Config, SavageArenaClient
+
+logger = logging.getLogger(__name__)
+
+
+# ============ BOOK ============
+class PaperBook(Book):
+    """Virtual bankrolls settled like the arena's, on the feed's timeline."""
+
+    def __init__(self, start_balance: float = DEFAULT_BALANCE):
+        super().__init__(ArenaClock(1.0), start_balance)
+        self.matches: Dict[int, Dict] = {}   # match ID -> latest feed payload
+
+    def open(self, balance: Optional[float] = None) -> str:
+        """A new account, optionally with its own starting bankroll; returns its ID."""
+        with self.lock:
+            agent_id = f"paper_{len(self.balances):04d}"
+            self.balances[agent_id] = self.start_balance if balance is None else balance
+        return agent_id
+
+    def observe(self, match: Dict):
+        """Remember a feed payload - its odds and (wall-clock) windows govern bets on it."""
+        try:
+            mid = arena_sim.parse_match_id(match.get("matchId") or match.get("id"))
+        except (TypeError, ValueError):
+            return
+        with self.lock:
+            self.matches[mid] = match
+
+    def match(self, mid: int) -> Dict:
+        return self.matches.get(mid) or arena_sim.generate_match(mid)
+
+    def times(self, mid: int) -> Dict:
+        match = self.matches.get(mid, {})
+        if "bettingEndsAt" in match and "endsAt" in match:
+            return match
+        return arena_sim.match_times(mid)
+
+    def settle_ended(self):
+        super().settle_ended()
+        now = self.clock.now()
+        for mid in [m for m in self.matches if m not in self.pending and self.times(m)["endsAt"] <= now]:
+            del self.matches[mid]
+
+
+# ============ CLIENT ============
+class PaperArenaClient(SavageArenaClient):
+    """Reads from the arena API, bets into a PaperBook."""
+
+    def __init__(self, config: Config, book: Optional[PaperBook] = None, http: Optional[httpx.Client] = None,
+                 limiter: Optional[ratelimit.RateLimiter] = None):
+        super().__init__(config, http, limiter)
+        self.book = book or PaperBook(config.paper_balance)
+        self.account = self.book.open(config.paper_balance)
+
+    def get_current_match(self) -> Optional[Dict]:
+        match = super().get_current_match()
+        if match:
+            self.book.observe(match)
+        return match
+
+    def _post_bet(self, body: Dict, deadline: Optional[float] = None) -> Optional[Dict]:
+        with metrics.timer("bet_post"):
+            status, payload = self.book.place_bet(self.account, body)
+        if status == 200:
+            return payload
+        metrics.count("api_errors", endpoint="paper_bet", status=status)
+        logger.warning(f"Paper bet refused: {status} - {payload.get('error')}")
+        return None
+
+    def get_balance(self) -> float:
+        return self.book.agent_balance(self.account)["balance"]
@@ -0,0 +1,15 @@
+"""
+Savage Arena payout rules.
+
+The one place the King's Tax lives: the trader's ledger, the board
+pricer's expected values and the local arena's settlement all import it
+from here, so a winning bet pays the same everywhere.
+"""
+
+KINGS_TAX = 0.05  # House takes 5% of winning profit
+
+
+def net_payout(wager: float, odds: float) -> float:
+    """Winning payout after the King's Tax on profit (stake is untaxed)."""
+    profit = wager * (odds - 1)
+    return wager + profit * (1 - KINGS_TAX)
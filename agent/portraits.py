@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Savage Arena Portrait Compositor
+
+Batch version of pfp-generator.js: composites fighter portraits from the
+layered PNGs in layers/ (or chimera-assets/) for a whole collection at
+once instead of one <canvas> at a time in the browser.
+
+Every layer file a batch needs is decoded exactly once, in the parent,
+into an RGBA image cache. Worker processes receive that cache when they
+start (ProcessPoolExecutor initializer) and from then on only
+alpha-composite and encode - no PNG is decoded twice, however many
+thousand portraits use it. Layers stack in pfp-generator.js's
+LAYER_ORDER and are scaled nearest-neighbour, exactly like the canvas.
+
+Trait combinations are drawn from one random.Random(seed), so the same
+seed, count and asset tree always give the same tokens, byte for byte.
+Each layer is included at its rate in the Chimera collection
+(metadata.json) and the collection's rules hold: robes replace chest,
+pants and shield; a shield and an off-hand item never appear together;
+every shield is worn with its own strap. Duplicate combinations are
+redrawn. --from-metadata re-renders an existing manifest instead.
+
+Output is images/<token>.png plus a metadata.json in the collection's
+own shape ({"data": [{"attributes", "description", "image", "name"}]}).
+macOS resource-fork files (__MACOSX/, ._*) are never indexed.
+
+Usage:
+    python portraits.py --count 5555 --seed 7 --out portraits/
+    python portraits.py --from-metadata ../metadata.json --out collection/ --size 512
+    python portraits.py --assets ../chimera-assets --count 100 --workers 1
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ASSETS = os.path.join(REPO_ROOT, "layers")
+DEFAULT_DESCRIPTION = ("5555 Generative Chimera\n"
+                       "over 500 Attributes, 100+custom Chimera 1/1s, endless possible metas.")
+
+# Bottom to top (pfp-generator.js LAYER_ORDER)
+LAYER_ORDER = [
+    "Capes", "Shield", "Base", "Condition:Enhancement", "Pant", "Chest", "Boots", "Robes",
+    "Gloves", "ShieldStrap", "Belt", "Off_Hand", "Helms", "Shoulder", "Sword",
+]
+
+# Folders searched per layer, first match wins (pfp-generator.js LAYER_PATHS, relative to the asset root)
+NEW = "New Layers For Chipi"
+LAYER_PATHS = {
+    "Base": ["Base", f"{NEW}/new bases"],
+    "Sword": ["Sword", f"{NEW}/New Main Hand", NEW],
+    "Boots": ["Boots", f"{NEW}/New Boots"],
+    "Chest": ["Chest", f"{NEW}/New chest"],
+    "Belt": ["Belt", f"{NEW}/New Belt"],
+    "Gloves": ["Gloves", f"{NEW}/New Gloves"],
+    "Shoulder": ["Shoulder", f"{NEW}/New Shoulder"],
+    "Capes": ["Capes", f"{NEW}/New Cape", NEW],
+    "Off_Hand": ["Off_Hand", "Off_Hand/Items", "Off_Hand/Staff", f"{NEW}/New Off Hand"],
+    "ShieldStrap": ["Shield/ShieldStrap"],
+    "Shield": ["Shield"],
+    "Pant": ["Pant"],
+    "Robes": ["Robes", NEW],
+    "Helms": ["Helms"],
+    "Condition:Enhancement": ["Condition:Enhancement"],
+}
+
+# metadata.json trait_type <-> layer folder, where they differ
+TRAIT_TYPES = {"Helms": "Helmet", "Off_Hand": "Off Hand"}
+TRAIT_LAYERS = {trait: layer for layer, trait in TRAIT_TYPES.items()}
+
+# Share of the collection wearing each layer, in draw order (metadata.json,
+# 5555 tokens). Off_Hand's rate is among the shieldless; ShieldStrap follows Shield.
+INCLUDE_RATES = {
+    "Base": 1.0, "Sword": 1.0, "Boots": 1.0, "Belt": 0.95,
+    "Robes": 0.04, "Chest": 0.56, "Pant": 0.40, "Shield": 0.47, "Off_Hand": 0.37,
+    "Gloves": 0.57, "Shoulder": 0.57, "Capes": 0.42, "Condition:Enhancement": 0.25, "Helms": 0.21,
+}
+EXCLUDES = {"Robes": ("Chest", "Pant", "Shield"), "Shield": ("Off_Hand",)}
+
+MAX_REDRAWS = 1000
+
+Traits = Dict[str, str]   # layer -> trait name (underscored, as in the file name)
+
+
+# ============ ASSET INDEX ============
+def normalize(name: str) -> str:
+    """Lookup key for a trait name or file stem: underscores for spaces, case-folded."""
+    return name.strip().replace(" ", "_").casefold()
+
+
+def is_resource_fork(path: str) -> bool:
+    """AppleDouble debris from a macOS zip - __MACOSX/ trees and ._ files."""
+    return "__MACOSX" in path.split(os.sep) or os.path.basename(path).startswith("._")
+
+
+def index_assets(root: str = DEFAULT_ASSETS) -> Dict[str, Dict[str, str]]:
+    """layer -> {normalized trait name: PNG path}, searching LAYER_PATHS in order."""
+    index: Dict[str, Dict[str, str]] = {}
+    for layer, folders in LAYER_PATHS.items():
+        found = index[layer] = {}
+        for folder in folders:
+            directory = os.path.join(root, folder)
+            if not os.path.isdir(directory) or is_resource_fork(directory):
+                continue
+            for filename in sorted(os.listdir(directory)):
+                path = os.path.join(directory, filename)
+                stem, ext = os.path.splitext(filename)
+                if ext.lower() != ".png" or is_resource_fork(path) or not os.path.isfile(path):
+                    continue
+                found.setdefault(normalize(stem), path)
+    return index
+
+
+def pair_strap(shield: str, straps: Dict[str, str]) -> Optional[str]:
+    """The strap drawn for a shield - the one sharing the longest name prefix ("Viking_Shield" -> "Viking_Strap")."""
+    if not straps:
+        return None
+    key = normalize(shield)
+    best = max(sorted(straps), key=lambda s: len(os.path.commonprefix([key, s])))
+    return best if os.path.commonprefix([key, best]) else None
+
+
+# ============ COMBINATIONS ============
+def draw_traits(rng: random.Random, index: Dict[str, Dict[str, str]]) -> Traits:
+    traits: Traits = {}
+    excluded = set()
+    for layer, rate in INCLUDE_RATES.items():
+        options = sorted(index.get(layer, {}))
+        if layer in excluded or not options or rng.random() >= rate:
+            continue
+        traits[layer] = rng.choice(options)
+        excluded.update(EXCLUDES.get(layer, ()))
+    if "Shield" in traits:
+        strap = pair_strap(traits["Shield"], index.get("ShieldStrap", {}))
+        if strap:
+            traits["ShieldStrap"] = strap
+    return traits
+
+
+def generate_combinations(index: Dict[str, Dict[str, str]], count: int, seed: int = 0) -> List[Traits]:
+    """`count` distinct trait sets, reproducible from `seed`."""
+    rng = random.Random(seed)
+    seen = set()
+    combos: List[Traits] = []
+    while len(combos) < count:
+        for _ in range(MAX_REDRAWS):
+            traits = draw_traits(rng, index)
+            key = tuple(sorted(traits.items()))
+            if key not in seen:
+                break
+        else:
+            raise ValueError(f"Only {len(combos)} distinct combinations found for {count} requested")
+        seen.add(key)
+        combos.append(traits)
+    return combos
+
+
+def combinations_from_metadata(path: str, index: Dict[str, Dict[str, str]]) -> Tuple[List[Dict], Counter]:
+    """
+    Tokens from a metadata.json manifest as [{"token", "name", "description",
+    "traits"}], plus a Counter of (trait_type, value) pairs with no layer file.
+    """
+    with open(path) as fh:
+        data = json.load(fh)
+    tokens, missing = [], Counter()
+    for i, entry in enumerate(data.get("data", data) if isinstance(data, dict) else data, 1):
+        name = entry.get("name") or f"#{i}"
+        token = name.rsplit("#", 1)[-1].strip() or str(i)
+        traits: Traits = {}
+        for attr in entry.get("attributes", []):
+            layer = TRAIT_LAYERS.get(attr.get("trait_type"), attr.get("trait_type"))
+            key = normalize(str(attr.get("value", "")))
+            if key in index.get(layer, {}):
+                traits[layer] = key
+            else:
+                missing[(attr.get("trait_type"), attr.get("value"))] += 1
+        tokens.append({"token": token, "name": name, "description": entry.get("description"), "traits": traits})
+    return tokens, missing
+
+
+# ============ COMPOSITING ============
+def load_layers(index: Dict[str, Dict[str, str]], combos: List[Traits]) -> Dict[Tuple[str, str], Image.Image]:
+    """Decode every layer file the batch uses, once."""
+    cache = {}
+    for traits in combos:
+        for layer, name in traits.items():
+            if (layer, name) not in cache:
+                with Image.open(index[layer][name]) as im:
+                    cache[(layer, name)] = im.convert("RGBA")
+    return cache
+
+
+def composite(cache: Dict[Tuple[str, str], Image.Image], traits: Traits, size: Optional[int] = None) -> Image.Image:
+    layers = [cache[(layer, traits[layer])] for layer in LAYER_ORDER if layer in traits]
+    width = max(im.width for im in layers)
+    height = max(im.height for im in layers)
+    canvas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    for im in layers:
+        if im.size != canvas.size:
+            im = im.resize(canvas.size, Image.NEAREST)
+        canvas.alpha_composite(im)
+    if size and canvas.size != (size, size):
+        canvas = canvas.resize((size, size), Image.NEAREST)
+    return canvas
+
+
+_worker: Dict = {}
+
+
+def _init_worker(cache: Dict[Tuple[str, str], Image.Image], out_dir: str, size: Optional[int]):
+    _worker.update(cache=cache, out_dir=out_dir, size=size)
+
+
+def _render_batch(batch: List[Tuple[str, Traits]]) -> int:
+    for token, traits in batch:
+        image = composite(_worker["cache"], traits, _worker["size"])
+        image.save(os.path.join(_worker["out_dir"], f"{token}.png"))
+    return len(batch)
+
+
+def render(
+    jobs: List[Tuple[str, Traits]],
+    cache: Dict[Tuple[str, str], Image.Image],
+    out_dir: str,
+    size: Optional[int] = None,
+    workers: int = 1,
+    batch_size: int = 100
+) -> int:
+    """Write out_dir/<token>.png for every (token, traits) job; returns the count written."""
+    os.makedirs(out_dir, exist_ok=True)
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+    if workers <= 1:
+        _init_worker(cache, out_dir, size)
+        return sum(map(_render_batch, batches))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cache, out_dir, size)) as pool:
+        return sum(pool.map(_render_batch, batches))
+
+
+# ============ MANIFEST ============
+def display_name(name: str, index: Dict[str, str]) -> str:
+    """The file's own spelling with spaces, e.g. "royal_silk_cape" -> "Royal Silk cape"."""
+    path = index.get(name)
+    return (os.path.splitext(os.path.basename(path))[0] if path else name).replace("_", " ")
+
+
+def manifest_entry(token: str, traits: Traits, index: Dict[str, Dict[str, str]],
+                   name: Optional[str] = None, description: Optional[str] = None) -> Dict:
+    attributes = [{"value": display_name(value, index[layer]), "trait_type": TRAIT_TYPES.get(layer, layer)}
+                  for layer, value in traits.items()]
+    attributes.sort(key=lambda a: a["trait_type"])
+    return {
+        "attributes": attributes,
+        "description": description or DEFAULT_DESCRIPTION,
+        "image": f"images/{token}.png",
+        "name": name or f"Chimera #{token}",
+    }
+
+
+# ============ CLI ============
+def main():
+    parser = argparse.ArgumentParser(description="Composite fighter portraits from the layered PNG assets")
+    parser.add_argument("--assets", default=DEFAULT_ASSETS, help="Layer tree (layers/ or chimera-assets/)")
+    parser.add_argument("--out", default="portraits", help="Output directory")
+    parser.add_argument("--count", type=int, default=5555, help="Portraits to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", type=int, default=1, help="First token number")
+    parser.add_argument("--from-metadata", metavar="PATH", help="Re-render the tokens of a metadata.json")
+    parser.add_argument("--size", type=int, help="Output edge in pixels (default: native, 128)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    t0 = time.perf_counter()
+    index = index_assets(args.assets)
+    files = sum(len(names) for names in index.values())
+    if not files:
+        parser.error(f"no layer PNGs under {args.assets}")
+
+    if args.from_metadata:
+        tokens, missing = combinations_from_metadata(args.from_metadata, index)
+        if missing:
+            logger.warning(f"⚠️ {sum(missing.values())} traits in {len(missing)} distinct values have no layer file; "
+                           f"rendered without them")
+            for (trait_type, value), n in missing.most_common(10):
+                logger.warning(f"   {trait_type}: {value} ({n}x)")
+        entries = [manifest_entry(t["token"], t["traits"], index, t["name"], t["description"]) for t in tokens]
+        jobs = [(t["token"], t["traits"]) for t in tokens]
+    else:
+        combos = generate_combinations(index, args.count, args.seed)
+        jobs = [(str(args.start + i), traits) for i, traits in enumerate(combos)]
+        entries = [manifest_entry(token, traits, index) for token, traits in jobs]
+
+    cache = load_layers(index, [traits for _, traits in jobs])
+    t1 = time.perf_counter()
+    logger.info(f"🎨 {len(jobs)} portraits, {len(cache)} of {files} layers decoded in {t1 - t0:.2f}s")
+
+    written = render(jobs, cache, os.path.join(args.out, "images"), args.size, args.workers, args.batch_size)
+    manifest = {"data": entries}
+    if not args.from_metadata:
+        manifest["seed"] = args.seed
+    with open(os.path.join(args.out, "metadata.json"), "w") as fh:
+        json.dump(manifest, fh, indent=2)
+    t2 = time.perf_counter()
+    print(f"{written} portraits composited in {t2 - t1:.2f}s -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Client-side rate limiting for the Savage Arena API.
+
+API-SPEC.md allows 100 req/min on public endpoints, 300 on authenticated
+ones and 10 bet placements per minute. RateLimiter keeps one token
+bucket per lane ("public", "auth", "bet") and every arena call takes a
+token from its lanes before it goes out - a bet takes one from "bet"
+and one from "auth" - so a process never trips the server's limits in
+the first place. One limiter is shared by every client in the process
+(shared()), multi_runner's strategies and a backfill included.
+
+Requests carry a priority: PRIORITY_BET, PRIORITY_NORMAL (polls, results,
+balance) or PRIORITY_BACKGROUND (stats and history backfill). Waiters
+are served in priority order per lane: a request may only take a token
+while enough remain for every higher-priority request already waiting
+on that lane, and background requests additionally leave a `reserve`
+share of each bucket untouched. However busy an analytics job keeps the
+public lane, a bet in its closing seconds finds its tokens.
+
+A 429's Retry-After blocks the lanes involved for that long (penalize()),
+so every caller waits it out instead of retrying into another 429.
+coalesce() merges concurrent identical GETs (three threads polling
+/match/current at once make one request and share the answer).
+
+Usage:
+    limiter = ratelimit.shared()
+    if limiter.acquire(ratelimit.BET_LANES, ratelimit.PRIORITY_BET, deadline=closes_at) is None:
+        ...  # Couldn't get a slot before the window closed
+    match = limiter.coalesce("GET /api/match/current", fetch)
+"""
+
+import time
+import itertools
+import threading
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Hashable, Optional, Sequence, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+LIMITS = {"public": 100, "auth": 300, "bet": 10}  # Requests per minute (API-SPEC.md)
+PUBLIC_LANES = ("public",)
+AUTH_LANES = ("auth",)
+BET_LANES = ("bet", "auth")
+
+PRIORITY_BET = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+
+
+class TokenBucket:
+    """`rate` tokens per `per` seconds, bursting up to `capacity`."""
+
+    def __init__(self, rate: float, per: float = 60.0, capacity: Optional[float] = None):
+        self.rate = rate / per
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, need: float = 1) -> float:
+        """Seconds until `need` tokens are available."""
+        self._refill()
+        return 0.0 if self.tokens >= need else (need - self.tokens) / self.rate
+
+    def take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+def retry_after(headers, default: float = 1.0) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    value = headers.get("Retry-After")
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class RateLimiter:
+    def __init__(self, limits: Optional[Dict[str, float]] = None, per: float = 60.0, reserve: float = 0.2):
+        """
+        limits maps lane -> requests per `per` seconds (default LIMITS).
+        Background requests leave `reserve` x capacity in each bucket.
+        """
+        self.buckets = {lane: TokenBucket(rate, per) for lane, rate in {**LIMITS, **(limits or {})}.items()}
+        self.reserve = reserve
+        self.blocked_until: Dict[str, float] = {}  # lane -> monotonic time a 429 lifts
+        self.stats = {"requests": 0, "waited": 0, "wait_seconds": 0.0, "expired": 0,
+                      "rate_limited": 0, "coalesced": 0}
+        self._cond = threading.Condition()
+        self._waiters: Set[Tuple[int, int, Tuple[str, ...]]] = set()
+        self._seq = itertools.count()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    # ---- Tokens ----
+
+    def _wait_time(self, ticket: Tuple[int, int, Tuple[str, ...]]) -> float:
+        """Seconds until `ticket` may take its tokens (0 = now). Caller holds the lock."""
+        now = time.monotonic()
+        wait = 0.0
+        for lane in ticket[2]:
+            ahead = sum(1 for w in self._waiters if w[:2] < ticket[:2] and lane in w[2])
+            bucket = self.buckets[lane]
+            need = 1 + ahead
+            if ticket[0] >= PRIORITY_BACKGROUND:
+                need += self.reserve * bucket.capacity
+            wait = max(wait, bucket.wait_time(need), self.blocked_until.get(lane, 0) - now)
+        return wait
+
+    def wait_time(self, lanes: Sequence[str], priority: int = PRIORITY_NORMAL) -> float:
+        """Seconds a request on `lanes` would wait right now, without taking anything."""
+        with self._cond:
+            return self._wait_time((priority, next(self._seq), tuple(lanes)))
+
+    def acquire(self, lanes: Sequence[str], priority: int = PRIORITY_NORMAL,
+                deadline: Optional[float] = None) -> Optional[float]:
+        """
+        Block until a token from each of `lanes` is ours; returns the
+        seconds waited, or None if that would run past `deadline`
+        (epoch seconds).
+        """
+        start = time.monotonic()
+        ticket = (priority, next(self._seq), tuple(lanes))
+        with self._cond:
+            self._waiters.add(ticket)
+            try:
+                while True:
+                    wait = self._wait_time(ticket)
+                    if wait <= 0:
+                        break
+                    if deadline is not None and time.time() + wait > deadline:
+                        self.stats["expired"] += 1
+                        return None
+                    self._cond.wait(wait)
+                for lane in ticket[2]:
+                    self.buckets[lane].tokens -= 1
+            finally:
+                self._waiters.discard(ticket)
+                self._cond.notify_all()
+            waited = time.monotonic() - start
+            self.stats["requests"] += 1
+            if waited > 0.001:
+                self.stats["waited"] += 1
+                self.stats["wait_seconds"] += waited
+        return waited
+
+    def penalize(self, lanes: Sequence[str], seconds: float):
+        """The server answered 429: hold `lanes` for `seconds` (its Retry-After)."""
+        with self._cond:
+            until = time.monotonic() + seconds
+            for lane in lanes:
+                self.blocked_until[lane] = max(self.blocked_until.get(lane, 0), until)
+            self.stats["rate_limited"] += 1
+            self._cond.notify_all()
+
+    # ---- Coalescing ----
+
+    def coalesce(self, key: Hashable, fetch: Callable[[], T]) -> T:
+        """Run fetch(), or - if an identical call is already in flight - wait for and share its result."""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            result = future.result()
+            return dict(result) if isinstance(result, dict) else result
+        try:
+            result = fetch()
+            future.set_result(result)
+            return dict(result) if isinstance(result, dict) else result  # Callers may mutate theirs
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+
+_shared: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def shared() -> RateLimiter:
+    """The process-wide limiter every arena client uses unless given its own."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = RateLimiter()
+        return _shared
@@ -0,0 +1,163 @@
+"""
+Streaming reader for /api/match/{id}/result responses.
+
+The result payload is a small header - matchId, status, seed, winner,
+duration, teamA, teamB - followed by battleLog, which is most of the
+bytes. result.js always writes the header first, so settlement can stop
+reading the moment it has the winner and never download the log.
+
+ResultReader walks the top-level JSON object incrementally from an
+iterable of byte chunks (httpx's Response.iter_bytes(), say). read()
+decodes top-level fields until the ones asked for are in hand and stops;
+battle_log() then yields the log's entries one at a time, decoding each
+as it arrives, so the whole log is never held in memory. Fields that
+come after the log (none today) are skipped past the same way.
+
+Usage:
+    reader = ResultReader(resp.iter_bytes())
+    header = reader.read(SETTLEMENT_FIELDS)      # {"winner": "A"}
+    outcome = board_pricer.battle_outcome({**reader.read(), "battleLog": reader.battle_log()})
+"""
+
+import json
+import codecs
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+SETTLEMENT_FIELDS = ("winner",)
+LOG_FIELD = "battleLog"
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = ",:]}" + _WHITESPACE  # What may follow a complete value
+
+
+class ResultReader:
+    """Incremental reader over one JSON object, top-level field by field."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._state = "start"    # start -> fields -> log -> fields -> end
+        self.header: Dict[str, Any] = {}
+        self.bytes_read = 0
+
+    # ---- Buffer ----
+
+    def _fill(self) -> bool:
+        """Append the next chunk (dropping what's consumed); False at end of input."""
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            self._buf = self._buf[self._pos:] + self._text.decode(b"", final=True)
+        else:
+            self.bytes_read += len(chunk)
+            self._buf = self._buf[self._pos:] + self._text.decode(chunk)
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Next non-whitespace character, without consuming it."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Result ended mid-object")
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at byte ~{self.bytes_read}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def _value(self) -> Any:
+        """Decode one complete JSON value, reading more input until it is whole."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # A number cut by the chunk boundary ("12" of "125", "0"
+                # of "0.5") still decodes - make sure a delimiter follows
+                # it before trusting the value
+                if self._eof or (end < len(self._buf) and self._buf[end] in _DELIMITERS):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+    # ---- Top-level fields ----
+
+    def _next_key(self) -> Optional[str]:
+        """Advance to the next top-level field; None once the object closes."""
+        if self._state == "end":
+            return None
+        if self._state == "start":
+            self._expect("{")
+            self._state = "fields"
+            if self._peek() == "}":
+                self._pos += 1
+                self._state = "end"
+                return None
+        elif self._expect(",}") == "}":
+            self._state = "end"
+            return None
+        key = self._value()
+        self._expect(":")
+        return key
+
+    def read(self, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Top-level fields read so far, reading on until every one of
+        `fields` is present - or, by default, up to the battle log.
+        Stops at the log either way; battle_log() continues from there.
+        """
+        while self._state in ("start", "fields"):
+            if fields is not None and all(f in self.header for f in fields):
+                break
+            key = self._next_key()
+            if key is None:
+                break
+            if key == LOG_FIELD:
+                self._state = "log"
+                break
+            self.header[key] = self._value()
+        if self._state == "log" and fields is not None and not all(f in self.header for f in fields):
+            for _ in self.battle_log():  # Needed fields come after the log - skip over it
+                pass
+        return self.header
+
+    def battle_log(self) -> Iterator[Dict]:
+        """Yield battle-log entries one at a time, then finish the header."""
+        self.read()
+        if self._state != "log":
+            return
+        self._state = "fields"
+        if self._peek() == "n":  # "battleLog": null
+            self._value()
+        elif self._expect("[") and self._peek() == "]":
+            self._pos += 1
+        else:
+            while True:
+                yield self._value()
+                if self._expect(",]") == "]":
+                    break
+        # Anything after the log goes into the header too
+        while True:
+            key = self._next_key()
+            if key is None:
+                break
+            self.header[key] = self._value()
+
+
+def read_result(chunks: Iterable[bytes], fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """The result header (or just `fields`) from a chunked response body."""
+    return ResultReader(chunks).read(fields)
@@ -0,0 +1,139 @@
+"""
+Precomputed roster index for the Savage Arena agent.
+
+The fighter pool is fixed (FIGHTERS in the API, fighters.json/csv in the
+repo), so per-fighter power, role codes and raw stats are computed once at
+startup and stored in flat arrays. The role-pair synergy table becomes a
+matrix indexed by role code. Team analysis is then a handful of array
+lookups over the team's row numbers instead of recomputing every fighter,
+and a team's synergy product is worked out once per sequence of roles.
+"""
+
+import os
+import csv
+import json
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+STAT_KEYS = ("hp", "atk", "def", "spd")
+TANK_ROLES = ("Tank", "Paladin")
+HEALER_ROLES = ("Cleric", "Paladin")
+DPS_ROLES = ("Berserker", "Rogue", "Mage")
+
+
+def load_fighters(path: str) -> List[Dict]:
+    """Read a roster from fighters.json ({"fighters": [...]}) or fighters.csv."""
+    if path.endswith(".csv"):
+        with open(path, newline="") as fh:
+            rows = list(csv.DictReader(fh))
+        for r in rows:
+            r["id"] = int(r["id"])
+            for key in ("hp", "atk", "def"):
+                r[key] = int(r[key])
+            r["spd"] = float(r["spd"])
+        return rows
+    with open(path) as fh:
+        data = json.load(fh)
+    return data["fighters"] if isinstance(data, dict) else data
+
+
+class RosterIndex:
+    def __init__(
+        self,
+        fighters: Sequence[Dict],
+        power_fn: Callable[[Dict], float],
+        synergy_table: Dict[Tuple[str, str], float],
+        role_aliases: Optional[Dict[str, str]] = None,
+        diversity_bonus: float = 1.05,
+    ):
+        self.fighters = list(fighters)
+        self.by_id = {f["id"]: row for row, f in enumerate(self.fighters)}
+        self.names = [f["name"] for f in self.fighters]
+        self.diversity_bonus = diversity_bonus
+
+        # Role codes - every role in the roster or the synergy table, with
+        # aliases folded so "Necromancer" and "Necro" share a code
+        aliases = role_aliases or {}
+        fighter_roles = [aliases.get(r, r) for r in (f.get("role", "Berserker") for f in self.fighters)]
+        roles = sorted(set(fighter_roles) | {r for pair in synergy_table for r in pair})
+        self.role_names = roles
+        self.role_code = {r: i for i, r in enumerate(roles)}
+        self.roles = array("B", (self.role_code[r] for r in fighter_roles))
+
+        # Per-fighter columns
+        self.power = array("d", (power_fn(f) for f in self.fighters))
+        self.hp = array("d", (f.get("hp", 100) for f in self.fighters))
+        self.atk = array("d", (f.get("atk", 10) for f in self.fighters))
+        self.defense = array("d", (f.get("def", 5) for f in self.fighters))
+        self.spd = array("d", (f.get("spd", 1.0) for f in self.fighters))
+
+        # Synergy matrix, symmetric - a pair counts whichever order its key is written in
+        n = len(roles)
+        self.synergy = [[1.0] * n for _ in range(n)]
+        self._has_synergy = [[False] * n for _ in range(n)]
+        for (r1, r2), factor in synergy_table.items():
+            i, j = self.role_code[r1], self.role_code[r2]
+            self.synergy[i][j] = self.synergy[j][i] = factor
+            self._has_synergy[i][j] = self._has_synergy[j][i] = True
+        self._synergy_memo: Dict[Tuple[int, ...], float] = {}   # role codes -> team synergy
+
+        self.is_tank = array("B", (f.get("role") in TANK_ROLES for f in self.fighters))
+        self.is_healer = array("B", (f.get("role") in HEALER_ROLES for f in self.fighters))
+        self.is_dps = array("B", (f.get("role") in DPS_ROLES for f in self.fighters))
+
+    def __len__(self) -> int:
+        return len(self.fighters)
+
+    def rows_for(self, fighters: Sequence[Dict]) -> Optional[Tuple[int, ...]]:
+        """Index rows for a team, or None if any fighter isn't in the roster."""
+        rows = []
+        for f in fighters:
+            row = self.by_id.get(f.get("id"))
+            if row is None or self.names[row] != f.get("name"):
+                return None
+            rows.append(row)
+        return tuple(rows)
+
+    def team_power(self, rows: Sequence[int]) -> float:
+        power = self.power
+        total = 0
+        for r in rows:
+            total += power[r]
+        return total
+
+    def team_synergy(self, rows: Sequence[int]) -> float:
+        """Same product, in the same pair order, as calculate_team_synergy."""
+        roles = self.roles
+        codes = tuple([roles[r] for r in rows])
+        synergy = self._synergy_memo.get(codes)
+        if synergy is None:
+            synergy = self._synergy_memo[codes] = self._role_synergy(codes)
+        return synergy
+
+    def _role_synergy(self, codes: Tuple[int, ...]) -> float:
+        synergy = 1.0
+        for i, c1 in enumerate(codes):
+            line, present = self.synergy[c1], self._has_synergy[c1]
+            for c2 in codes[i + 1:]:
+                if present[c2]:
+                    synergy *= line[c2]
+        if len(set(codes)) >= 3:
+            synergy *= self.diversity_bonus
+        return synergy
+
+    def team_totals(self, rows: Sequence[int]) -> Dict:
+        """Stat sums and role flags for a team."""
+        return {
+            "hp": sum(self.hp[r] for r in rows),
+            "def": sum(self.defense[r] for r in rows),
+            "atk": sum(self.atk[r] for r in rows),
+            "spd": sum(self.spd[r] for r in rows),
+            "has_tank": any(self.is_tank[r] for r in rows),
+            "has_healer": any(self.is_healer[r] for r in rows),
+            "has_dps": any(self.is_dps[r] for r in rows),
+        }
+
+
+def roster_path(name: str) -> str:
+    """Path of a roster file shipped at the repo root."""
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), name)
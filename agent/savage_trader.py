@@ -16,24 +16,18 @@ Environment:
 import os
 import sys
 import json
+import queue
+import asyncio
 import time
 import random
 import hashlib
 import argparse
 import logging
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Iterator, Optional, List, Sequence
 from dataclasses import dataclass
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('savage_trader.log')
-    ]
-)
+# Logging is configured by events.setup_logging() from main()
 logger = logging.getLogger(__name__)
 
 try:
@@ -42,6 +36,33 @@ except ImportError:
     logger.error("httpx not installed. Run: pip install httpx")
     sys.exit(1)
 
+import arena_sim
+from ledger import BalanceLedger
+from journal import TradeJournal
+import metrics
+import events
+import result_stream
+import ratelimit
+import webhooks
+from match_cache import MatchCache
+from roster import RosterIndex, load_fighters
+from bankr_async import AsyncBankrClient, BackgroundLoop
+from payouts import net_payout
+
+try:
+    import monte_carlo
+    import schedule
+    import board_pricer
+    import portfolio
+    import inplay
+except ImportError:
+    logger.warning("numpy not installed - using power-ratio win probabilities. Run: pip install numpy")
+    monte_carlo = None
+    schedule = None
+    board_pricer = None
+    portfolio = None
+    inplay = None
+
 # ============ CONFIGURATION ============
 @dataclass
 class Config:
@@ -54,10 +75,29 @@ class Config:
     max_wager_pct: float = 0.20   # Max 20% of bankroll per bet
     min_wager: float = 1.0        # Minimum bet
     kelly_fraction: float = 0.25  # Kelly criterion fraction (conservative)
+    mc_replicates: int = 4000     # Simulated battles per win estimate (0 = power ratio)
+    schedule_path: str = ""       # Precomputed schedule.py file with win probabilities
+    whole_board: bool = False     # Price every api/odds.js market and bet the best edge
+    live_monitor: bool = False    # Track win probability tick by tick while our match is live
+    journal_path: str = ""        # Crash-safe state journal ("" = keep state in memory only)
+    cache_path: str = ""          # SQLite cache of ended matches ("" = off)
+    metrics_port: int = 0         # Serve Prometheus metrics on localhost:PORT (0 = off)
+    dry_run: bool = False         # Paper-trade: live feed, bets into an in-process book (paper.py)
+    paper_balance: float = 1000.0 # Starting virtual bankroll when dry_run
     
     # Timing
-    poll_interval: int = 5        # Seconds between API polls
+    poll_interval: float = 5      # Seconds between API polls
+    webhook_port: int = 0         # Receive pushed match/bet events on this port (0 = off, poll only)
+    webhook_host: str = "127.0.0.1"  # Interface the listener binds (0.0.0.0 only behind an authenticating proxy)
+    webhook_url: str = ""         # URL registered for them ("" = http://127.0.0.1:PORT/webhook)
+    fallback_poll_interval: float = 60  # Seconds between polls while events are being pushed
     bet_buffer_seconds: int = 10  # Place bet this many seconds before window closes
+    analysis_lead_seconds: float = 3.0  # Fetch + analyze this long before placing the bet
+    local_settlement: bool = True # Settle from arena_sim instead of polling /result
+    
+    # Balance ledger
+    reconcile_every: int = 12     # Check the remote balance every N settlements
+    drift_tolerance: float = 0.01 # Reconcile every settlement while drift exceeds this fraction
     
     # Session limits
     max_consecutive_losses: int = 5
@@ -67,55 +107,89 @@ class Config:
     currency: str = "SAVAGE"
 
 
+WEBHOOK_GRACE = 2.0  # Seconds past a bet's end before settling without its match.ended event
+RATE_LIMIT_RETRIES = 3  # 429s waited out (per Retry-After) before a request gives up
+
+# Per-team analysis fields kept in decision events and backtest records
+ANALYSIS_KEYS = ("idx", "name", "win_prob", "odds", "has_tank", "has_healer", "synergy")
+
+
 # ============ FIGHTER ANALYSIS ============
+# Hand-tuned defaults; a fitted table (train_weights.py) replaces them at startup
+STAT_COEFFS = {"hp": 0.4, "atk": 2.5, "def": 1.5, "spd": 15}
 ROLE_WEIGHTS = {
     "Tank": {"hp": 1.2, "def": 1.3, "atk": 0.8, "spd": 0.7},
     "Berserker": {"hp": 0.9, "def": 0.7, "atk": 1.4, "spd": 1.1},
     "Mage": {"hp": 0.7, "def": 0.6, "atk": 1.3, "spd": 0.9},
     "Rogue": {"hp": 0.8, "def": 0.5, "atk": 1.3, "spd": 1.4},
     "Paladin": {"hp": 1.1, "def": 1.2, "atk": 1.0, "spd": 0.9},
-    "Necromancer": {"hp": 0.7, "def": 0.6, "atk": 1.1, "spd": 0.9},
+    "Necro": {"hp": 0.7, "def": 0.6, "atk": 1.1, "spd": 0.9},
     "Controller": {"hp": 0.8, "def": 0.7, "atk": 1.0, "spd": 1.0},
     "Cleric": {"hp": 0.9, "def": 0.9, "atk": 0.7, "spd": 1.0},
 }
 
 TEAM_SYNERGY = {
-    # Good combos
-    ("Tank", "Mage"): 1.1,
-    ("Tank", "Rogue"): 1.05,
-    ("Paladin", "Berserker"): 1.1,
+    # Good combos (keys sorted - pairs are looked up as tuple(sorted(...)))
+    ("Mage", "Tank"): 1.1,
+    ("Rogue", "Tank"): 1.05,
+    ("Berserker", "Paladin"): 1.1,
     ("Cleric", "Tank"): 1.15,
-    ("Necromancer", "Tank"): 1.08,
+    ("Necro", "Tank"): 1.08,
     
     # Bad combos
     ("Rogue", "Rogue"): 0.9,  # Too squishy
     ("Mage", "Mage"): 0.92,
 }
 
+DIVERSITY_BONUS = 1.05  # 3+ distinct roles
+POWER_EXPONENT = 1.0    # Sharpness of the power-ratio win probability
+ROLE_ALIASES = {"Necromancer": "Necro"}  # fighters.json role names -> API names
+WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "role_weights.json")
+WEIGHTS_VERSION: Optional[str] = None   # Version of the loaded table, None = hand-tuned
+_HEURISTIC = (STAT_COEFFS, ROLE_WEIGHTS, TEAM_SYNERGY, DIVERSITY_BONUS, POWER_EXPONENT, ROLE_ALIASES)
+
+
+def _power_coeffs() -> Dict[str, tuple]:
+    """Per-role (hp, atk, def, spd) multipliers - STAT_COEFFS x ROLE_WEIGHTS, aliases included."""
+    coeffs = {}
+    for role, w in list(ROLE_WEIGHTS.items()) + [(a, ROLE_WEIGHTS.get(c)) for a, c in ROLE_ALIASES.items()]:
+        if w is not None:
+            coeffs[role] = tuple(STAT_COEFFS[k] * w[k] for k in ("hp", "atk", "def", "spd"))
+    return coeffs
+
+
+_POWER_COEFFS = _power_coeffs()
+
 
 def calculate_fighter_power(fighter: Dict) -> float:
     """Calculate adjusted power rating for a fighter."""
-    role = fighter.get("role", "Berserker")
-    weights = ROLE_WEIGHTS.get(role, {"hp": 1, "def": 1, "atk": 1, "spd": 1})
-    
-    hp = fighter.get("hp", 100)
-    atk = fighter.get("atk", 10)
-    defense = fighter.get("def", 5)
-    spd = fighter.get("spd", 1.0)
-    
-    power = (
-        hp * 0.4 * weights["hp"] +
-        atk * 2.5 * weights["atk"] +
-        defense * 1.5 * weights["def"] +
-        spd * 15 * weights["spd"]
-    )
+    c = _POWER_COEFFS.get(fighter.get("role", "Berserker"))
+    if c is None:
+        c = (STAT_COEFFS["hp"], STAT_COEFFS["atk"], STAT_COEFFS["def"], STAT_COEFFS["spd"])
     
-    return power
+    return (
+        fighter.get("hp", 100) * c[0] +
+        fighter.get("atk", 10) * c[1] +
+        fighter.get("def", 5) * c[2] +
+        fighter.get("spd", 1.0) * c[3]
+    )
+
+
+_SYNERGY_MEMO: Dict[tuple, float] = {}   # role sequence -> synergy, cleared by apply_weights
 
 
 def calculate_team_synergy(fighters: List[Dict]) -> float:
     """Calculate team synergy multiplier based on role combinations."""
-    roles = [f.get("role", "Berserker") for f in fighters]
+    roles = tuple([f.get("role", "Berserker") for f in fighters])
+    synergy = _SYNERGY_MEMO.get(roles)
+    if synergy is None:
+        synergy = _SYNERGY_MEMO[roles] = _role_synergy(roles)
+    return synergy
+
+
+def _role_synergy(roles: tuple) -> float:
+    if not ROLE_ALIASES.keys().isdisjoint(roles):
+        roles = [ROLE_ALIASES.get(r, r) for r in roles]
     synergy = 1.0
     
     # Check all pairs
@@ -128,37 +202,181 @@ def calculate_team_synergy(fighters: List[Dict]) -> float:
     # Bonus for role diversity
     unique_roles = len(set(roles))
     if unique_roles >= 3:
-        synergy *= 1.05
+        synergy *= DIVERSITY_BONUS
     
     return synergy
 
 
+def power_ratio_probs(adjusted_powers: List[float]) -> List[float]:
+    """Win probabilities from adjusted powers: p_i = P_i^g / sum_j P_j^g."""
+    if not adjusted_powers or min(adjusted_powers) <= 0:
+        total = sum(adjusted_powers)
+        return [p / total if total > 0 else 0 for p in adjusted_powers]
+    # Divide by the largest first so a steep exponent can't overflow
+    top = max(adjusted_powers)
+    scaled = [(p / top) ** POWER_EXPONENT for p in adjusted_powers]
+    total = sum(scaled)
+    return [p / total for p in scaled]
+
+
+def _build_roster(fighters: List[Dict]) -> RosterIndex:
+    return RosterIndex(fighters, calculate_fighter_power, TEAM_SYNERGY,
+                       role_aliases=ROLE_ALIASES, diversity_bonus=DIVERSITY_BONUS)
+
+
+# Loaded once at startup - the API roster unless --roster points elsewhere
+ROSTER: Optional[RosterIndex] = _build_roster(arena_sim.FIGHTERS)
+
+
+def load_roster(path: str) -> RosterIndex:
+    """Replace the startup roster index with one read from fighters.json/.csv."""
+    global ROSTER
+    ROSTER = _build_roster(load_fighters(path))
+    return ROSTER
+
+
+def weight_table() -> Optional[Dict]:
+    """The loaded weight table, None while the hand-tuned defaults are in use."""
+    if WEIGHTS_VERSION is None:
+        return None
+    return {
+        "version": WEIGHTS_VERSION,
+        "stat_coeffs": STAT_COEFFS,
+        "role_weights": ROLE_WEIGHTS,
+        "synergy": [[a, b, f] for (a, b), f in TEAM_SYNERGY.items()],
+        "diversity_bonus": DIVERSITY_BONUS,
+        "exponent": POWER_EXPONENT,
+        "role_aliases": ROLE_ALIASES,
+    }
+
+
+def apply_weights(table: Optional[Dict]) -> None:
+    """Switch fighter power and synergy to a weight table (None = hand-tuned) and rebuild ROSTER."""
+    global STAT_COEFFS, ROLE_WEIGHTS, TEAM_SYNERGY, DIVERSITY_BONUS, POWER_EXPONENT, ROLE_ALIASES
+    global WEIGHTS_VERSION, ROSTER, _POWER_COEFFS
+    if table is None:
+        (STAT_COEFFS, ROLE_WEIGHTS, TEAM_SYNERGY, DIVERSITY_BONUS, POWER_EXPONENT, ROLE_ALIASES) = _HEURISTIC
+        WEIGHTS_VERSION = None
+    else:
+        STAT_COEFFS = dict(table["stat_coeffs"])
+        ROLE_WEIGHTS = {role: dict(w) for role, w in table["role_weights"].items()}
+        TEAM_SYNERGY = {tuple(sorted((a, b))): f for a, b, f in table["synergy"]}
+        DIVERSITY_BONUS = table.get("diversity_bonus", 1.0)
+        POWER_EXPONENT = table.get("exponent", 1.0)
+        ROLE_ALIASES = dict(table.get("role_aliases", {}))
+        WEIGHTS_VERSION = str(table.get("version", "unversioned"))
+    _POWER_COEFFS = _power_coeffs()
+    _SYNERGY_MEMO.clear()
+    if ROSTER is not None:
+        ROSTER = _build_roster(ROSTER.fighters)
+
+
+def load_weights(path: str) -> Optional[str]:
+    """Load a train_weights.py table; returns its version, None if the file is missing or bad."""
+    try:
+        with open(path) as fh:
+            table = json.load(fh)
+        if table.get("format") != 1:
+            raise ValueError(f"unsupported format {table.get('format')!r}")
+        apply_weights(table)
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring weight table {path}: {e}")
+        return None
+    return WEIGHTS_VERSION
+
+
+load_weights(WEIGHTS_PATH)
+
+
+def match_teams(match: Dict) -> List[Dict]:
+    """
+    Teams of a match payload as a list. The arena serves teamA/teamB plus
+    an odds dict; index 0 is team A and 1 is team B, matching winner_index.
+    Fighter lists are shared with the payload, not copied, and each team
+    carries its ROSTER rows when every fighter is in the index.
+    """
+    if "teams" in match:
+        teams = match["teams"]
+    else:
+        teams = []
+        odds = match.get("odds", {})
+        for side in ("A", "B"):
+            team = match.get(f"team{side}")
+            if team:
+                teams.append({
+                    "name": team.get("name", f"Team {side}"),
+                    "fighters": team.get("fighters", []),
+                    "odds": odds.get(side, 1.0),
+                })
+    if ROSTER is not None:
+        for team in teams:
+            if "rows" not in team:
+                team["rows"] = ROSTER.rows_for(team.get("fighters", []))
+    return teams
+
+
+def winner_index(winner) -> Optional[int]:
+    """Map a result's winner ('A'/'B' or an index) to a team index."""
+    if isinstance(winner, int):
+        return winner
+    if winner in ("A", "B"):
+        return "AB".index(winner)
+    return None
+
+
+def needs_battle_log(bet: Dict) -> bool:
+    """True if some leg of the bet settles on more than the winner."""
+    return any(leg.get("market", "winner") != "winner" for leg in bet.get("legs") or [bet])
+
+
+def receipt_bet_ids(receipt: Dict) -> List[str]:
+    """Bet IDs in an /api/bet confirmation (a "bets" list, or a single "betId")."""
+    ids = [b["id"] for b in receipt.get("bets") or [] if isinstance(b, dict) and b.get("id")]
+    if receipt.get("betId"):
+        ids.append(receipt["betId"])
+    return ids
+
+
 def analyze_team(team: Dict) -> Dict:
     """Deep analysis of a team."""
     fighters = team.get("fighters", [])
+    rows = team.get("rows")
     
-    # Individual power
-    powers = [calculate_fighter_power(f) for f in fighters]
-    total_power = sum(powers)
-    avg_power = total_power / len(fighters) if fighters else 0
-    
-    # Synergy
-    synergy = calculate_team_synergy(fighters)
-    
-    # Role composition
-    roles = [f.get("role", "Unknown") for f in fighters]
-    has_tank = any(r in ["Tank", "Paladin"] for r in roles)
-    has_healer = any(r in ["Cleric", "Paladin"] for r in roles)
-    has_dps = any(r in ["Berserker", "Rogue", "Mage"] for r in roles)
+    if rows and ROSTER is not None:
+        # Precomputed roster lookups
+        total_power = ROSTER.team_power(rows)
+        synergy = ROSTER.team_synergy(rows)
+        totals = ROSTER.team_totals(rows)
+        has_tank, has_healer, has_dps = totals["has_tank"], totals["has_healer"], totals["has_dps"]
+        n = len(rows)
+        avg_hp, avg_def = totals["hp"] / n, totals["def"] / n
+        avg_atk, avg_spd = totals["atk"] / n, totals["spd"] / n
+    else:
+        # Individual power
+        powers = [calculate_fighter_power(f) for f in fighters]
+        total_power = sum(powers)
+        
+        # Synergy
+        synergy = calculate_team_synergy(fighters)
+        
+        # Role composition
+        roles = [f.get("role", "Unknown") for f in fighters]
+        has_tank = any(r in ["Tank", "Paladin"] for r in roles)
+        has_healer = any(r in ["Cleric", "Paladin"] for r in roles)
+        has_dps = any(r in ["Berserker", "Rogue", "Mage"] for r in roles)
+        
+        n = len(fighters)
+        avg_hp = sum(f.get("hp", 100) for f in fighters) / n if n else 100
+        avg_def = sum(f.get("def", 5) for f in fighters) / n if n else 5
+        avg_atk = sum(f.get("atk", 10) for f in fighters) / n if n else 10
+        avg_spd = sum(f.get("spd", 1.0) for f in fighters) / n if n else 1.0
     
     # Survivability (avg HP + def)
-    avg_hp = sum(f.get("hp", 100) for f in fighters) / len(fighters) if fighters else 100
-    avg_def = sum(f.get("def", 5) for f in fighters) / len(fighters) if fighters else 5
     survivability = (avg_hp / 400) * 0.6 + (avg_def / 15) * 0.4
     
     # Damage output
-    avg_atk = sum(f.get("atk", 10) for f in fighters) / len(fighters) if fighters else 10
-    avg_spd = sum(f.get("spd", 1.0) for f in fighters) / len(fighters) if fighters else 1.0
     damage_output = (avg_atk / 30) * 0.7 + (avg_spd / 1.5) * 0.3
     
     return {
@@ -179,14 +397,31 @@ def analyze_team(team: Dict) -> Dict:
     }
 
 
-def pick_best_team(match: Dict, config: Config) -> Optional[Dict]:
+def simulated_win_probs(teams: List[Dict], config: Config) -> Optional[List[float]]:
+    """Monte Carlo win probability per team, or None if it can't be used."""
+    if monte_carlo is None or config.mc_replicates <= 0 or len(teams) != 2:
+        return None
+    if any(len(t.get("fighters", [])) != arena_sim.TEAM_SIZE for t in teams):
+        return None
+    est = monte_carlo.estimate_win_probs(
+        [(teams[0]["fighters"], teams[1]["fighters"])], n=config.mc_replicates
+    )[0]
+    return [est["p_a"], est["p_b"]]
+
+
+def score_teams(
+    match: Dict,
+    config: Config,
+    win_probs: Optional[List[float]] = None
+) -> List[Dict]:
     """
-    Analyze match and pick the best team to bet on.
-    Returns: {"team_idx": int, "confidence": float, "reasoning": str}
+    Analyze every team in a match and attach its win probability.
+    win_probs can be supplied when they were computed elsewhere (e.g. one
+    batched simulation for many matches).
     """
-    teams = match.get("teams", [])
+    teams = match_teams(match)
     if not teams:
-        return None
+        return []
     
     analyses = []
     for i, team in enumerate(teams):
@@ -199,11 +434,21 @@ def pick_best_team(match: Dict, config: Config) -> Optional[Dict]:
     # Rank by adjusted power
     analyses.sort(key=lambda x: x["adjusted_power"], reverse=True)
     
-    # Calculate win probabilities
-    total_power = sum(a["adjusted_power"] for a in analyses)
-    for a in analyses:
-        a["win_prob"] = a["adjusted_power"] / total_power if total_power > 0 else 0
+    # Calculate win probabilities - simulate the real combat rules when
+    # possible, fall back to the power ratio otherwise
+    simulated = win_probs or simulated_win_probs(teams, config)
+    ratio = power_ratio_probs([a["adjusted_power"] for a in analyses])
+    for a, p in zip(analyses, ratio):
+        a["win_prob"] = simulated[a["idx"]] if simulated else p
     
+    return analyses
+
+
+def select_bet(analyses: List[Dict], config: Config) -> Optional[Dict]:
+    """
+    Pick the best value bet from scored teams.
+    Returns: {"team_idx": int, "confidence": float, "reasoning": str}
+    """
     # Find best value bet (highest edge = prob * odds - 1)
     best = None
     best_edge = 0
@@ -244,6 +489,78 @@ def pick_best_team(match: Dict, config: Config) -> Optional[Dict]:
     }
 
 
+def select_market(board: Dict, analyses: List[Dict], config: Config) -> Optional[Dict]:
+    """
+    Pick the best edge across every market on a priced board
+    (board_pricer.price_board) rather than the winner price alone. Same
+    shape as select_bet plus "market" and "line"; team_idx is None for
+    props. Edge is the after-tax expected return, pushes included.
+    """
+    market = board_pricer.best_market(board, min_prob=config.min_confidence)
+    if market is None:
+        return None
+    
+    names = {a["idx"]: a["name"] for a in analyses}
+    label = board_pricer.market_label(market, [names.get(0, "Team A"), names.get(1, "Team B")])
+    confidence = min(1.0, market["p"] + market["ev"] * 0.3)
+    
+    return {
+        "team_idx": market["team"],
+        "team_name": label,
+        "market": market["type"],
+        "line": market["line"],
+        "confidence": confidence,
+        "win_prob": market["p"],
+        "odds": market["odds"],
+        "edge": market["ev"],
+        "reasoning": (
+            f"Board pick '{label}'. "
+            f"Prob: {market['p']:.1%}, Odds: {market['odds']:.2f}x, "
+            f"EV after tax: {market['ev']:+.1%} ({len(board['markets'])} markets priced)"
+        )
+    }
+
+
+def size_slip(board: Dict, analyses: List[Dict], balance: float, config: Config) -> List[Dict]:
+    """
+    Stake every positive-edge market that clears min_confidence on a
+    board jointly with the multi-bet Kelly sizer (portfolio.py), so
+    correlated bets on the same battle share one bankroll budget. Needs
+    a board priced with keep_samples. Returns the legs with a stake,
+    biggest first.
+    """
+    markets = [
+        m for m in board["markets"]
+        if m["type"] in board_pricer.BET_TYPES and m["p"] >= config.min_confidence and m["ev"] > 0
+    ]
+    if not markets:
+        return []
+    stakes = portfolio.size_portfolio(balance, portfolio.market_returns(markets, board["samples"]), config)
+    
+    names = {a["idx"]: a["name"] for a in analyses}
+    legs = [
+        {
+            "team_idx": m["team"],
+            "team_name": board_pricer.market_label(m, [names.get(0, "Team A"), names.get(1, "Team B")]),
+            "market": m["type"],
+            "line": m["line"],
+            "wager": float(stake),
+            "odds": m["odds"],
+            "win_prob": m["p"],
+        }
+        for m, stake in zip(markets, stakes) if stake > 0
+    ]
+    return sorted(legs, key=lambda leg: -leg["wager"])
+
+
+def pick_best_team(match: Dict, config: Config) -> Optional[Dict]:
+    """
+    Analyze match and pick the best team to bet on.
+    Returns: {"team_idx": int, "confidence": float, "reasoning": str}
+    """
+    return select_bet(score_teams(match, config), config)
+
+
 def calculate_wager(
     bankroll: float,
     confidence: float,
@@ -273,174 +590,348 @@ def calculate_wager(
     return round(wager, 2)
 
 
+def new_session_stats(start_balance: float = 0) -> Dict:
+    """Fresh session statistics."""
+    return {
+        "start_time": datetime.now(),
+        "start_balance": start_balance,
+        "bets_placed": 0,
+        "bets_won": 0,
+        "bets_lost": 0,
+        "total_wagered": 0,
+        "total_won": 0,
+        "consecutive_losses": 0,
+        "best_win": 0,
+        "worst_loss": 0,
+    }
+
+
+def book_settlement(session_stats: Dict, wager: float, odds: float, won: bool) -> float:
+    """Record a settled bet in session stats. Returns the amount paid out."""
+    if won:
+        payout = net_payout(wager, odds)
+        session_stats["bets_won"] += 1
+        session_stats["total_won"] += payout
+        session_stats["consecutive_losses"] = 0
+        session_stats["best_win"] = max(session_stats["best_win"], payout - wager)
+        return payout
+    
+    session_stats["bets_lost"] += 1
+    session_stats["consecutive_losses"] += 1
+    session_stats["worst_loss"] = max(session_stats["worst_loss"], wager)
+    return 0.0
+
+
+def stop_reason(session_stats: Dict, current_balance: float, config: Config) -> Optional[str]:
+    """Why trading should stop, or None to keep going."""
+    # Stop loss
+    if session_stats["start_balance"] > 0:
+        loss_pct = 1 - (current_balance / session_stats["start_balance"])
+        if loss_pct >= config.stop_loss_pct:
+            return f"Stop loss triggered: {loss_pct:.1%} loss"
+    
+    # Consecutive losses
+    if session_stats["consecutive_losses"] >= config.max_consecutive_losses:
+        return f"Max consecutive losses reached: {session_stats['consecutive_losses']}"
+    
+    # Zero balance
+    if current_balance < config.min_wager:
+        return "Insufficient balance to continue"
+    
+    return None
+
+
 # ============ API CLIENT ============
 class SavageArenaClient:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, http: Optional[httpx.Client] = None,
+                 limiter: Optional[ratelimit.RateLimiter] = None):
         self.config = config
-        self.client = httpx.Client(timeout=30.0)
+        self.client = http or httpx.Client(timeout=30.0)  # Can be shared between accounts
+        self.limiter = limiter or ratelimit.shared()      # Shared by every client in the process
         self.session_id = hashlib.md5(str(time.time()).encode()).hexdigest()[:8]
     
+    def _send(self, lanes: Sequence[str], priority: int, stage: str, request: Callable[[], httpx.Response],
+              deadline: Optional[float] = None) -> Optional[httpx.Response]:
+        """
+        Send one request within the rate limits, waiting out up to
+        RATE_LIMIT_RETRIES 429s for as long as Retry-After says. None if
+        no slot opens before `deadline` (epoch seconds).
+        """
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            waited = self.limiter.acquire(lanes, priority, deadline)
+            if waited is None:
+                metrics.count("rate_limit_expired", lane=lanes[0])
+                return None
+            if waited > 0.001:
+                metrics.observe("rate_wait", waited)
+            with metrics.timer(stage):
+                resp = request()
+            if resp.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+                return resp
+            delay = ratelimit.retry_after(resp.headers)
+            resp.close()
+            metrics.count("rate_limited", lane=lanes[0])
+            logger.warning(f"⏳ Rate limited ({stage}), holding {'/'.join(lanes)} for {delay:.1f}s")
+            self.limiter.penalize(lanes, delay)
+        return resp
+    
     def get_current_match(self) -> Optional[Dict]:
-        """Fetch current match from arena API."""
+        """Fetch current match from arena API (one request however many threads ask at once)."""
+        return self.limiter.coalesce(("match", self.config.arena_url), self._get_current_match)
+    
+    def _get_current_match(self) -> Optional[Dict]:
         try:
-            resp = self.client.get(f"{self.config.arena_url}/api/match/current")
+            resp = self._send(ratelimit.PUBLIC_LANES, ratelimit.PRIORITY_NORMAL, "fetch",
+                              lambda: self.client.get(f"{self.config.arena_url}/api/match/current"))
             if resp.status_code == 200:
                 return resp.json()
+            metrics.count("api_errors", endpoint="match", status=resp.status_code)
             logger.warning(f"Failed to get match: {resp.status_code}")
             return None
         except Exception as e:
+            metrics.count("api_errors", endpoint="match", status=type(e).__name__)
             logger.error(f"Error fetching match: {e}")
             return None
     
-    def get_match_result(self, match_id: str) -> Optional[Dict]:
-        """Fetch match result."""
+    def get_match_result(self, match_id: str, fields: Optional[Sequence[str]] = None,
+                         with_log: bool = False, priority: int = ratelimit.PRIORITY_NORMAL) -> Optional[Dict]:
+        """
+        Fetch a match result, reading only as far as needed: until every
+        one of `fields` is in (default: the whole header before battleLog).
+        with_log adds "battleLog" as a generator that streams the log
+        from the still-open response; exhaust or close() it to release it.
+        Identical header-only fetches in flight at once share one request.
+        """
+        if with_log:
+            return self._get_match_result(match_id, fields, with_log, priority)
+        key = ("result", self.config.arena_url, match_id, tuple(fields) if fields else None)
+        return self.limiter.coalesce(key, lambda: self._get_match_result(match_id, fields, with_log, priority))
+    
+    def _get_match_result(self, match_id: str, fields: Optional[Sequence[str]], with_log: bool,
+                          priority: int) -> Optional[Dict]:
+        url = f"{self.config.arena_url}/api/match/{match_id}/result"
+        resp = None
         try:
-            resp = self.client.get(f"{self.config.arena_url}/api/match/{match_id}/result")
-            if resp.status_code == 200:
-                return resp.json()
-            return None
+            resp = self._send(ratelimit.PUBLIC_LANES, priority, "result",
+                              lambda: self.client.send(self.client.build_request("GET", url), stream=True))
+            if resp.status_code != 200:
+                metrics.count("api_errors", endpoint="result", status=resp.status_code)
+                resp.close()
+                return None
+            reader = result_stream.ResultReader(resp.iter_bytes())
+            result = dict(reader.read(None if with_log else fields))
+            if not with_log:
+                resp.close()  # Skip the rest of the body
+                return result
+            result["battleLog"] = self._stream_log(reader, resp)
+            return result
         except Exception as e:
+            if resp is not None:
+                resp.close()
+            metrics.count("api_errors", endpoint="result", status=type(e).__name__)
             logger.error(f"Error fetching result: {e}")
             return None
     
-    def place_bet(self, match_id: str, team_idx: int, amount: float) -> Optional[Dict]:
-        """Place a bet via API."""
+    @staticmethod
+    def _stream_log(reader: result_stream.ResultReader, resp: httpx.Response) -> Iterator[Dict]:
+        try:
+            yield from reader.battle_log()
+        finally:
+            resp.close()
+    
+    def place_bet(self, match_id: str, team_idx: Optional[int], amount: float,
+                  bet_type: str = "winner", deadline: Optional[float] = None) -> Optional[Dict]:
+        """
+        Place a bet via API (team_idx is None for over/under props). Bets
+        jump every queue; None if even so it can't go out before `deadline`.
+        """
+        return self._post_bet({
+            "matchId": match_id,
+            "team": team_idx,
+            "type": bet_type,
+            "amount": amount,
+            "currency": self.config.currency
+        }, deadline)
+    
+    def place_bets(self, match_id: str, legs: List[Dict], deadline: Optional[float] = None) -> Optional[Dict]:
+        """Place a multi-bet slip in one request (api/bet.js "bets" format)."""
+        return self._post_bet({
+            "matchId": match_id,
+            "bets": [{"type": leg["market"], "team": leg["team_idx"], "amount": leg["wager"]} for leg in legs],
+            "currency": self.config.currency
+        }, deadline)
+    
+    def _post_bet(self, body: Dict, deadline: Optional[float] = None) -> Optional[Dict]:
         try:
-            resp = self.client.post(
+            resp = self._send(ratelimit.BET_LANES, ratelimit.PRIORITY_BET, "bet_post", lambda: self.client.post(
                 f"{self.config.arena_url}/api/bet",
-                json={
-                    "matchId": match_id,
-                    "team": team_idx,
-                    "amount": amount,
-                    "currency": self.config.currency
-                },
-                headers={"Authorization": f"Bearer {self.session_id}"}
-            )
+                json=body,
+                headers={"Authorization": f"Bearer {self.session_id}", "X-Agent-Id": self.session_id}
+            ), deadline)
+            if resp is None:
+                logger.warning("Bet not sent: no rate-limit slot before the window closes")
+                return None
             if resp.status_code == 200:
                 return resp.json()
+            metrics.count("api_errors", endpoint="bet", status=resp.status_code)
             logger.warning(f"Bet failed: {resp.status_code} - {resp.text}")
             return None
         except Exception as e:
+            metrics.count("api_errors", endpoint="bet", status=type(e).__name__)
             logger.error(f"Error placing bet: {e}")
             return None
     
+    def register_webhook(self, url: str, event_types: Sequence[str]) -> bool:
+        """Ask the arena to push `event_types` to `url` (POST /api/webhooks/register)."""
+        try:
+            resp = self._send(ratelimit.AUTH_LANES, ratelimit.PRIORITY_NORMAL, "webhooks", lambda: self.client.post(
+                f"{self.config.arena_url}/api/webhooks/register",
+                json={"url": url, "events": list(event_types)},
+                headers={"Authorization": f"Bearer {self.session_id}", "X-Agent-Id": self.session_id}
+            ))
+            if resp.status_code == 200:
+                return True
+            metrics.count("api_errors", endpoint="webhooks", status=resp.status_code)
+            logger.warning(f"Webhook registration failed: {resp.status_code} - {resp.text}")
+            return False
+        except Exception as e:
+            metrics.count("api_errors", endpoint="webhooks", status=type(e).__name__)
+            logger.error(f"Error registering webhook: {e}")
+            return False
+    
     def get_balance(self) -> float:
         """Get current balance from API."""
+        return self.limiter.coalesce(("balance", self.config.arena_url, self.session_id), self._get_balance)
+    
+    def _get_balance(self) -> float:
         try:
-            resp = self.client.get(
+            resp = self._send(ratelimit.AUTH_LANES, ratelimit.PRIORITY_NORMAL, "balance", lambda: self.client.get(
                 f"{self.config.arena_url}/api/balance",
                 headers={"Authorization": f"Bearer {self.session_id}"}
-            )
+            ))
             if resp.status_code == 200:
                 return resp.json().get("balance", 0)
+            metrics.count("api_errors", endpoint="balance", status=resp.status_code)
             return 0
         except Exception as e:
+            metrics.count("api_errors", endpoint="balance", status=type(e).__name__)
             logger.error(f"Error fetching balance: {e}")
             return 0
 
 
-# ============ BANKR INTEGRATION ============
-class BankrClient:
-    """Client for Bankr Bot API for real token transactions."""
-    
-    def __init__(self, api_key: str, api_url: str = "https://api.bankr.bot"):
-        self.api_key = api_key
-        self.api_url = api_url
-        self.client = httpx.Client(timeout=60.0)
-    
-    def submit_job(self, prompt: str) -> Optional[str]:
-        """Submit a job to Bankr and return job ID."""
-        try:
-            resp = self.client.post(
-                f"{self.api_url}/agent/submit",
-                json={"prompt": prompt},
-                headers={"Authorization": f"Bearer {self.api_key}"}
-            )
-            if resp.status_code == 200:
-                return resp.json().get("jobId")
-            logger.error(f"Bankr submit failed: {resp.status_code}")
-            return None
-        except Exception as e:
-            logger.error(f"Bankr error: {e}")
-            return None
-    
-    def poll_job(self, job_id: str, max_wait: int = 120) -> Optional[Dict]:
-        """Poll job until complete."""
-        start = time.time()
-        while time.time() - start < max_wait:
-            try:
-                resp = self.client.get(
-                    f"{self.api_url}/agent/job/{job_id}",
-                    headers={"Authorization": f"Bearer {self.api_key}"}
-                )
-                if resp.status_code == 200:
-                    data = resp.json()
-                    status = data.get("status")
-                    if status == "completed":
-                        return data
-                    elif status in ["failed", "cancelled"]:
-                        logger.error(f"Job {status}: {data.get('error')}")
-                        return None
-                time.sleep(2)
-            except Exception as e:
-                logger.error(f"Poll error: {e}")
-                time.sleep(2)
-        logger.error("Job timed out")
-        return None
-    
-    def execute(self, prompt: str) -> Optional[Dict]:
-        """Submit and wait for completion."""
-        job_id = self.submit_job(prompt)
-        if not job_id:
-            return None
-        return self.poll_job(job_id)
-    
-    def get_balance(self, token: str = "SAVAGE", chain: str = "Base") -> float:
-        """Get token balance via Bankr."""
-        result = self.execute(f"What is my {token} balance on {chain}?")
-        if result and result.get("result"):
-            # Parse balance from response
-            text = str(result.get("result", ""))
-            # Try to extract number
-            import re
-            numbers = re.findall(r'[\d,]+\.?\d*', text)
-            if numbers:
-                return float(numbers[0].replace(',', ''))
-        return 0
-    
-    def transfer(self, to_address: str, amount: float, token: str = "SAVAGE") -> bool:
-        """Transfer tokens via Bankr."""
-        result = self.execute(f"Send {amount} {token} to {to_address} on Base")
-        return result is not None and result.get("status") == "completed"
-
-
 # ============ MAIN TRADING LOOP ============
 class SavageTrader:
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        arena: Optional[SavageArenaClient] = None,
+        bankr_loop: Optional[BackgroundLoop] = None
+    ):
         self.config = config
-        self.arena = SavageArenaClient(config)
-        self.bankr = BankrClient(config.bankr_api_key, config.bankr_url) if config.bankr_api_key else None
-        
-        self.session_stats = {
-            "start_time": datetime.now(),
-            "start_balance": 0,
-            "bets_placed": 0,
-            "bets_won": 0,
-            "bets_lost": 0,
-            "total_wagered": 0,
-            "total_won": 0,
-            "consecutive_losses": 0,
-            "best_win": 0,
-            "worst_loss": 0,
-        }
+        if arena is None and config.dry_run:
+            import paper  # paper imports this module, so only once it has loaded
+            arena = paper.PaperArenaClient(config)
+        self.arena = arena or SavageArenaClient(config)
+        # Paper money never touches Bankr
+        self.bankr = (AsyncBankrClient(config.bankr_api_key, config.bankr_url)
+                      if config.bankr_api_key and not config.dry_run else None)
+        self.bankr_loop = (bankr_loop or BackgroundLoop()) if self.bankr else None
+        self.owns_bankr_loop = self.bankr is not None and bankr_loop is None  # else the caller stops it
+        
+        self.ledger = BalanceLedger(
+            self.fetch_remote_balance, self.config.reconcile_every, self.config.drift_tolerance
+        )
+        self.session_stats = new_session_stats()
         self.current_bet = None
         self.last_match_id = None
+        self.rtt: Optional[float] = None  # Smoothed request round trip (seconds)
+        self.pending_bet = None           # Bet being POSTed, journaled ahead of the request
+        self.name = ""                    # Strategy label on events when several traders share a log
+        self.inbox: queue.Queue = queue.Queue()   # Pushed events, applied on the trading thread
+        self.webhooks: Optional[webhooks.WebhookListener] = None
+        self.webhook_loop: Optional[BackgroundLoop] = None
+        
+        self.cache = MatchCache(config.cache_path) if config.cache_path else None
+        self.journal = TradeJournal(config.journal_path) if config.journal_path else None
+        if self.journal:
+            self.restore()
+        
+        self.schedule = None
+        if config.schedule_path and schedule is not None:
+            self.schedule = schedule.Schedule(config.schedule_path)
+            logger.info(f"📅 Schedule loaded: SAVAGE-{self.schedule.first_id}..SAVAGE-{self.schedule.last_id}")
+    
+    # ---- Journal ----
+    
+    def journal_state(self) -> Dict:
+        return {
+            "session_stats": self.session_stats,
+            "current_bet": self.current_bet,
+            "pending_bet": self.pending_bet,
+            "last_match_id": self.last_match_id,
+            "balance": self.ledger.balance,
+        }
+    
+    def _journal(self, event: str, **extra):
+        if self.journal:
+            self.journal.record(event, self.journal_state(), **extra)
+    
+    def restore(self):
+        """Resume from the journal, including an open bet still waiting to settle."""
+        state = self.journal.replay()
+        if not state:
+            return
+        self.session_stats = state["session_stats"]
+        self.current_bet = state["current_bet"]
+        self.last_match_id = state["last_match_id"]
+        if state["balance"] is not None:
+            self.ledger.seed(state["balance"])
+        
+        pending = state.get("pending_bet")
+        if pending and not self.current_bet:
+            # Crashed mid-POST - the arena may have taken it, so assume it did
+            logger.warning(f"Bet on {pending['match_id']} was in flight at shutdown, assuming placed")
+            self._book_placed(pending)
+            self.ledger.mark_suspect("unconfirmed bet after restart")
+            self._journal("placed", recovered=True)
+        
+        if self.current_bet:
+            logger.info(f"📒 Resumed with open bet on {self.current_bet['match_id']} "
+                        f"({self.current_bet['wager']:.2f} {self.config.currency})")
+    
+    def _emit(self, event: str, **fields):
+        if self.name:
+            fields["strategy"] = self.name
+        events.emit(event, **fields)
+    
+    def begin_session(self, balance: float):
+        """Fix the stop-loss baseline the first time a balance is seen."""
+        if self.session_stats["start_balance"] == 0:
+            self.session_stats["start_balance"] = balance
+            self._journal("start")
+    
+    def mark_seen(self, match_id: str):
+        """Remember a match that has been handled so it isn't analyzed again."""
+        if match_id != self.last_match_id:
+            self.last_match_id = match_id
+            self._journal("seen")
     
     def get_balance(self) -> float:
-        """Get current balance from appropriate source."""
+        """Current balance from the local ledger - never blocks after startup."""
+        return self.ledger.get()
+    
+    def fetch_remote_balance(self) -> Optional[float]:
+        """Get balance from the appropriate remote source (slow)."""
         if self.bankr:
-            return self.bankr.get_balance(self.config.currency)
-        return self.arena.get_balance()
+            # Bankr jobs run on their own loop; this blocks only the caller
+            # (the ledger's reconcile thread after startup)
+            return self.bankr_loop.submit(self.bankr.get_balance(self.config.currency)).result()
+        
+        balance = self.arena.get_balance()
+        # The arena client reports failures as 0 - don't wipe a seeded ledger with that
+        if not balance and self.ledger.balance is not None:
+            return None
+        return balance
     
     def log_stats(self):
         """Log current session statistics."""
@@ -462,130 +953,463 @@ Best Win: {s['best_win']:.2f}
 Worst Loss: {s['worst_loss']:.2f}
 ===================================
 """)
+        if self.bankr:
+            b = self.bankr.latency_stats()
+            logger.info(f"Bankr jobs: {b['jobs']} ({b['in_flight']} in flight), "
+                        f"p50 {b['p50']:.1f}s / p90 {b['p90']:.1f}s, {b['avg_polls']:.1f} polls/job")
+        logger.info(metrics.summary())
     
     def should_stop(self, current_balance: float) -> bool:
         """Check if we should stop trading."""
-        # Stop loss
-        if self.session_stats["start_balance"] > 0:
-            loss_pct = 1 - (current_balance / self.session_stats["start_balance"])
-            if loss_pct >= self.config.stop_loss_pct:
-                logger.warning(f"Stop loss triggered: {loss_pct:.1%} loss")
-                return True
-        
-        # Consecutive losses
-        if self.session_stats["consecutive_losses"] >= self.config.max_consecutive_losses:
-            logger.warning(f"Max consecutive losses reached: {self.session_stats['consecutive_losses']}")
+        reason = stop_reason(self.session_stats, current_balance, self.config)
+        if reason:
+            logger.warning(reason)
             return True
+        return False
+    
+    def settle_bet(self, winner, result: Optional[Dict] = None) -> None:
+        """
+        Book the open bet (every leg of a slip) as won or lost. Winner bets
+        only need the match winner; board bets settle on the battle log in
+        `result`, replayed locally when it isn't supplied.
+        """
+        match_id = self.current_bet["match_id"]
+        legs = self.current_bet.get("legs")
+        losing_streak = self.session_stats["consecutive_losses"]
+        outcome = None
+        paid = 0.0
+        for leg in legs or [self.current_bet]:
+            market = leg.get("market", "winner")
+            push = False
+            if market == "winner":
+                won = winner_index(winner) == leg["team_idx"]
+            else:
+                if outcome is None:
+                    outcome = self._battle_outcome(match_id, result)
+                bet = {"type": market, "team": leg["team_idx"], "line": leg.get("line")}
+                won, push = (bool(flag) for flag in board_pricer.settle(bet, outcome))
+            paid += self._settle_leg(leg, won, push, winner)
+        self.ledger.settled()
+        ahead = paid > self.current_bet["wager"]
+        if legs:
+            # A slip's hedges are expected to lose - the streak counts slips
+            self.session_stats["consecutive_losses"] = 0 if paid >= self.current_bet["wager"] else losing_streak + 1
         
-        # Zero balance
-        if current_balance < self.config.min_wager:
-            logger.warning("Insufficient balance to continue")
-            return True
+        self.current_bet = None
+        self.last_match_id = None
+        self._journal("settled", match_id=match_id, won=ahead, payout=paid)
+        self.log_stats()
+    
+    @staticmethod
+    def _battle_outcome(match_id: str, result: Optional[Dict]) -> Dict:
+        """Board outcome from the result's (possibly streamed) battle log, else a local replay."""
+        if result and result.get("battleLog") is not None:
+            try:
+                return board_pricer.battle_outcome(result)
+            except Exception as e:
+                # A stream cut mid-log can't be trusted - the replay is bit-exact
+                logger.warning(f"Battle log of {match_id} unreadable ({e}), replaying locally")
+        return board_pricer.battle_outcome(arena_sim.match_result(match_id))
+    
+    def _settle_leg(self, leg: Dict, won: bool, push: bool, winner) -> float:
+        """Book one settled bet; returns what it paid back."""
+        wager = leg["wager"]
+        if push:
+            # Landed on the line - stake back, neither a win nor a loss
+            payout = wager
+            self.session_stats["total_won"] += wager
+            logger.info(f"↩️ PUSH on {leg['team_name']}, stake returned")
+        else:
+            payout = book_settlement(self.session_stats, wager, leg["odds"], won)
+            if won:
+                logger.info(f"🎉 WON! +{payout - wager:.2f} {self.config.currency} ({leg['team_name']})")
+            else:
+                logger.info(f"💸 LOST! -{wager:.2f} {self.config.currency} ({leg['team_name']})")
+        self.ledger.credit(payout)
         
-        return False
+        self._emit("settlement", match_id=arena_sim.parse_match_id(self.current_bet["match_id"]),
+                   team_idx=leg["team_idx"], market=leg.get("market", "winner"), winner=winner_index(winner),
+                   won=won, wager=wager, odds=leg["odds"], payout=payout, balance=self.ledger.balance)
+        return payout
+    
+    def check_settlement(self, winner: Optional[str] = None) -> None:
+        """
+        Settle the open bet once its match has ended. `winner` is a hint
+        (from a pushed match.ended): it saves the /result round trip only
+        when the local replay agrees with it.
+        """
+        if time.time() * 1000 < self.current_bet["ends_at"]:
+            return
+        
+        match_id = self.current_bet["match_id"]
+        result = self.cache.get_result(match_id) if self.cache is not None else None
+        hint, winner, fetched = winner, None, False
+        if result:
+            winner = result["winner"]
+        elif self.config.local_settlement:
+            # Outcome is a pure function of the match ID - no round trip
+            winner = arena_sim.match_winner(match_id)
+        elif (hint is not None and not needs_battle_log(self.current_bet)
+              and hint == arena_sim.match_winner(match_id)):
+            winner = hint  # Pushed with the event and confirmed by the replay - nothing to fetch
+        else:
+            if hint is not None and not needs_battle_log(self.current_bet):
+                logger.warning(f"Pushed winner {hint} for {match_id} disagrees with the replay, reading /result")
+            # Winner bets stop reading at "winner" (the cache keeps the
+            # whole header); board bets stream the log
+            fields = None if self.cache is not None else result_stream.SETTLEMENT_FIELDS
+            result = self.arena.get_match_result(match_id, fields, with_log=needs_battle_log(self.current_bet))
+            if not result:
+                return
+            winner = result.get("winner")
+            fetched = True
+        
+        self.settle_bet(winner, result)
+        if fetched and self.cache is not None:
+            self._cache_result(match_id, result)
+    
+    def _cache_result(self, match_id: str, result: Dict):
+        """Keep an ended match's header so nothing refetches it (the streamed log is gone)."""
+        try:
+            header = {k: v for k, v in result.items() if k != result_stream.LOG_FIELD}
+            self.cache.put(arena_sim.generate_match(match_id), header)
+        except Exception as e:
+            logger.warning(f"Could not cache {match_id}: {e}")
     
     def run_once(self) -> bool:
         """
         Run one iteration of the trading loop.
         Returns True if should continue, False if should stop.
         """
+        self.drain_events()
+        if self.current_bet:
+            self.check_settlement()
+        
         # Get current match
         match = self.arena.get_current_match()
         if not match:
             logger.debug("No match available, waiting...")
-            time.sleep(self.config.poll_interval)
+            self.idle()
             return True
         
         match_id = match.get("matchId") or match.get("id")
         status = match.get("status", "unknown")
         
-        # Skip if same match we already bet on
+        # Still waiting on the match we already bet on
         if match_id == self.last_match_id and self.current_bet:
-            # Wait for result
-            if status == "ended":
-                # Check result
-                result = self.arena.get_match_result(match_id)
-                if result:
-                    winner = result.get("winner")
-                    bet_team = self.current_bet["team_idx"]
-                    won = (winner == bet_team)
-                    
-                    if won:
-                        payout = self.current_bet["wager"] * self.current_bet["odds"]
-                        profit = payout - self.current_bet["wager"]
-                        self.session_stats["bets_won"] += 1
-                        self.session_stats["total_won"] += payout
-                        self.session_stats["consecutive_losses"] = 0
-                        self.session_stats["best_win"] = max(self.session_stats["best_win"], profit)
-                        logger.info(f"🎉 WON! +{profit:.2f} {self.config.currency}")
-                    else:
-                        loss = self.current_bet["wager"]
-                        self.session_stats["bets_lost"] += 1
-                        self.session_stats["consecutive_losses"] += 1
-                        self.session_stats["worst_loss"] = max(self.session_stats["worst_loss"], loss)
-                        logger.info(f"💸 LOST! -{loss:.2f} {self.config.currency}")
-                    
-                    self.current_bet = None
-                    self.last_match_id = None
-                    self.log_stats()
-            
-            time.sleep(self.config.poll_interval)
+            self.idle()
             return True
         
-        # New match - analyze and potentially bet
-        if status == "betting" and match_id != self.last_match_id:
+        # New match - analyze and potentially bet (one open bet at a time;
+        # the previous one settles before the next window closes)
+        if status == "betting" and match_id != self.last_match_id and not self.current_bet:
             balance = self.get_balance()
-            
-            if self.session_stats["start_balance"] == 0:
-                self.session_stats["start_balance"] = balance
+            self.begin_session(balance)
             
             if self.should_stop(balance):
                 return False
             
-            logger.info(f"📊 Analyzing match {match_id}...")
-            
-            # Analyze and pick team
-            pick = pick_best_team(match, self.config)
-            
-            if pick and pick["confidence"] >= self.config.min_confidence:
+            plan = self.plan_bet(match, balance)
+            if plan:
+                self.submit_bet(plan)
+            else:
+                self.mark_seen(match_id)  # Don't re-analyze
+        
+        self.idle()
+        return True
+    
+    def plan_bet(self, match: Dict, balance: float, win_probs: Optional[List[float]] = None) -> Optional[Dict]:
+        """
+        Analyze a betting match and size a wager. None means skip it.
+        win_probs can be passed in when they were computed once for many traders.
+        """
+        match_id = match.get("matchId") or match.get("id")
+        logger.info(f"📊 Analyzing match {match_id}...")
+        
+        # Analyze and pick team - precomputed win probabilities skip the simulation
+        if win_probs is None and self.schedule:
+            win_probs = self.schedule.win_probs(match)
+        board = None
+        with metrics.timer("analysis"):
+            if self.config.whole_board and board_pricer is not None and self.config.mc_replicates > 0:
+                # One tracked simulation prices every market, winner included
+                board = board_pricer.price_board(match, n=self.config.mc_replicates,
+                                                 keep_samples=portfolio is not None)
+                win_probs = win_probs or board["winner"]
+            analyses = score_teams(match, self.config, win_probs)
+            pick = select_market(board, analyses, self.config) if board else select_bet(analyses, self.config)
+        decision = {
+            "match_id": arena_sim.parse_match_id(match_id),
+            "analyses": [{k: a[k] for k in ANALYSIS_KEYS} for a in analyses],
+            "balance": balance,
+        }
+        
+        if not pick or pick["confidence"] < self.config.min_confidence:
+            reason = "No positive edge found" if not pick else f"Confidence too low ({pick['confidence']:.1%})"
+            metrics.count("skipped_matches", reason="no_edge" if not pick else "low_confidence")
+            self._emit("decision", **decision, pick=None, reason="no_edge" if not pick else "low_confidence")
+            logger.info(f"⏭️ Skipping match: {reason}")
+            return None
+        
+        legs = None
+        with metrics.timer("wager"):
+            if board is not None and portfolio is not None:
+                # Correlated markets on one battle are sized together
+                legs = size_slip(board, analyses, balance, self.config)
+                wager = round(sum(leg["wager"] for leg in legs), 2)
+            else:
                 wager = calculate_wager(
                     balance,
                     pick["confidence"],
                     pick["odds"],
                     self.config
                 )
-                
-                logger.info(f"🎯 {pick['reasoning']}")
-                logger.info(f"💰 Wagering {wager:.2f} {self.config.currency} (Balance: {balance:.2f})")
-                
-                # Place bet
-                bet_result = self.arena.place_bet(match_id, pick["team_idx"], wager)
-                
-                if bet_result:
-                    self.current_bet = {
-                        "match_id": match_id,
-                        "team_idx": pick["team_idx"],
-                        "team_name": pick["team_name"],
-                        "wager": wager,
-                        "odds": pick["odds"],
-                        "confidence": pick["confidence"],
-                    }
-                    self.last_match_id = match_id
-                    self.session_stats["bets_placed"] += 1
-                    self.session_stats["total_wagered"] += wager
-                    logger.info(f"✅ Bet placed on {pick['team_name']} @ {pick['odds']:.2f}x")
-                else:
-                    logger.warning("Failed to place bet")
-            else:
-                reason = "No positive edge found" if not pick else f"Confidence too low ({pick['confidence']:.1%})"
-                logger.info(f"⏭️ Skipping match: {reason}")
-                self.last_match_id = match_id  # Don't re-analyze
+        if legs is not None and not legs:
+            metrics.count("skipped_matches", reason="no_stake")
+            self._emit("decision", **decision, pick=None, reason="no_stake")
+            logger.info("⏭️ Skipping match: Kelly sizer staked nothing")
+            return None
+        
+        self._emit("decision", **decision, pick=pick["team_idx"], market=pick.get("market", "winner"),
+                   confidence=pick["confidence"], edge=pick["edge"], wager=wager)
+        logger.info(f"🎯 {pick['reasoning']}")
+        for leg in legs or []:
+            logger.info(f"   🧾 {leg['team_name']} @ {leg['odds']:.2f}x: {leg['wager']:.2f} {self.config.currency}")
+        logger.info(f"💰 Wagering {wager:.2f} {self.config.currency} (Balance: {balance:.2f})")
+        
+        return {
+            "match_id": match_id,
+            "team_idx": pick["team_idx"],
+            "team_name": pick["team_name"],
+            "market": pick.get("market", "winner"),
+            "line": pick.get("line"),
+            "wager": wager,
+            "odds": pick["odds"],
+            "confidence": pick["confidence"],
+            "legs": legs,
+            "closes_at": match.get("bettingEndsAt") or arena_sim.match_times(
+                arena_sim.parse_match_id(match_id))["bettingEndsAt"],
+            "ends_at": match.get("endsAt") or arena_sim.match_times(
+                arena_sim.parse_match_id(match_id))["endsAt"],
+        }
+    
+    def submit_bet(self, plan: Dict) -> bool:
+        """Place a planned bet and start tracking it."""
+        self.pending_bet = plan
+        self._journal("submit")
+        legs = plan.get("legs")
+        deadline = plan["closes_at"] / 1000 if plan.get("closes_at") else None
+        if legs:
+            bet_result = self.arena.place_bets(plan["match_id"], legs, deadline)
+        else:
+            bet_result = self.arena.place_bet(plan["match_id"], plan["team_idx"], plan["wager"],
+                                              plan.get("market", "winner"), deadline)
+        self.pending_bet = None
+        for leg in legs or [plan]:
+            self._emit("bet", match_id=arena_sim.parse_match_id(plan["match_id"]), team_idx=leg["team_idx"],
+                       market=leg.get("market", "winner"), wager=leg["wager"], odds=leg["odds"], ok=bool(bet_result))
+        
+        if not bet_result:
+            logger.warning("Failed to place bet")
+            self.ledger.mark_suspect("bet rejected")
+            self._journal("rejected", match_id=plan["match_id"])
+            return False
         
-        time.sleep(self.config.poll_interval)
+        plan["bet_ids"] = receipt_bet_ids(bet_result)
+        self._book_placed(plan)
+        self._journal("placed")
+        if plan.get("closes_at"):
+            # How far ahead of the close the bet landed
+            margin = plan["closes_at"] / 1000 - time.time()
+            metrics.observe("bet_margin", max(0.0, margin))
+            if margin < 0:
+                metrics.count("late_bets")
+        if legs:
+            logger.info(f"✅ Slip placed: {len(legs)} bets, {plan['wager']:.2f} {self.config.currency}")
+        else:
+            logger.info(f"✅ Bet placed on {plan['team_name']} @ {plan['odds']:.2f}x")
+        if self.config.live_monitor and inplay is not None:
+            self.monitor_live(plan)
         return True
     
-    def run(self):
-        """Main trading loop - runs until stopped."""
+    def monitor_live(self, plan: Dict) -> None:
+        """Follow the bet's match while it is live, logging the in-play win probability."""
+        match = arena_sim.generate_match(plan["match_id"])
+        team_idx = plan["team_idx"]
+        if team_idx is None:
+            return  # Prop bets don't ride on the winner
+        size = arena_sim.TEAM_SIZE
+        last_alive = [None]
+        
+        def on_update(update: Dict):
+            p = update["p_a"] if team_idx == 0 else 1 - update["p_a"]
+            metrics.gauge("live_win_prob", p)
+            self._emit("live", match_id=update["match_id"], tick=update["tick"], team_idx=team_idx,
+                       win_prob=round(p, 4), rebased=update["rebased"])
+            alive = update["hp"] > 0
+            alive = (int(alive[:size].sum()), int(alive[size:].sum()))
+            if alive != last_alive[0]:
+                last_alive[0] = alive
+                logger.info(f"📡 {alive[0]}v{alive[1]} at {update['tick'] * arena_sim.TICK_MS / 1000:.1f}s: "
+                            f"{plan['team_name']} {p:.1%} to win")
+        
+        inplay.watch(match, on_update,
+                     fetch_result=lambda mid: self.arena.get_match_result(mid, with_log=True))
+    
+    def _book_placed(self, plan: Dict):
+        self.ledger.debit(plan["wager"])
+        self.current_bet = plan
+        self.last_match_id = plan["match_id"]
+        self.session_stats["bets_placed"] += len(plan.get("legs") or [plan])
+        self.session_stats["total_wagered"] += plan["wager"]
+    
+    # ---- Pushed events ----
+    
+    def start_webhooks(self) -> bool:
+        """Listen for pushed events and register for them; False leaves the trader polling."""
+        self.webhook_loop = self.bankr_loop or BackgroundLoop("webhook-loop")
+        listener = webhooks.WebhookListener(self.inbox.put, self.config.webhook_host, self.config.webhook_port)
+        try:
+            self.webhook_loop.submit(listener.start()).result(timeout=10)
+        except Exception as e:
+            logger.warning(f"Webhook listener failed to start ({e}), polling every {self.config.poll_interval:g}s")
+            return False
+        url = self.config.webhook_url or f"http://127.0.0.1:{listener.port}{listener.path}"
+        if not self.arena.register_webhook(url, webhooks.EVENTS):
+            logger.warning(f"Webhooks unavailable, polling every {self.config.poll_interval:g}s")
+            self.webhook_loop.submit(listener.stop())
+            return False
+        self.webhooks = listener
+        logger.info(f"🪝 Events pushed to {url}, polling every {self.config.fallback_poll_interval:g}s as fallback")
+        return True
+    
+    def stop_webhooks(self):
+        if self.webhooks is not None:
+            self.webhook_loop.submit(self.webhooks.stop()).result(timeout=5)
+            logger.info(f"Webhook events: {self.webhooks.filter.stats}")
+            self.webhooks = None
+        if self.webhook_loop is not None and self.webhook_loop is not self.bankr_loop:
+            self.webhook_loop.stop()
+    
+    def handle_event(self, event: Dict) -> None:
+        """Apply one pushed event (already deduplicated and ordered by the listener)."""
+        kind = event["event"]
+        match_id = event.get("matchId")
+        metrics.count("webhook_events", kind=kind)
+        self._emit("webhook", kind=kind, match_id=webhooks.match_key(match_id), bet_id=event.get("betId"))
+        bet = self.current_bet
+        if not bet:
+            return  # match.started needs nothing applied: the loop fetches the new match next
+        # Pushes are unauthenticated: they only wake settlement, which still
+        # waits for the bet's end time and confirms any pushed winner
+        if kind == "match.ended" and webhooks.match_key(match_id) == webhooks.match_key(bet["match_id"]):
+            self.check_settlement(winner=event.get("winner"))
+        elif kind == "bet.settled" and event.get("betId") in (bet.get("bet_ids") or ()):
+            self.check_settlement()
+    
+    def drain_events(self) -> None:
+        """Apply every pushed event waiting in the inbox."""
+        while True:
+            try:
+                self.handle_event(self.inbox.get_nowait())
+            except queue.Empty:
+                return
+    
+    def idle(self) -> None:
+        """
+        Wait until the next poll. With webhooks live that is the fallback
+        interval, cut short by the first pushed event - or by the open
+        bet's end time, which costs no request to act on.
+        """
+        if self.webhooks is None:
+            time.sleep(self.config.poll_interval)
+            return
+        timeout = self.config.fallback_poll_interval
+        if self.current_bet:
+            until_end = self.current_bet["ends_at"] / 1000 + WEBHOOK_GRACE - time.time()
+            timeout = min(timeout, until_end if until_end > 0 else self.config.poll_interval)
+        try:
+            event = self.inbox.get(timeout=timeout)
+        except queue.Empty:
+            metrics.count("fallback_polls")
+            return
+        self.handle_event(event)
+        self.drain_events()
+    
+    # ---- Schedule-aware async mode ----
+    
+    async def _timed(self, fn, *args):
+        """Run a blocking client call off the event loop and track its RTT."""
+        start = time.monotonic()
+        try:
+            return await asyncio.to_thread(fn, *args)
+        finally:
+            rtt = time.monotonic() - start
+            self.rtt = rtt if self.rtt is None else 0.8 * self.rtt + 0.2 * rtt
+    
+    @staticmethod
+    async def _sleep_until(timestamp: float):
+        delay = timestamp - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    async def run_window(self) -> bool:
+        """
+        Handle the next betting window: sleep until just before it closes,
+        fetch and analyze, then bet at bettingEndsAt - bet_buffer_seconds
+        (less the measured RTT). Returns False if trading should stop.
+        """
+        match_num = arena_sim.current_match_id()
+        if self.last_match_id == f"SAVAGE-{match_num}":
+            match_num += 1
+        closes_at = arena_sim.match_times(match_num)["bettingEndsAt"] / 1000
+        rtt = self.rtt or 0.5
+        fetch_at = closes_at - self.config.bet_buffer_seconds - self.config.analysis_lead_seconds - 2 * rtt
+        
+        # The open bet's match ends a minute before this window closes
+        if self.current_bet and self.current_bet["ends_at"] / 1000 <= fetch_at:
+            await self._sleep_until(self.current_bet["ends_at"] / 1000)
+            await asyncio.to_thread(self.check_settlement)
+        
+        await self._sleep_until(fetch_at)
+        match = await self._timed(self.arena.get_current_match)
+        if not match or match.get("status") != "betting":
+            logger.warning(f"⏰ Missed betting window for SAVAGE-{match_num}")
+            metrics.count("missed_windows")
+            self.mark_seen(f"SAVAGE-{match_num}")
+            return True
+        
+        match_id = match.get("matchId") or match.get("id")
+        if self.current_bet:
+            # Settlement didn't resolve (e.g. remote result unavailable)
+            await asyncio.to_thread(self.check_settlement)
+            if self.current_bet:
+                logger.warning(f"Open bet on {self.current_bet['match_id']} unsettled, skipping {match_id}")
+                metrics.count("skipped_matches", reason="unsettled")
+                self.mark_seen(match_id)
+                return True
+        
+        balance = await asyncio.to_thread(self.get_balance)
+        self.begin_session(balance)
+        if self.should_stop(balance):
+            return False
+        
+        plan = self.plan_bet(match, balance)
+        if plan:
+            # Trust the server's clock for the close time when it disagrees
+            closes_at = match.get("bettingEndsAt", closes_at * 1000) / 1000
+            await self._sleep_until(closes_at - self.config.bet_buffer_seconds - (self.rtt or 0))
+            await self._timed(self.submit_bet, plan)
+        self.mark_seen(match_id)
+        return True
+    
+    async def run_scheduled(self):
+        """Async trading loop that wakes on match boundaries instead of polling."""
+        while await self.run_window():
+            pass
+        logger.info("Trading stopped.")
+    
+    def log_banner(self):
         logger.info("""
 ╔═══════════════════════════════════════╗
 ║  🎰 SAVAGE ARENA TRADING BOT 🎰       ║
@@ -593,12 +1417,29 @@ Worst Loss: {s['worst_loss']:.2f}
 ╚═══════════════════════════════════════╝
 """)
         logger.info(f"Arena URL: {self.config.arena_url}")
+        if self.config.dry_run:
+            logger.info(f"📝 Paper trading: {self.config.paper_balance:.2f} virtual {self.config.currency}, "
+                        f"no bets sent")
         logger.info(f"Min confidence: {self.config.min_confidence:.0%}")
         logger.info(f"Max wager: {self.config.max_wager_pct:.0%} of bankroll")
         logger.info(f"Kelly fraction: {self.config.kelly_fraction:.0%}")
-        logger.info("Starting trading loop...\n")
+        logger.info(f"Role weights: {WEIGHTS_VERSION or 'hand-tuned'}")
+    
+    def run(self, scheduled: bool = False):
+        """Main trading loop - runs until stopped."""
+        self.log_banner()
+        if self.config.metrics_port:
+            metrics.serve(self.config.metrics_port)
+        if self.config.webhook_port and scheduled:
+            logger.warning("Webhooks are not used by the scheduled loop - ignoring webhook_port")
+        elif self.config.webhook_port:
+            self.start_webhooks()
+        logger.info(f"Starting {'scheduled' if scheduled else 'polling'} trading loop...\n")
         
         try:
+            if scheduled:
+                asyncio.run(self.run_scheduled())
+                return
             while True:
                 if not self.run_once():
                     logger.info("Trading stopped.")
@@ -606,36 +1447,106 @@ Worst Loss: {s['worst_loss']:.2f}
         except KeyboardInterrupt:
             logger.info("\nShutdown requested...")
         finally:
+            self.stop_webhooks()
+            if self.owns_bankr_loop:
+                self.bankr_loop.stop()
             self.log_stats()
+            if self.journal:
+                self.journal.snapshot(self.journal_state())
+                self.journal.close()
             logger.info("Goodbye! 🤙")
 
 
 # ============ CLI ============
-def main():
-    parser = argparse.ArgumentParser(description="Savage Arena Autonomous Betting Agent")
-    parser.add_argument("--arena-url", default=os.getenv("SAVAGE_ARENA_URL", "https://savage-arena.vercel.app"))
-    parser.add_argument("--bankr-key", default=os.getenv("BANKR_API_KEY", ""))
+def add_risk_args(parser: argparse.ArgumentParser, mc_replicates: int = 4000) -> None:
+    """Risk / model flags shared by the trader and the offline tools."""
     parser.add_argument("--min-confidence", type=float, default=0.55)
     parser.add_argument("--max-wager", type=float, default=0.20)
     parser.add_argument("--kelly", type=float, default=0.25)
     parser.add_argument("--min-bet", type=float, default=1.0)
     parser.add_argument("--stop-loss", type=float, default=0.50)
-    parser.add_argument("--dry-run", action="store_true", help="Simulate without placing real bets")
-    
-    args = parser.parse_args()
-    
-    config = Config(
-        arena_url=args.arena_url,
-        bankr_api_key=args.bankr_key,
+    parser.add_argument("--max-losses", type=int, default=5, help="Stop after this many consecutive losses")
+    parser.add_argument("--mc-replicates", type=int, default=mc_replicates,
+                        help="Simulated battles per win estimate (0 = power-ratio heuristic)")
+
+
+def config_from_args(args: argparse.Namespace, **overrides) -> Config:
+    """Build a Config from add_risk_args flags."""
+    return Config(
         min_confidence=args.min_confidence,
         max_wager_pct=args.max_wager,
         kelly_fraction=args.kelly,
         min_wager=args.min_bet,
         stop_loss_pct=args.stop_loss,
+        max_consecutive_losses=args.max_losses,
+        mc_replicates=args.mc_replicates,
+        **overrides
     )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Savage Arena Autonomous Betting Agent")
+    parser.add_argument("--arena-url", default=os.getenv("SAVAGE_ARENA_URL", "https://savage-arena.vercel.app"))
+    parser.add_argument("--bankr-key", default=os.getenv("BANKR_API_KEY", ""))
+    add_risk_args(parser)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Paper-trade the live feed: bets go to an in-process book, never the API")
+    parser.add_argument("--paper-balance", type=float, default=1000.0, help="Starting virtual bankroll for --dry-run")
+    parser.add_argument("--scheduled", action="store_true",
+                        help="Sleep until each betting window instead of polling every few seconds")
+    parser.add_argument("--schedule", default="", help="Schedule file from schedule.py build --model ...")
+    parser.add_argument("--whole-board", action="store_true",
+                        help="Price every api/odds.js market (first blood, props, ...) and bet the best edge")
+    parser.add_argument("--live-monitor", action="store_true",
+                        help="Track the in-play win probability of each bet's match while it is live")
+    parser.add_argument("--journal", default="savage_trader.journal",
+                        help="State journal to resume from and append to ('' to disable)")
+    parser.add_argument("--cache", default="", help="SQLite cache of ended matches (see match_cache.py)")
+    parser.add_argument("--server-settlement", action="store_true",
+                        help="Settle from the arena's /result instead of the local arena_sim replay")
+    parser.add_argument("--poll-interval", type=float, default=5, help="Seconds between match polls")
+    parser.add_argument("--webhook-port", type=int, default=0,
+                        help="Register for pushed match/bet events and listen on this port (0 = poll only)")
+    parser.add_argument("--webhook-host", default="127.0.0.1",
+                        help="Interface the webhook listener binds (keep local unless a proxy authenticates pushes)")
+    parser.add_argument("--webhook-url", default="",
+                        help="Public URL the arena should push to (default http://127.0.0.1:PORT/webhook)")
+    parser.add_argument("--fallback-poll", type=float, default=60,
+                        help="Seconds between polls while webhook events are arriving")
+    parser.add_argument("--metrics-port", type=int, default=0, help="Serve Prometheus metrics on this port")
+    parser.add_argument("--events", default="savage_events.jsonl", help="JSONL event log ('' to disable)")
+    parser.add_argument("--log-file", default="savage_trader.log", help="Text log file ('' to disable)")
+    parser.add_argument("--quiet", action="store_true", help="No console output")
+    parser.add_argument("--roster", help="Index fighters from this fighters.json/.csv instead of the API roster")
+    parser.add_argument("--weights", default=WEIGHTS_PATH,
+                        help="Role weight table from train_weights.py ('' for the hand-tuned weights)")
+    
+    args = parser.parse_args()
+    if args.scheduled and args.webhook_port:
+        parser.error("--webhook-port has no effect with --scheduled (it wakes on the schedule, not on events)")
+    events.setup_logging(args.events or None, console=not args.quiet, log_file=args.log_file or None)
+    
+    if not args.weights:
+        apply_weights(None)
+    elif args.weights != WEIGHTS_PATH and load_weights(args.weights) is None:
+        logger.warning(f"No weight table at {args.weights}, keeping {WEIGHTS_VERSION or 'hand-tuned weights'}")
+    if args.roster:
+        load_roster(args.roster)
+    
+    config = config_from_args(args, arena_url=args.arena_url, bankr_api_key=args.bankr_key,
+                              schedule_path=args.schedule, whole_board=args.whole_board,
+                              live_monitor=args.live_monitor, cache_path=args.cache,
+                              local_settlement=not args.server_settlement,
+                              # The paper book lives in memory - don't resume its bets into a real journal
+                              journal_path="" if args.dry_run else args.journal,
+                              dry_run=args.dry_run, paper_balance=args.paper_balance,
+                              metrics_port=args.metrics_port, poll_interval=args.poll_interval,
+                              webhook_port=args.webhook_port, webhook_host=args.webhook_host,
+                              webhook_url=args.webhook_url,
+                              fallback_poll_interval=args.fallback_poll)
     
     trader = SavageTrader(config)
-    trader.run()
+    trader.run(scheduled=args.scheduled)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Savage Arena Forward Schedule
+
+Every matchup is a pure function of its match ID, so the next M matches
+can be generated ahead of time. This tool writes them to one compact
+columnar file - fighter IDs per side, the API's calcPower and calcOdds,
+and optionally the model's win probability for team A - that readers
+memory-map and index by `match_id - first_id`. No parsing, no
+generation, O(1) per lookup.
+
+File layout: an 8-byte magic, a little-endian uint32 header length, a
+JSON header (first ID, count, column dtypes/shapes/offsets), then each
+column as a raw C-ordered array aligned to 64 bytes.
+
+Usage:
+    python schedule.py build schedule.bin --days 30              # a month from now
+    python schedule.py build schedule.bin --start 1234 --count 8640 --model mc -n 2000
+    python schedule.py show schedule.bin 1250
+"""
+
+import sys
+import json
+import time
+import struct
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import arena_sim
+
+try:
+    import monte_carlo
+except ImportError:
+    monte_carlo = None
+
+MAGIC = b"SAVSCHD1"
+ALIGN = 64
+MATCHES_PER_DAY = 24 * 3600 * 1000 // arena_sim.MATCH_INTERVAL
+
+# name -> (dtype, width)
+COLUMNS = {
+    "fighters_a": (np.uint8, arena_sim.TEAM_SIZE),
+    "fighters_b": (np.uint8, arena_sim.TEAM_SIZE),
+    "template_a": (np.uint8, 1),
+    "template_b": (np.uint8, 1),
+    "power_a": (np.float64, 1),
+    "power_b": (np.float64, 1),
+    "odds_a": (np.float64, 1),
+    "odds_b": (np.float64, 1),
+}
+PROB_COLUMN = ("win_prob_a", np.float32, 1)  # NaN where no model estimate
+
+FIGHTERS_BY_ID = {f["id"]: f for f in arena_sim.FIGHTERS}
+TEMPLATE_INDEX = {t["name"]: i for i, t in enumerate(arena_sim.TEAMS)}
+
+
+# ============ FILE LAYOUT ============
+def _layout(count: int, columns: List[Tuple[str, np.dtype, int]], header_size: int) -> List[Dict]:
+    fields, offset = [], header_size
+    for name, dtype, width in columns:
+        offset = -(-offset // ALIGN) * ALIGN
+        shape = [count, width] if width > 1 else [count]
+        fields.append({"name": name, "dtype": np.dtype(dtype).str, "shape": shape, "offset": offset})
+        offset += count * width * np.dtype(dtype).itemsize
+    return fields
+
+
+def _header(first_id: int, count: int, columns: List[Tuple[str, np.dtype, int]]) -> bytes:
+    # Offsets depend on the header size, so lay out against a fixed-size prefix
+    prefix = 4096
+    meta = {"version": 1, "first_id": first_id, "count": count,
+            "created": int(time.time()), "columns": _layout(count, columns, prefix)}
+    body = json.dumps(meta).encode()
+    if len(MAGIC) + 4 + len(body) > prefix:
+        raise ValueError("Schedule header too large")
+    return MAGIC + struct.pack("<I", len(body)) + body.ljust(prefix - len(MAGIC) - 4)
+
+
+def _read_header(path: str) -> Dict:
+    with open(path, "rb") as fh:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a schedule file")
+        (size,) = struct.unpack("<I", fh.read(4))
+        return json.loads(fh.read(size))
+
+
+# ============ BUILD ============
+def fill_rows(columns: Dict[str, np.ndarray], first_id: int, lo: int, hi: int):
+    """Generate matches first_id+lo .. first_id+hi-1 into the column arrays."""
+    for i in range(lo, hi):
+        team_a, team_b, templates, _ = arena_sim.draw_teams(first_id + i)
+        columns["fighters_a"][i] = [f["id"] for f in team_a]
+        columns["fighters_b"][i] = [f["id"] for f in team_b]
+        columns["template_a"][i] = TEMPLATE_INDEX[templates[0]["name"]]
+        columns["template_b"][i] = TEMPLATE_INDEX[templates[1]["name"]]
+        columns["power_a"][i] = arena_sim.calc_power(team_a)
+        columns["power_b"][i] = arena_sim.calc_power(team_b)
+        odds = arena_sim.calc_odds(team_a, team_b)
+        columns["odds_a"][i] = odds["A"]
+        columns["odds_b"][i] = odds["B"]
+
+
+def model_probs(columns: Dict[str, np.ndarray], first_id: int, lo: int, hi: int,
+                model: str, replicates: int, seed: Optional[int]):
+    """Team A win probability for rows lo..hi-1 from the chosen model."""
+    if model == "mc":
+        estimates = monte_carlo.estimate_win_probs(range(first_id + lo, first_id + hi),
+                                                   n=replicates, seed=seed)
+        columns["win_prob_a"][lo:hi] = [e["p_a"] for e in estimates]
+    elif model == "power":
+        # Same power-ratio heuristic score_teams falls back to
+        from savage_trader import Config, score_teams
+        config = Config(mc_replicates=0)
+        for i in range(lo, hi):
+            analyses = score_teams(arena_sim.generate_match(first_id + i, now_ms=0), config)
+            columns["win_prob_a"][i] = next(a["win_prob"] for a in analyses if a["idx"] == 0)
+
+
+def build(path: str, first_id: int, count: int, model: str = "none", replicates: int = 2000,
+          seed: Optional[int] = None, chunk: int = 2048) -> "Schedule":
+    """Write `count` matches from `first_id` to `path` and open it."""
+    if model == "mc" and monte_carlo is None:
+        raise RuntimeError("--model mc needs numpy's monte_carlo module")
+    columns = [(name, dtype, width) for name, (dtype, width) in COLUMNS.items()]
+    if model != "none":
+        columns.append(PROB_COLUMN)
+
+    header = _header(first_id, count, columns)
+    meta = json.loads(header[len(MAGIC) + 4:].rstrip())
+    size = max(c["offset"] + int(np.prod(c["shape"])) * np.dtype(c["dtype"]).itemsize
+               for c in meta["columns"])
+    with open(path, "wb") as fh:
+        fh.write(header)
+        fh.truncate(size)
+
+    arrays = {c["name"]: np.memmap(path, dtype=c["dtype"], mode="r+", offset=c["offset"],
+                                   shape=tuple(c["shape"]))
+              for c in meta["columns"]}
+    for lo in range(0, count, chunk):
+        hi = min(lo + chunk, count)
+        fill_rows(arrays, first_id, lo, hi)
+        if model != "none":
+            model_probs(arrays, first_id, lo, hi, model, replicates,
+                        None if seed is None else seed + lo)
+    for arr in arrays.values():
+        arr.flush()
+    del arrays
+    return Schedule(path)
+
+
+# ============ READ ============
+class Schedule:
+    """Read-only memory-mapped view of a schedule file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        meta = _read_header(path)
+        self.first_id = meta["first_id"]
+        self.count = meta["count"]
+        self.created = meta.get("created")
+        self.columns: Dict[str, np.ndarray] = {
+            c["name"]: np.memmap(path, dtype=c["dtype"], mode="r", offset=c["offset"],
+                                 shape=tuple(c["shape"]))
+            for c in meta["columns"]
+        }
+        self.has_probs = "win_prob_a" in self.columns
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, match_id) -> bool:
+        return self.row(match_id) is not None
+
+    @property
+    def last_id(self) -> int:
+        return self.first_id + self.count - 1
+
+    def row(self, match_id) -> Optional[int]:
+        """Row of a match ID ("SAVAGE-1234", "1234" or 1234), None if outside the file."""
+        i = arena_sim.parse_match_id(match_id) - self.first_id
+        return i if 0 <= i < self.count else None
+
+    def lookup(self, match_id) -> Optional[Dict]:
+        """Scalar fields of one match."""
+        i = self.row(match_id)
+        if i is None:
+            return None
+        c = self.columns
+        entry = {
+            "match_id": self.first_id + i,
+            "fighters_a": c["fighters_a"][i].tolist(),
+            "fighters_b": c["fighters_b"][i].tolist(),
+            "power_a": float(c["power_a"][i]),
+            "power_b": float(c["power_b"][i]),
+            "odds": {"A": float(c["odds_a"][i]), "B": float(c["odds_b"][i])},
+            "win_prob_a": None,
+        }
+        if self.has_probs and not np.isnan(c["win_prob_a"][i]):
+            entry["win_prob_a"] = float(c["win_prob_a"][i])
+        return entry
+
+    def match(self, match_id) -> Optional[Dict]:
+        """Rebuild the /api/match/current payload (status omitted) from the columns."""
+        entry = self.lookup(match_id)
+        if entry is None:
+            return None
+        mid = entry["match_id"]
+        times = arena_sim.match_times(mid)
+        payload = {"matchId": f"SAVAGE-{mid}", "seed": f"SAVAGE-{mid}", **times}
+        i = mid - self.first_id
+        for side in ("A", "B"):
+            key = side.lower()
+            template = arena_sim.TEAMS[int(self.columns[f"template_{key}"][i])]
+            payload[f"team{side}"] = {
+                "name": template["name"],
+                "color": template["color"],
+                "fighters": [FIGHTERS_BY_ID[fid] for fid in entry[f"fighters_{key}"]],
+                "totalPower": entry[f"power_{key}"],
+            }
+        payload["odds"] = entry["odds"]
+        return payload
+
+    def win_probs(self, match: Dict) -> Optional[List[float]]:
+        """
+        Precomputed [P(A), P(B)] for a live payload, or None when the match is
+        outside the file, has no estimate, or its fighters don't agree with
+        the file (stale schedule or different roster).
+        """
+        if not self.has_probs:
+            return None
+        i = self.row(match.get("matchId") or match.get("id") or -1)
+        if i is None:
+            return None
+        p = float(self.columns["win_prob_a"][i])
+        if np.isnan(p):
+            return None
+        for side in ("A", "B"):
+            fighters = match.get(f"team{side}", {}).get("fighters", [])
+            if [f.get("id") for f in fighters] != self.columns[f"fighters_{side.lower()}"][i].tolist():
+                return None
+        return [p, 1.0 - p]
+
+    def window(self, first_id: int, count: int) -> Dict[str, np.ndarray]:
+        """Zero-copy column slices for `count` matches from `first_id` (clipped to the file)."""
+        lo = max(0, arena_sim.parse_match_id(first_id) - self.first_id)
+        hi = min(self.count, lo + max(0, count))
+        return {name: col[lo:hi] for name, col in self.columns.items()}
+
+
+# ============ CLI ============
+def main():
+    parser = argparse.ArgumentParser(description="Precompute upcoming arena matchups into a mapped file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    b = sub.add_parser("build", help="Generate a schedule file")
+    b.add_argument("path")
+    b.add_argument("--start", type=int, help="First match ID (default: current)")
+    b.add_argument("--count", type=int, help="Number of matches")
+    b.add_argument("--days", type=float, default=1.0, help="Days of matches when --count is not given")
+    b.add_argument("--model", choices=["none", "power", "mc"], default="none",
+                   help="Store team A win probability from this model")
+    b.add_argument("-n", "--replicates", type=int, default=2000, help="Replicates for --model mc")
+    b.add_argument("--seed", type=int, default=None)
+
+    s = sub.add_parser("show", help="Print matches from a schedule file")
+    s.add_argument("path")
+    s.add_argument("match_id", nargs="?", help="First match to show (default: current)")
+    s.add_argument("--rows", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        first = args.start or arena_sim.current_match_id()
+        count = args.count or int(args.days * MATCHES_PER_DAY)
+        t0 = time.perf_counter()
+        sched = build(args.path, first, count, args.model, args.replicates, args.seed)
+        elapsed = time.perf_counter() - t0
+        size = sum(col.nbytes for col in sched.columns.values())
+        print(f"SAVAGE-{sched.first_id}..SAVAGE-{sched.last_id} ({count} matches, "
+              f"{size / 1024:.0f} KiB of columns) -> {args.path} in {elapsed:.2f}s", file=sys.stderr)
+        return
+
+    sched = Schedule(args.path)
+    first = args.match_id or arena_sim.current_match_id()
+    start = arena_sim.parse_match_id(first)
+    for mid in range(start, start + args.rows):
+        entry = sched.lookup(mid)
+        if entry is None:
+            print(f"SAVAGE-{mid}: not in {args.path} "
+                  f"(covers {sched.first_id}..{sched.last_id})")
+            break
+        prob = f"  P(A)={entry['win_prob_a']:.3f}" if entry["win_prob_a"] is not None else ""
+        print(f"SAVAGE-{mid}: A {entry['fighters_a']} {entry['power_a']:.1f} @ {entry['odds']['A']:.2f}x"
+              f"  vs  B {entry['fighters_b']} {entry['power_b']:.1f} @ {entry['odds']['B']:.2f}x{prob}")
+
+
+if __name__ == "__main__":
+    main()
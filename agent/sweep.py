@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Savage Arena Config Sweep
+
+Grid or random search over the Config risk parameters against one
+replayed match history. Per-match analysis and outcomes are computed once
+(backtest.analyze_range), packed into NumPy arrays in shared memory, and
+every worker replays its configs against that same block - a 1,000-config
+sweep costs one analysis pass plus 1,000 cheap bankroll walks.
+
+Usage:
+    python sweep.py --count 20000 --grid min_confidence=0.5,0.55,0.6 kelly_fraction=0.1,0.25,0.5
+    python sweep.py --count 105120 --random 2000 --out sweep.csv
+    python sweep.py --cache history.npz --random 500     # reuse a saved analysis
+
+A --cache file records the match range, Monte Carlo replicates and role
+weight version it was analyzed with, and is rebuilt when any of them
+differs from the current run.
+"""
+
+import os
+import sys
+import csv
+import json
+import math
+import time
+import random
+import argparse
+import itertools
+from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import backtest
+import savage_trader as st
+from savage_trader import (
+    Config,
+    calculate_wager,
+    book_settlement,
+    new_session_stats,
+    stop_reason,
+)
+
+# name -> (low, high, type) for random search
+SEARCH_SPACE = {
+    "min_confidence": (0.45, 0.80, float),
+    "max_wager_pct": (0.02, 0.40, float),
+    "kelly_fraction": (0.05, 1.00, float),
+    "min_wager": (1.0, 10.0, float),
+    "stop_loss_pct": (0.20, 0.95, float),
+    "max_consecutive_losses": (2, 20, int),
+}
+
+RESULT_COLUMNS = ["rank", *SEARCH_SPACE, "final_balance", "log_growth", "roi", "max_drawdown",
+                  "win_rate", "bets", "stopped_at"]
+
+# Shared history columns, in select_bet's analysis order (team with the
+# higher adjusted power first)
+HISTORY_FIELDS = [("win_prob", np.float64, 2), ("odds", np.float64, 2), ("won", np.bool_, 2),
+                  ("match_id", np.int64, 1)]
+
+
+# ============ SHARED HISTORY ============
+def pack_history(records: List[Dict]) -> Dict[str, np.ndarray]:
+    """Turn backtest records into flat arrays (two teams per match)."""
+    n = len(records)
+    history = {name: np.zeros((n, width) if width > 1 else n, dtype=dtype)
+               for name, dtype, width in HISTORY_FIELDS}
+    for i, rec in enumerate(records):
+        history["match_id"][i] = rec["match_id"]
+        for j, a in enumerate(rec["analyses"][:2]):
+            history["win_prob"][i, j] = a["win_prob"]
+            history["odds"][i, j] = a["odds"]
+            history["won"][i, j] = a["idx"] == rec["winner"]
+    return history
+
+
+def _layout(n: int) -> Tuple[List[Tuple[str, np.dtype, tuple, int]], int]:
+    fields, offset = [], 0
+    for name, dtype, width in HISTORY_FIELDS:
+        shape = (n, width) if width > 1 else (n,)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset = (offset + 7) & ~7
+        fields.append((name, np.dtype(dtype), shape, offset))
+        offset += size
+    return fields, offset
+
+
+def share_history(history: Dict[str, np.ndarray]) -> shared_memory.SharedMemory:
+    """Copy history into a new shared memory block."""
+    n = history["match_id"].shape[0]
+    fields, size = _layout(n)
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for name, dtype, shape, offset in fields:
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = history[name]
+    return shm
+
+
+def attach_history(shm: shared_memory.SharedMemory, n: int) -> Dict[str, np.ndarray]:
+    """Zero-copy views of a shared history block."""
+    fields, _ = _layout(n)
+    return {name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            for name, dtype, shape, offset in fields}
+
+
+_worker: Dict = {}
+
+
+def _init_worker(shm_name: str, n: int, start_balance: float):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker.update(shm=shm, history=attach_history(shm, n), start_balance=start_balance)
+
+
+# ============ REPLAY ============
+def select_bets(history: Dict[str, np.ndarray], min_confidence: float) -> Dict[str, np.ndarray]:
+    """
+    select_bet for every match at once: highest positive edge among teams
+    at or above min_confidence, first team winning ties.
+    """
+    wp, odds = history["win_prob"], history["odds"]
+    edge = wp * odds - 1
+    valid = (edge > 0) & (wp >= min_confidence)
+    second = valid[:, 1] & (~valid[:, 0] | (edge[:, 1] > edge[:, 0]))
+    col = second.astype(np.intp)
+    rows = np.arange(len(col))
+    best_edge, best_wp = edge[rows, col], wp[rows, col]
+    confidence = np.minimum(1.0, best_wp + best_edge * 0.3)
+    placed = (valid[:, 0] | valid[:, 1]) & (confidence >= min_confidence)
+    return {
+        "index": np.flatnonzero(placed),
+        "confidence": confidence,
+        "odds": odds[rows, col],
+        "won": history["won"][rows, col],
+    }
+
+
+def replay_config(history: Dict[str, np.ndarray], config: Config, start_balance: float) -> Dict:
+    """Bankroll walk for one config - same steps as backtest.replay."""
+    bets = select_bets(history, config.min_confidence)
+    stats = new_session_stats(start_balance)
+    balance = peak = start_balance
+    drawdown = 0.0
+    stopped_at = None
+    match_ids = history["match_id"]
+
+    # Stop conditions only change when a bet settles, so checking before
+    # each bet gives the same final bankroll as checking every match;
+    # stopped_at is the match of the first bet not placed.
+    for i in bets["index"].tolist():
+        if stop_reason(stats, balance, config):
+            stopped_at = int(match_ids[i])
+            break
+        odds = float(bets["odds"][i])
+        wager = calculate_wager(balance, float(bets["confidence"][i]), odds, config)
+        stats["bets_placed"] += 1
+        stats["total_wagered"] += wager
+        balance += book_settlement(stats, wager, odds, bool(bets["won"][i])) - wager
+        peak = max(peak, balance)
+        drawdown = max(drawdown, 1 - balance / peak if peak > 0 else 0)
+
+    return {
+        **{name: getattr(config, name) for name in SEARCH_SPACE},
+        "final_balance": balance,
+        "log_growth": math.log(balance / start_balance) if balance > 0 and start_balance > 0 else float("-inf"),
+        "roi": (balance - start_balance) / stats["total_wagered"] if stats["total_wagered"] else 0,
+        "max_drawdown": drawdown,
+        "win_rate": stats["bets_won"] / stats["bets_placed"] if stats["bets_placed"] else 0,
+        "bets": stats["bets_placed"],
+        "stopped_at": stopped_at,
+    }
+
+
+def _replay_batch(configs: List[Config]) -> List[Dict]:
+    return [replay_config(_worker["history"], c, _worker["start_balance"]) for c in configs]
+
+
+# ============ SEARCH ============
+def parse_values(spec: str) -> Tuple[str, List]:
+    name, _, values = spec.partition("=")
+    if name not in SEARCH_SPACE:
+        raise ValueError(f"Unknown parameter '{name}' (choose from {', '.join(SEARCH_SPACE)})")
+    cast = SEARCH_SPACE[name][2]
+    return name, [cast(v) for v in values.split(",") if v]
+
+
+def grid_configs(base: Config, specs: List[str]) -> List[Config]:
+    axes = [parse_values(s) for s in specs]
+    names = [name for name, _ in axes]
+    return [replace(base, **dict(zip(names, combo)))
+            for combo in itertools.product(*(values for _, values in axes))]
+
+
+def random_configs(base: Config, count: int, seed: Optional[int] = None) -> List[Config]:
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(count):
+        params = {}
+        for name, (low, high, cast) in SEARCH_SPACE.items():
+            params[name] = rng.randint(low, high) if cast is int else round(rng.uniform(low, high), 4)
+        configs.append(replace(base, **params))
+    return configs
+
+
+def run_sweep(
+    history: Dict[str, np.ndarray],
+    configs: List[Config],
+    start_balance: float,
+    workers: int = 1,
+    batch_size: int = 50
+) -> List[Dict]:
+    """Replay every config against the shared history, best first."""
+    n = history["match_id"].shape[0]
+    batches = [configs[i:i + batch_size] for i in range(0, len(configs), batch_size)]
+
+    if workers <= 1:
+        results = [replay_config(history, c, start_balance) for c in configs]
+    else:
+        shm = share_history(history)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shm.name, n, start_balance)) as pool:
+                results = [r for batch in pool.map(_replay_batch, batches) for r in batch]
+        finally:
+            shm.close()
+            shm.unlink()
+
+    results.sort(key=lambda r: r["log_growth"], reverse=True)
+    for rank, r in enumerate(results, 1):
+        r["rank"] = rank
+    return results
+
+
+# ============ CLI ============
+def history_params(args, config: Config) -> Dict:
+    """What an analyzed history depends on - a cache built with anything else is stale."""
+    return {
+        "start": args.start,
+        "count": args.count,
+        "mc_replicates": config.mc_replicates,
+        "weights": st.WEIGHTS_VERSION or "hand-tuned",
+    }
+
+
+def load_or_build_history(args, config: Config) -> Dict[str, np.ndarray]:
+    params = history_params(args, config)
+    if args.cache and os.path.exists(args.cache):
+        with np.load(args.cache) as data:
+            cached = json.loads(str(data["params"])) if "params" in data.files else None
+            if cached == params:
+                return {name: data[name] for name, _, _ in HISTORY_FIELDS}
+        print(f"{args.cache} was built with {cached or 'unrecorded parameters'}, not {params} - rebuilding",
+              file=sys.stderr)
+
+    records = backtest.analyze_range(args.start, args.count, config, args.workers, args.chunk_size)
+    history = pack_history(records)
+    if args.cache:
+        np.savez(args.cache, **history, params=np.array(json.dumps(params, sort_keys=True)))
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep Config risk parameters over a replayed history")
+    parser.add_argument("--start", type=int, default=1, help="First match ID")
+    parser.add_argument("--count", type=int, default=20000, help="Number of matches")
+    parser.add_argument("--balance", type=float, default=backtest.DEFAULT_BALANCE)
+    parser.add_argument("--grid", nargs="*", metavar="NAME=V1,V2", help="Grid axes (others keep defaults)")
+    parser.add_argument("--random", type=int, metavar="N", help="Random search with N configs")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--mc-replicates", type=int, default=0, help="Monte Carlo replicates for analysis")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--cache", help="Load/save the analyzed history as .npz")
+    parser.add_argument("--out", default="sweep_results.csv", help="Ranked results CSV")
+    parser.add_argument("--top", type=int, default=20, help="Rows to print")
+    args = parser.parse_args()
+
+    if not args.grid and not args.random:
+        parser.error("pass --grid and/or --random")
+
+    base = Config(mc_replicates=args.mc_replicates)
+    configs = (grid_configs(base, args.grid) if args.grid else []) + \
+              (random_configs(base, args.random, args.seed) if args.random else [])
+
+    t0 = time.perf_counter()
+    history = load_or_build_history(args, base)
+    t1 = time.perf_counter()
+    results = run_sweep(history, configs, args.balance, args.workers)
+    t2 = time.perf_counter()
+
+    with open(args.out, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(results)
+
+    header = f"{'#':>4} " + " ".join(f"{name[:14]:>14}" for name in SEARCH_SPACE) + \
+             f" {'log growth':>11} {'ROI':>7} {'max DD':>7} {'bets':>6}"
+    print(header)
+    for r in results[:args.top]:
+        params = " ".join(f"{r[name]:>14.4g}" for name in SEARCH_SPACE)
+        print(f"{r['rank']:>4} {params} {r['log_growth']:>11.2f} {r['roi']:>+7.1%} "
+              f"{r['max_drawdown']:>7.1%} {r['bets']:>6}")
+    print(f"{len(history['match_id'])} matches analyzed in {t1 - t0:.2f}s, "
+          f"{len(configs)} configs replayed in {t2 - t1:.2f}s -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
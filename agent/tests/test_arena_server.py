@@ -0,0 +1,32 @@
+"""ArenaState answers malformed bet and webhook bodies with 400, never an exception."""
+
+import pytest
+
+from arena_server import ArenaClock, ArenaState
+
+
+@pytest.fixture
+def state():
+    return ArenaState(ArenaClock(1.0))
+
+
+@pytest.mark.parametrize("body", [
+    [1, 2],
+    "bet",
+    {"matchId": "SAVAGE-5", "bets": [5]},
+    {"matchId": "SAVAGE-5", "bets": [{"team": 0, "amount": 2}, "x"]},
+])
+def test_place_bet_rejects_non_objects(state, body):
+    assert state.place_bet("agent", body) == (400, {"error": "Invalid bet format"})
+
+
+@pytest.mark.parametrize("body", [[1], {"url": "http://127.0.0.1/hook", "events": 5}])
+def test_register_webhook_rejects_bad_bodies(state, body):
+    status, _ = state.register_webhook("agent", body)
+    assert status == 400
+
+
+@pytest.mark.parametrize("amount", [True, 0, "5", None])
+def test_place_bet_rejects_bad_amounts(state, amount):
+    body = {"matchId": "SAVAGE-5", "team": 0, "amount": amount}
+    assert state.place_bet("agent", body) == (400, {"error": "Minimum bet is 1 token"})
@@ -0,0 +1,42 @@
+"""arena_sim against the vectors golden/make_golden.mjs records from the JS handlers."""
+
+import json
+
+import pytest
+
+import arena_sim
+
+with open(arena_sim.GOLDEN_PATH) as fh:
+    GOLDEN = json.load(fh)
+
+
+@pytest.mark.parametrize("case", GOLDEN["hashes"], ids=lambda c: c["seed"])
+def test_hash(case):
+    assert arena_sim.SeededRNG.hash(case["seed"]) == case["hash"]
+
+
+@pytest.mark.parametrize("case", GOLDEN["rng"], ids=lambda c: c["seed"])
+def test_rng_stream(case):
+    rng = arena_sim.SeededRNG(case["seed"])
+    assert [rng.next() for _ in case["values"]] == case["values"]
+
+
+@pytest.mark.parametrize("case", GOLDEN["matches"], ids=lambda c: str(c["id"]))
+def test_generate_match(case):
+    match = arena_sim.generate_match(case["id"])
+    assert {k: v for k, v in match.items() if k != "status"} == case["match"]
+
+
+@pytest.mark.parametrize("case", GOLDEN["matches"], ids=lambda c: str(c["id"]))
+def test_simulate_battle(case):
+    result = arena_sim.simulate_battle(case["id"], with_log="battleLog" in case["result"])
+    assert result == case["result"]
+
+
+@pytest.mark.parametrize("case", GOLDEN["matches"], ids=lambda c: str(c["id"]))
+def test_match_winner(case):
+    assert arena_sim.match_winner(case["id"]) == case["result"]["winner"]
+
+
+def test_verify_golden_clean():
+    assert arena_sim.verify_golden() == []
@@ -0,0 +1,62 @@
+"""board_pricer settles every house_board market the way the real /result payload reads."""
+
+import pytest
+
+import arena_sim
+import board_pricer
+
+# 3 lands exactly on the kills line, 24 on the crits line
+MATCH_IDS = [3, 5, 16, 24, 100]
+
+
+def expected(market, result):
+    """(won, push) read straight off the payload and its battle log."""
+    log = result["battleLog"]
+    names_a = {f["name"] for f in result["teamA"]["fighters"]}
+    kills = [e for e in log if e["type"] == "kill"]
+    sides = {
+        "winner": "AB".index(result["winner"]),
+        "firstBlood": (0 if kills[0]["victim"] in names_a else 1) if kills else -1,
+        "firstElim": next((i for i, t in enumerate(("teamA", "teamB")) if result[t]["alive"] == 0), -1),
+    }
+    kind = market["type"]
+    if kind in sides:
+        return sides[kind] == market["team"], sides[kind] < 0
+    value = {
+        "kills": len(kills),
+        "duration": result["duration"],
+        "crits": sum(1 for e in log if e["type"] == "attack" and e.get("crit")),
+    }[kind[:-4] if kind.endswith("Over") else kind[:-5]]
+    if value == market["line"]:
+        return False, True
+    return (value > market["line"]) == kind.endswith("Over"), False
+
+
+@pytest.mark.parametrize("mid", MATCH_IDS)
+def test_settle_against_result(mid):
+    result = arena_sim.match_result(mid)
+    outcome = board_pricer.battle_outcome(result)
+    board = board_pricer.house_board(arena_sim.generate_match(mid))
+    assert {m["type"] for m in board} >= {"winner", "firstBlood", "firstElim", "killsOver", "critsUnder"}
+    for market in board:
+        won, push = board_pricer.settle(market, outcome)
+        assert (bool(won), bool(push)) == expected(market, result), market
+
+
+@pytest.mark.parametrize("mid, kind", [(3, "kills"), (24, "crits")])
+def test_value_on_the_line_pushes(mid, kind):
+    outcome = board_pricer.battle_outcome(arena_sim.match_result(mid))
+    for side in ("Over", "Under"):
+        market = next(m for m in board_pricer.house_board(arena_sim.generate_match(mid))
+                      if m["type"] == kind + side)
+        assert outcome[kind] == market["line"]
+        won, push = board_pricer.settle(market, outcome)
+        assert not won and push
+
+
+def test_battle_outcome_without_log():
+    result = dict(arena_sim.match_result(5), battleLog=None)
+    outcome = board_pricer.battle_outcome(result)
+    assert (outcome["kills"], outcome["crits"], outcome["first_blood"]) == (0, 0, -1)
+    won, push = board_pricer.settle({"type": "firstBlood", "team": 0, "line": None, "odds": 3.0}, outcome)
+    assert not won and push
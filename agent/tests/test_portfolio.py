@@ -0,0 +1,79 @@
+"""Multi-bet Kelly sizing: the solver, the Config limits and the slip built on them."""
+
+import numpy as np
+import pytest
+
+import arena_sim
+import board_pricer
+import portfolio
+from savage_trader import Config, size_slip
+
+
+@pytest.fixture(scope="module")
+def board():
+    return board_pricer.price_board(arena_sim.generate_match(1), n=2000, seed=1, keep_samples=True)
+
+
+def test_size_slip_respects_min_confidence(board):
+    loose = size_slip(board, [], 1000, Config(min_confidence=0.0))
+    assert any(leg["win_prob"] < 0.55 for leg in loose)
+    legs = size_slip(board, [], 1000, Config(min_confidence=0.55))
+    assert legs and all(leg["win_prob"] >= 0.55 for leg in legs)
+
+
+@pytest.mark.parametrize("p, b", [(0.6, 0.9 * 0.95), (0.35, 2.5 * 0.95), (0.8, 0.3 * 0.95)])
+def test_single_bet_is_closed_form_kelly(p, b):
+    returns = np.array([[b], [-1.0]])
+    weights = np.array([p, 1 - p])
+    kelly = (b * p - (1 - p)) / b
+    f = portfolio.optimal_fractions(returns, weights)
+    assert f[0] == pytest.approx(kelly, abs=1e-5)
+
+    config = Config(kelly_fraction=0.25, max_wager_pct=0.5, min_wager=1)
+    stakes = portfolio.size_portfolio(1000, returns, config, weights)
+    assert stakes[0] == pytest.approx(round(1000 * kelly * 0.25, 2), abs=0.011)
+
+
+def test_single_bet_with_push():
+    # Won 50%, pushed 20%, lost 30% at net return 1: f* = (pb - l) / (b(p + l))
+    returns = np.array([[1.0], [0.0], [-1.0]])
+    f = portfolio.optimal_fractions(returns, np.array([0.5, 0.2, 0.3]))
+    assert f[0] == pytest.approx(0.2 / 0.8, abs=1e-5)
+
+
+def test_losing_bets_are_skipped():
+    returns = np.array([[0.8, 0.5], [-1.0, -1.0]])
+    assert not portfolio.optimal_fractions(returns, np.array([0.4, 0.6])).any()
+
+
+@pytest.mark.parametrize("min_wager", [1, 10, 15])
+def test_limits_hold_after_min_wager_bumps(min_wager):
+    rng = np.random.default_rng(0)
+    returns = np.where(rng.random((4000, 8)) < 0.55, 0.9 * 0.95, -1.0)
+    config = Config(kelly_fraction=0.25, max_wager_pct=0.2, min_wager=min_wager)
+    stakes = portfolio.size_portfolio(100, returns, config)
+    placed = stakes[stakes > 0]
+    assert placed.size > 0
+    assert placed.min() >= min_wager
+    assert placed.max() <= 100 * config.max_wager_pct
+    assert stakes.sum() <= 100 * portfolio.MAX_IN_PLAY
+
+
+def test_budget_caps_a_lone_oversized_bet():
+    returns = np.array([[4.0], [-1.0]])
+    config = Config(kelly_fraction=1.0, max_wager_pct=1.0, min_wager=1)
+    stakes = portfolio.size_portfolio(100, returns, config, np.array([0.99, 0.01]))
+    assert 0 < stakes[0] <= 95.0
+
+
+def test_solver_stays_inside_the_capped_simplex():
+    rng = np.random.default_rng(1)
+    returns = np.where(rng.random((2000, 6)) < 0.7, 1.5, -1.0)
+    f = portfolio.optimal_fractions(returns, upper=0.3, budget=0.9)
+    assert f.max() <= 0.3 + 1e-12
+    assert f.sum() == pytest.approx(0.9, abs=1e-9)
+
+    x = rng.normal(0.4, 0.3, 10)
+    projected = portfolio._project(x, np.full(10, 0.25), 1.0)
+    assert projected.min() >= 0 and projected.max() <= 0.25
+    assert projected.sum() == pytest.approx(1.0)
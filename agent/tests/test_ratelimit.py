@@ -0,0 +1,103 @@
+"""RateLimiter's priority lanes, 429 penalties and request coalescing."""
+
+import threading
+import time
+
+import pytest
+
+import ratelimit
+from ratelimit import PRIORITY_BACKGROUND, PRIORITY_BET, PUBLIC_LANES, RateLimiter
+
+
+def drained(rate: float = 10) -> RateLimiter:
+    """A limiter whose public lane refills `rate` tokens a second and is empty now."""
+    limiter = RateLimiter({"public": rate}, per=1.0)
+    while limiter.wait_time(PUBLIC_LANES) == 0:
+        limiter.acquire(PUBLIC_LANES)
+    return limiter
+
+
+def test_bet_priority_jumps_background_waiters():
+    limiter = drained(rate=10)
+    done = []
+    background = [
+        threading.Thread(target=lambda: done.append(limiter.acquire(PUBLIC_LANES, PRIORITY_BACKGROUND)))
+        for _ in range(5)
+    ]
+    for thread in background:
+        thread.start()
+    while len(limiter._waiters) < 5:
+        time.sleep(0.001)
+
+    waited = limiter.acquire(PUBLIC_LANES, PRIORITY_BET)
+    assert waited < 0.1 + 0.1  # One token's refill, not five background requests' worth
+    assert done == []
+
+    for thread in background:
+        thread.join(timeout=5)
+    assert len(done) == 5
+
+
+def test_bet_lanes_ignore_a_busy_public_lane():
+    limiter = drained()
+    assert limiter.wait_time(ratelimit.BET_LANES, PRIORITY_BET) == 0
+
+
+def test_penalize_blocks_for_retry_after():
+    limiter = RateLimiter()
+    limiter.penalize(PUBLIC_LANES, 0.3)
+    assert limiter.wait_time(PUBLIC_LANES) == pytest.approx(0.3, abs=0.05)
+    assert limiter.acquire(ratelimit.AUTH_LANES) < 0.05
+
+    waited = limiter.acquire(PUBLIC_LANES, PRIORITY_BET)
+    assert 0.28 <= waited < 0.6
+    assert limiter.stats["rate_limited"] == 1
+
+
+def test_penalize_deadline_expires():
+    limiter = RateLimiter()
+    limiter.penalize(PUBLIC_LANES, 5)
+    assert limiter.acquire(PUBLIC_LANES, deadline=time.time() + 0.5) is None
+    assert limiter.stats["expired"] == 1
+
+
+def test_concurrent_coalesce_fetches_once():
+    limiter = RateLimiter()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"matchId": "SAVAGE-7", "status": "betting"}
+
+    results = [None] * 4
+
+    def call(i):
+        results[i] = limiter.coalesce("GET /api/match/current", fetch)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    while limiter.stats["coalesced"] < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(calls) == 1
+    assert all(r == {"matchId": "SAVAGE-7", "status": "betting"} for r in results)
+    assert len({id(r) for r in results}) == 4
+    results[0]["status"] = "closed"
+    assert results[1]["status"] == "betting"
+
+
+def test_coalesce_shares_failures_then_forgets_them():
+    limiter = RateLimiter()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        limiter.coalesce("key", fail)
+    assert limiter.coalesce("key", lambda: {"ok": True}) == {"ok": True}
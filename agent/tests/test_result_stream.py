@@ -0,0 +1,88 @@
+"""ResultReader agrees with json.loads however the /result body is chunked."""
+
+import json
+import random
+
+import pytest
+
+import arena_sim
+from result_stream import ResultReader
+
+
+def chunked(body: bytes, rng: random.Random, largest: int = 64):
+    pos = 0
+    while pos < len(body):
+        size = rng.randint(1, largest)
+        yield body[pos:pos + size]
+        pos += size
+
+
+def encode(result) -> bytes:
+    return json.dumps(result, ensure_ascii=False).encode("utf-8")
+
+
+def payload(mid):
+    # Multi-byte names so chunk boundaries also land inside UTF-8 sequences
+    result = arena_sim.match_result(mid)
+    result["teamA"]["name"] = "Ørdén du Drăgon 🐉"
+    result["battleLog"][0]["attacker"] = "Sköll ☄"
+    return result
+
+
+def split_everywhere(body: bytes):
+    for cut in range(1, len(body)):
+        yield [body[:cut], body[cut:]]
+
+
+@pytest.mark.parametrize("mid", [1, 5, 77, 2024])
+@pytest.mark.parametrize("seed", range(4))
+def test_random_chunks_match_json(mid, seed):
+    result = payload(mid)
+    body = encode(result)
+    expected = json.loads(body)
+    rng = random.Random(seed)
+
+    reader = ResultReader(chunked(body, rng))
+    assert reader.read(("winner",)) == {k: expected[k] for k in ("matchId", "status", "seed", "winner")}
+    assert reader.bytes_read < len(body)
+
+    reader = ResultReader(chunked(body, rng))
+    header = reader.read()
+    assert header == {k: v for k, v in expected.items() if k != "battleLog"}
+    assert list(reader.battle_log()) == expected["battleLog"]
+
+
+def test_numbers_and_characters_split_at_every_byte():
+    body = encode({"winner": "B", "duration": 123456, "teamA": {"name": "Ünïcødé ✦"},
+                   "battleLog": [{"damage": 7.25, "crit": True}, {"damage": -30}], "tail": 1e-3})
+    expected = json.loads(body)
+    for chunks in split_everywhere(body):
+        reader = ResultReader(chunks)
+        assert reader.read() == {k: expected[k] for k in ("winner", "duration", "teamA")}
+        assert list(reader.battle_log()) == expected["battleLog"]
+        assert reader.header["tail"] == expected["tail"]
+
+
+@pytest.mark.parametrize("log", [None, []])
+def test_empty_or_null_log(log):
+    body = encode({"winner": "A", "duration": 1800, "battleLog": log, "after": [1, 2]})
+    for chunks in split_everywhere(body):
+        reader = ResultReader(chunks)
+        assert reader.read() == {"winner": "A", "duration": 1800}
+        assert list(reader.battle_log()) == []
+        assert reader.header == {"winner": "A", "duration": 1800, "after": [1, 2]}
+
+
+def test_field_after_the_log_skips_over_it():
+    body = encode({"winner": "A", "battleLog": [{"type": "attack"}] * 50, "mvp": "Torch"})
+    reader = ResultReader(chunked(body, random.Random(0), largest=8))
+    assert reader.read(("mvp",))["mvp"] == "Torch"
+    assert list(reader.battle_log()) == []
+
+
+def test_truncated_body_raises():
+    body = encode(arena_sim.match_result(5))
+    reader = ResultReader([body[:len(body) // 2]])
+    reader.read()
+    with pytest.raises(ValueError):
+        list(reader.battle_log())
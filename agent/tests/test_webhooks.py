@@ -0,0 +1,53 @@
+"""Pushed events are deduplicated, and never settle a bet early or with an unconfirmed winner."""
+
+import time
+
+import pytest
+
+import arena_sim
+from savage_trader import Config, SavageTrader
+from webhooks import EventFilter
+
+
+def test_filter_drops_duplicates_and_stale():
+    f = EventFilter()
+    ended = {"event": "match.ended", "matchId": "SAVAGE-7", "winner": "A"}
+    assert f.accept(ended)
+    assert not f.accept(dict(ended))
+    assert not f.accept({"event": "match.started", "matchId": "SAVAGE-7"})
+    assert f.stats == {"accepted": 1, "duplicate": 1, "stale": 1, "ignored": 0}
+
+
+@pytest.fixture
+def trader():
+    t = SavageTrader(Config(dry_run=True, local_settlement=False, journal_path="", arena_url="http://127.0.0.1:9"))
+    mid = arena_sim.current_match_id() - 5
+    t.winner = arena_sim.match_winner(mid)
+    t.fetched, t.settled = [], []
+    t.arena.get_match_result = lambda match_id, fields=None, with_log=False: \
+        t.fetched.append(match_id) or {"winner": t.winner}
+    t.settle_bet = lambda winner, result=None: t.settled.append(winner)
+    t.current_bet = {"match_id": f"SAVAGE-{mid}", "ends_at": time.time() * 1000 + 60000, "team_idx": 0}
+    return t
+
+
+def ended(trader, winner):
+    return {"event": "match.ended", "matchId": trader.current_bet["match_id"], "winner": winner}
+
+
+def test_push_before_end_time_settles_nothing(trader):
+    trader.handle_event(ended(trader, trader.winner))
+    assert trader.settled == [] and trader.fetched == []
+
+
+def test_spoofed_winner_is_checked_against_result(trader):
+    trader.current_bet["ends_at"] = time.time() * 1000 - 1
+    trader.handle_event(ended(trader, "B" if trader.winner == "A" else "A"))
+    assert trader.settled == [trader.winner]
+    assert trader.fetched == [trader.current_bet["match_id"]]
+
+
+def test_confirmed_winner_skips_the_fetch(trader):
+    trader.current_bet["ends_at"] = time.time() * 1000 - 1
+    trader.handle_event(ended(trader, trader.winner))
+    assert trader.settled == [trader.winner] and trader.fetched == []
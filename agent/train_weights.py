@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Fit role weights and a synergy table from simulated battles.
+
+The power-ratio fallback in savage_trader scores a team as
+
+    adjusted = sum_f power(f) * synergy(team)
+    P(A wins) = adjusted_A^g / (adjusted_A^g + adjusted_B^g)
+
+with power(f) = sum_k coeff_k * weight[role, k] * stat_k, synergy the
+product of pair factors over every pair of roles in the team (times a
+bonus for 3+ distinct roles), and g a sharpness exponent. That is a
+logistic regression with logit g * (log adjusted_A - log adjusted_B),
+so this script fits exactly those parameters - per-role stat weights,
+pair factors, the diversity bonus and g - on a batch of simulated
+matchups, and the fitted table drops into the same code at the same
+per-call cost.
+
+The base coefficients are the API's calcPower (hp*0.3 + atk*2 + def*1.5
++ spd*20). Matchups are half arena draws (the distribution the API
+serves) and half random 5v5s over the API roster plus fighters.json, so
+every role and most pairs are covered. Each is labelled with its
+simulated win rate from monte_carlo (soft targets), and the fit is full-
+batch Adam on the cross-entropy with a small ridge pull toward the
+neutral table (weights and factors of 1). fighters.json calls the API's
+"Necro" role "Necromancer"; roles are folded through ROLE_ALIASES before
+fitting and scoring.
+
+Usage:
+    python train_weights.py                              # ~9M battles -> role_weights.json
+    python train_weights.py --matchups 50000 --replicates 400 --out role_weights.json
+    python train_weights.py --evaluate role_weights.json # holdout log loss vs the heuristic
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import arena_sim
+import monte_carlo
+from roster import load_fighters, roster_path
+
+FORMAT_VERSION = 1
+DEFAULT_OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "role_weights.json")
+STATS = ("hp", "atk", "def", "spd")
+API_COEFFS = {"hp": 0.3, "atk": 2.0, "def": 1.5, "spd": 20.0}  # calcPower in api/odds.js
+ROLE_ALIASES = {"Necromancer": "Necro"}  # fighters.json name -> API name
+
+
+def canonical_role(role: str) -> str:
+    return ROLE_ALIASES.get(role, role)
+
+
+# ============ DATA ============
+def fighter_pool() -> List[Dict]:
+    """API roster plus fighters.json (when present), roles folded to API names."""
+    pool = [dict(f) for f in arena_sim.FIGHTERS]
+    path = roster_path("fighters.json")
+    if os.path.exists(path):
+        pool += [dict(f) for f in load_fighters(path)]
+    for f in pool:
+        f["role"] = canonical_role(f.get("role", "Berserker"))
+    return pool
+
+
+def sample_matchups(count: int, rng: np.random.Generator) -> List[Tuple[List[Dict], List[Dict]]]:
+    """Half arena draws from random match IDs, half random 5v5s over the whole pool."""
+    size = arena_sim.TEAM_SIZE
+    matchups = []
+    for mid in rng.integers(1, 10_000_000, count // 2):
+        a, b, _, _ = arena_sim.draw_teams(int(mid))
+        matchups.append((a, b))
+    pool = fighter_pool()
+    for _ in range(count - len(matchups)):
+        picks = rng.choice(len(pool), 2 * size, replace=False)
+        matchups.append(([pool[i] for i in picks[:size]], [pool[i] for i in picks[size:]]))
+    return matchups
+
+
+def label(matchups: Sequence, replicates: int, rng: np.random.Generator, chunk: int = 500) -> np.ndarray:
+    """Simulated P(A wins) per matchup."""
+    out = np.empty(len(matchups))
+    for start in range(0, len(matchups), chunk):
+        stats = monte_carlo.stat_arrays(matchups[start:start + chunk])
+        sims = monte_carlo.simulate(stats, replicates, rng)
+        out[start:start + chunk] = (sims["winner"] == 0).mean(axis=1)
+    return out
+
+
+class Design:
+    """Matchups as arrays: per-slot stats and role codes, per-side pair counts."""
+
+    def __init__(self, matchups: Sequence, roles: List[str]):
+        self.roles = roles
+        code = {r: i for i, r in enumerate(roles)}
+        n_roles = len(roles)
+        self.pairs = [(roles[i], roles[j]) for i in range(n_roles) for j in range(i, n_roles)]
+        pair_code = {p: k for k, p in enumerate(self.pairs)}
+
+        rows = [list(a) + list(b) for a, b in matchups]
+        self.stats = np.array([[[f[k] for k in STATS] for f in r] for r in rows], dtype=np.float64)
+        self.role = np.array([[code[canonical_role(f.get("role", "Berserker"))] for f in r] for r in rows])
+        size = arena_sim.TEAM_SIZE
+        self.pair_counts = np.zeros((len(rows), 2, len(self.pairs)))
+        self.diverse = np.zeros((len(rows), 2))
+        for n, r in enumerate(self.role):
+            for side in range(2):
+                team = sorted(r[side * size:(side + 1) * size])
+                for i in range(size):
+                    for j in range(i + 1, size):
+                        self.pair_counts[n, side, pair_code[(roles[team[i]], roles[team[j]])]] += 1
+                self.diverse[n, side] = len(set(team)) >= 3
+        self.onehot = np.eye(n_roles)[self.role]  # (N, 10, R)
+
+
+# ============ MODEL ============
+class PowerModel:
+    """Parameters in log space: weights = exp(theta), factors = exp(beta), g = exp(log_g)."""
+
+    def __init__(self, n_roles: int, n_pairs: int):
+        self.theta = np.zeros((n_roles, len(STATS)))
+        self.beta = np.zeros(n_pairs)
+        self.delta = 0.0
+        self.log_g = 0.0
+        self.coeffs = np.array([API_COEFFS[k] for k in STATS])
+
+    def logits(self, d: Design) -> Tuple[np.ndarray, Dict]:
+        size = arena_sim.TEAM_SIZE
+        weights = np.exp(self.theta)[d.role] * self.coeffs            # (N, 10, 4)
+        contrib = weights * d.stats
+        power = contrib.sum(axis=2)                                   # (N, 10)
+        total = np.stack([power[:, :size].sum(1), power[:, size:].sum(1)], axis=1)
+        log_syn = d.pair_counts @ self.beta + d.diverse * self.delta  # (N, 2)
+        score = np.log(total) + log_syn
+        g = np.exp(self.log_g)
+        z = g * (score[:, 0] - score[:, 1])
+        return z, {"contrib": contrib, "total": total, "score": score, "g": g}
+
+    def loss_and_grad(self, d: Design, y: np.ndarray, ridge: float) -> Tuple[float, Dict]:
+        size = arena_sim.TEAM_SIZE
+        z, cache = self.logits(d)
+        p = 1 / (1 + np.exp(-z))
+        eps = 1e-12
+        loss = -np.mean(y * np.log(p + eps) + (1 - y) * np.log(1 - p + eps))
+        loss += ridge * (np.sum(self.theta ** 2) + np.sum(self.beta ** 2) + self.delta ** 2)
+        dz = (p - y) / len(y)
+        g = cache["g"]
+
+        # d z / d theta[r, k] = g * sum_f sign(f) * contrib[f, k] / total[side(f)] over fighters of role r
+        sign = np.concatenate([np.full(size, 1.0), np.full(size, -1.0)])
+        per_slot = (dz * g)[:, None] * sign / np.repeat(cache["total"], size, axis=1)   # (N, 10)
+        grad_theta = np.einsum("nsr,nsk->rk", d.onehot, cache["contrib"] * per_slot[:, :, None])
+        side_diff = lambda x: x[:, 0] - x[:, 1]
+        grad = {
+            "theta": grad_theta + 2 * ridge * self.theta,
+            "beta": (dz * g) @ side_diff(d.pair_counts) + 2 * ridge * self.beta,
+            "delta": float((dz * g) @ side_diff(d.diverse)) + 2 * ridge * self.delta,
+            "log_g": float(dz @ z),
+        }
+        return float(loss), grad
+
+    def fit(self, d: Design, y: np.ndarray, ridge: float = 1e-4, steps: int = 3000, lr: float = 0.02):
+        """Full-batch Adam."""
+        names = ("theta", "beta", "delta", "log_g")
+        m = {k: np.zeros_like(np.asarray(getattr(self, k), dtype=float)) for k in names}
+        v = {k: np.zeros_like(m[k]) for k in names}
+        loss = None
+        for t in range(1, steps + 1):
+            loss, grad = self.loss_and_grad(d, y, ridge)
+            for k in names:
+                m[k] = 0.9 * m[k] + 0.1 * grad[k]
+                v[k] = 0.999 * v[k] + 0.001 * grad[k] ** 2
+                step = lr * (m[k] / (1 - 0.9 ** t)) / (np.sqrt(v[k] / (1 - 0.999 ** t)) + 1e-8)
+                setattr(self, k, getattr(self, k) - step)
+        return loss
+
+    def predict(self, d: Design) -> np.ndarray:
+        return 1 / (1 + np.exp(-self.logits(d)[0]))
+
+    def table(self, d: Design) -> Dict:
+        weights = np.exp(self.theta)
+        # Pairs the data never saw stay at exactly 1 and are left out
+        seen = (d.pair_counts.sum(axis=(0, 1)) > 0)
+        return {
+            "stat_coeffs": API_COEFFS,
+            "role_weights": {r: {k: round(float(weights[i, j]), 4) for j, k in enumerate(STATS)}
+                             for i, r in enumerate(d.roles)},
+            "synergy": [[a, b, round(float(np.exp(beta)), 4)]
+                        for (a, b), beta, ok in zip(d.pairs, self.beta, seen) if ok],
+            "diversity_bonus": round(float(np.exp(self.delta)), 4),
+            "exponent": round(float(np.exp(self.log_g)), 4),
+            "role_aliases": ROLE_ALIASES,
+        }
+
+
+# ============ EVALUATION ============
+def log_loss(p: np.ndarray, y: np.ndarray) -> float:
+    p = np.clip(p, 1e-6, 1 - 1e-6)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+def table_probs(matchups: Sequence, table: Optional[Dict]) -> np.ndarray:
+    """P(A wins) from savage_trader's power-ratio fallback under a weight table (None = heuristic)."""
+    import savage_trader as st
+    saved = st.weight_table()
+    try:
+        st.apply_weights(table)
+        probs = []
+        for a, b in matchups:
+            adjusted = [st.calculate_team_synergy(t) * sum(st.calculate_fighter_power(f) for f in t) for t in (a, b)]
+            probs.append(st.power_ratio_probs(adjusted)[0])
+        return np.array(probs)
+    finally:
+        st.apply_weights(saved)
+
+
+def evaluate(matchups: Sequence, y: np.ndarray, tables: Dict[str, Optional[Dict]]) -> Dict[str, Dict]:
+    out = {}
+    for name, table in tables.items():
+        p = table_probs(matchups, table)
+        out[name] = {"log_loss": round(log_loss(p, y), 4), "brier": round(float(np.mean((p - y) ** 2)), 4)}
+    return out
+
+
+# ============ CLI ============
+def main():
+    parser = argparse.ArgumentParser(description="Fit role weights and synergy factors from simulated battles")
+    parser.add_argument("--matchups", type=int, default=20000, help="Training matchups")
+    parser.add_argument("--replicates", type=int, default=400, help="Simulated battles per matchup")
+    parser.add_argument("--holdout", type=int, default=2000, help="Held-out matchups for evaluation")
+    parser.add_argument("--steps", type=int, default=3000, help="Optimizer steps")
+    parser.add_argument("--ridge", type=float, default=1e-4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--evaluate", metavar="TABLE", help="Only score an existing table on fresh holdout data")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    start = time.perf_counter()
+    holdout = sample_matchups(args.holdout, rng)
+    y_holdout = label(holdout, args.replicates, rng)
+    if args.evaluate:
+        with open(args.evaluate) as fh:
+            table = json.load(fh)
+        print(json.dumps(evaluate(holdout, y_holdout, {"heuristic": None, "table": table}), indent=2))
+        return
+
+    train = sample_matchups(args.matchups, rng)
+    y = label(train, args.replicates, rng)
+    print(f"Simulated {(args.matchups + args.holdout) * args.replicates:,} battles "
+          f"in {time.perf_counter() - start:.0f}s", file=sys.stderr)
+
+    roles = sorted({canonical_role(f.get("role", "Berserker")) for a, b in train + holdout for f in a + b})
+    design = Design(train, roles)
+    model = PowerModel(len(roles), len(design.pairs))
+    fit_start = time.perf_counter()
+    loss = model.fit(design, y, args.ridge, args.steps)
+    print(f"Fitted {model.theta.size + model.beta.size + 2} parameters in "
+          f"{time.perf_counter() - fit_start:.0f}s (train loss {loss:.4f})", file=sys.stderr)
+
+    table = {
+        "format": FORMAT_VERSION,
+        "version": datetime.now(timezone.utc).strftime("%Y%m%d.%H%M%S"),
+        **model.table(design),
+        "training": {"matchups": args.matchups, "replicates": args.replicates, "seed": args.seed,
+                     "steps": args.steps, "ridge": args.ridge},
+    }
+    table["holdout"] = evaluate(holdout, y_holdout, {"heuristic": None, "learned": table})
+    with open(args.out, "w") as fh:
+        json.dump(table, fh, indent=1)
+        fh.write("\n")
+    print(json.dumps(table["holdout"], indent=2))
+    print(f"Wrote {args.out} (version {table['version']})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Savage Arena Webhook Receiver
+
+An embedded async HTTP endpoint for the pushed events API-SPEC.md
+describes (POST /api/webhooks/register): match.started, match.ended and
+bet.settled. With it the trader learns that a match has ended, or that
+the next betting window has opened, one network hop after it happens
+instead of up to a poll interval later.
+
+Webhook senders retry and don't promise order, so every delivery goes
+through an EventFilter first:
+
+    - duplicates (the same event for the same match or bet) are dropped;
+    - a match's events only move forward - match.started arriving after
+      that match's match.ended is stale and dropped.
+
+Accepted events are handed to a callback (typically queue.put, so they
+are applied on the trading thread). Every delivery is answered 200,
+duplicates included, so the sender stops retrying.
+
+Deliveries carry no signature, so the listener binds 127.0.0.1 by
+default and the trader treats an event only as a cue: settlement still
+waits for the bet's end time and checks any pushed winner against the
+replay or /result.
+
+Usage:
+    python webhooks.py --port 8799                                   # print events as they arrive
+    python webhooks.py --port 8799 --register http://127.0.0.1:8787  # ...after registering with an arena
+    python savage_trader.py --webhook-port 8799 --webhook-url https://my-agent.example/webhook
+"""
+
+import json
+import asyncio
+import logging
+import argparse
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import arena_sim
+
+logger = logging.getLogger(__name__)
+
+EVENTS = ("match.started", "match.ended", "bet.settled")
+PHASES = {"match.started": 1, "match.ended": 2}
+DEFAULT_PATH = "/webhook"
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def match_key(match_id: Any) -> Any:
+    """The match number of "SAVAGE-1234" / 1234, or the ID itself if it has another shape."""
+    try:
+        return arena_sim.parse_match_id(match_id)
+    except (TypeError, ValueError):
+        return match_id
+
+
+# ============ FILTER ============
+class EventFilter:
+    """Drops redelivered and out-of-order events, remembering the last `capacity` keys."""
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.seen: "OrderedDict[Tuple, None]" = OrderedDict()
+        self.phase: "OrderedDict[Any, int]" = OrderedDict()   # match -> furthest phase seen
+        self.stats = {"accepted": 0, "duplicate": 0, "stale": 0, "ignored": 0}
+
+    @staticmethod
+    def key(event: Dict) -> Tuple:
+        return event.get("event"), event.get("betId") or event.get("matchId")
+
+    def _remember(self, table: OrderedDict, key: Any, value: Any = None):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.capacity:
+            table.popitem(last=False)
+
+    def accept(self, event: Dict) -> bool:
+        kind = event.get("event") if isinstance(event, dict) else None
+        if kind not in EVENTS:
+            self.stats["ignored"] += 1
+            return False
+        key = self.key(event)
+        if key in self.seen:
+            self.stats["duplicate"] += 1
+            return False
+        self._remember(self.seen, key)
+
+        if kind in PHASES:
+            mid = match_key(event.get("matchId"))
+            if self.phase.get(mid, 0) >= PHASES[kind]:
+                self.stats["stale"] += 1
+                return False
+            self._remember(self.phase, mid, PHASES[kind])
+        self.stats["accepted"] += 1
+        return True
+
+
+# ============ LISTENER ============
+class WebhookListener:
+    """Minimal asyncio HTTP/1.1 server taking event POSTs on `path`."""
+
+    def __init__(self, on_event: Callable[[Dict], None], host: str = "127.0.0.1", port: int = 0,
+                 path: str = DEFAULT_PATH):
+        self.on_event = on_event
+        self.host = host
+        self.port = port
+        self.path = path
+        self.filter = EventFilter()
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        """Bind and start serving (port 0 picks a free one, stored in .port)."""
+        self.server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"🪝 Webhook listener on {self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await reader.readline()
+                if not request.strip():
+                    break
+                method, target = request.decode("latin-1").split()[:2]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+
+                status, payload = self.route(method, target.split("?")[0], body)
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError) as e:
+            logger.debug(f"Webhook connection dropped: {e}")
+        finally:
+            writer.close()
+
+    def route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        if path != self.path:
+            return 404, {"error": "Not found"}
+        if method == "GET":
+            return 200, {"ok": True, **self.filter.stats}
+        if method != "POST":
+            return 405, {"error": "Method not allowed"}
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            return 400, {"error": "Invalid JSON"}
+        batch: List = payload if isinstance(payload, list) else [payload]
+        accepted = 0
+        for event in batch:
+            if self.filter.accept(event):
+                accepted += 1
+                self.on_event(event)
+        return 200, {"ok": True, "received": len(batch), "accepted": accepted}
+
+
+# ============ CLI ============
+def main():
+    parser = argparse.ArgumentParser(description="Receive Savage Arena webhook events and print them")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Interface to bind (events are unauthenticated - expose only behind a proxy)")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--register", metavar="ARENA_URL", help="Register with this arena first")
+    parser.add_argument("--url", help="Public URL to register (default: http://127.0.0.1:PORT/webhook)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    async def run():
+        listener = WebhookListener(lambda event: print(json.dumps(event), flush=True), args.host, args.port)
+        await listener.start()
+        if args.register:
+            from savage_trader import Config, SavageArenaClient
+            client = SavageArenaClient(Config(arena_url=args.register))
+            url = args.url or f"http://127.0.0.1:{listener.port}{listener.path}"
+            if not await asyncio.to_thread(client.register_webhook, url, EVENTS):
+                logger.error(f"Registration with {args.register} failed")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()